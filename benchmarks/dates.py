@@ -0,0 +1,31 @@
+"""
+Datetime parsing: the regular expression parser, the fromisoformat fast path, parse_datetimes
+over repeated values and the memoized parsing used for token expirations.
+
+Run from the repository root::
+    python -m benchmarks.dates
+"""
+import timeit
+
+from decktutorsdk import utils
+
+CALLS = 100000
+
+VALUES = ["2016-03-%02dT10:%02d:30+01:00" % (1 + index % 28, index % 60) for index in range(1000)]
+
+
+def report(name, statement, calls=CALLS):
+    seconds = min(timeit.repeat(statement, number=1, repeat=3)) / calls
+    print("%-28s %7.2fus/value" % (name, seconds * 1e6))
+
+
+def main():
+    values = VALUES * (CALLS // len(VALUES))
+    report("regex", lambda: [utils.parse_datetime_re(value) for value in values])
+    report("fromisoformat", lambda: [utils.parse_datetime(value) for value in values])
+    report("parse_datetimes", lambda: utils.parse_datetimes(values))
+    report("token expiration, memoized", lambda: [utils.cached_parse_datetime(VALUES[0]) for value in values])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Per call overhead of the Decktutor dispatch path, without any network: the api_map lookup,
+resolver, url building and request options, down to Api.request (dispatch) and down to the
+transport, including signing and response decoding (sdk).
+
+Run from the repository root::
+    python -m benchmarks.dispatch
+"""
+import datetime
+import timeit
+
+from decktutorsdk import utils
+from decktutorsdk.api import Api, api_factory
+from decktutorsdk.decktutor import decktutor
+from decktutorsdk.resolvers import AuthResolver
+from decktutorsdk.transport import Transport
+
+CALLS = 50000
+
+
+class NullApi(Api):
+
+    def request(self, url, method, **kwargs):
+        return {}
+
+
+class CannedTransport(Transport):
+
+    class Response(object):
+        status_code = 200
+        reason = "OK"
+        content = b'{"code": 123}'
+
+    def request(self, method, url, **kwargs):
+        return self.Response
+
+
+def configure(api_class, **kwargs):
+    expiration = utils.time_now() + datetime.timedelta(days=1)
+    api = api_class(username="bench", password="bench", mode="live", authenticate=True, **kwargs)
+    api.token = {
+        "auth_token": "token",
+        "auth_token_secret": "secret",
+        "auth_token_expiration": expiration.strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+    }
+    api_factory.configure(username="bench", password="bench", api=api, auth_api=api)
+
+
+def report(name, statement):
+    seconds = min(timeit.repeat(statement, number=CALLS, repeat=3)) / CALLS
+    print("%-28s %7.2fus/call" % (name, seconds * 1e6))
+
+
+def main():
+    entry = decktutor.api_map["insertions"]["info"]
+    configure(NullApi)
+    report("dispatch, compiled", lambda: decktutor.insertions.info(url_entry={'code': 123}))
+    report("dispatch, compiled per call", lambda: AuthResolver().resolve(api_map=entry, url_entry={'code': 123}))
+    configure(Api, transport=CannedTransport(), coalesce=False)
+    report("sdk, no network", lambda: decktutor.insertions.info(url_entry={'code': 123}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Signed headers per second built by threads sharing one authenticated api, and a check that
+no sequence number is ever handed out twice.
+
+Run from the repository root::
+    python -m benchmarks.headers
+"""
+import datetime
+import threading
+import time
+
+from decktutorsdk import utils
+from decktutorsdk.api import Api
+
+CALLS = 20000
+
+
+def run(api, threads):
+    sequences = []
+    lock = threading.Lock()
+
+    def work():
+        local = [api.headers()["x-dt-Sequence"] for _ in range(CALLS // threads)]
+        with lock:
+            sequences.extend(local)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.time() - start
+    return len(sequences), len(set(sequences)), elapsed
+
+
+def main():
+    expiration = utils.time_now() + datetime.timedelta(days=1)
+    api = Api(username="bench", password="bench", authenticate=True)
+    api.token = {
+        "auth_token": "token",
+        "auth_token_secret": "secret",
+        "auth_token_expiration": expiration.strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+    }
+    for threads in (1, 4, 16):
+        total, unique, elapsed = run(api, threads)
+        print("%2d threads: %7.0f headers/s  duplicated sequences: %d" % (
+            threads, total / elapsed, total - unique))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Requests per second, p50/p99 latency and peak memory of Decktutor calls against the local
+DeckTutor stub, serially, from a thread pool and from asyncio.
+
+Run from the repository root::
+    python -m benchmarks.load [--calls 2000] [--concurrency 16] [--latency 0.001]
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from decktutorsdk.aio import AsyncApi, AsyncDecktutor
+from decktutorsdk.api import Api, api_factory
+from decktutorsdk.decktutor import decktutor
+from decktutorsdk.transport import create_transport
+from test.stub_server import DecktutorStub
+
+
+def timed(call, code):
+    start = time.time()
+    call(code)
+    return time.time() - start
+
+
+async def async_timed(call, code):
+    start = time.time()
+    await call(code)
+    return time.time() - start
+
+
+def serial(calls, concurrency):
+    call = lambda code: decktutor.insertions.info(url_entry={'code': code})
+    return [timed(call, code) for code in range(calls)]
+
+
+def threaded(calls, concurrency):
+    call = lambda code: decktutor.insertions.info(url_entry={'code': code})
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(lambda code: timed(call, code), range(calls)))
+
+
+def run_async(server):
+    def run(calls, concurrency):
+        async def main():
+            api = AsyncApi(username="bench", password="bench", mode="live", endpoint=server.url,
+                           authenticate=True, max_concurrency=concurrency)
+            aio_decktutor = AsyncDecktutor(api=api)
+            # latency is timed once a slot is free, like the thread pool
+            slots = asyncio.Semaphore(concurrency)
+
+            async def call(code):
+                async with slots:
+                    return await async_timed(lambda code: aio_decktutor.insertions.info(url_entry={'code': code}), code)
+            try:
+                return await asyncio.gather(*[call(code) for code in range(calls)])
+            finally:
+                await api.close()
+        return asyncio.run(main())
+    return run
+
+
+def percentile(latencies, fraction):
+    return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)]
+
+
+def measure(name, run, calls, concurrency):
+    start = time.time()
+    latencies = sorted(run(calls, concurrency))
+    elapsed = time.time() - start
+    # tracing slows every allocation down, memory is measured on a separate run
+    tracemalloc.start()
+    run(calls, concurrency)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("%-9s %8.0f req/s  p50: %6.2fms  p99: %6.2fms  peak memory: %6.1fKB" % (
+        name, calls / elapsed, percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000,
+        peak / 1024.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.001, help="stub latency in seconds")
+    args = parser.parse_args()
+
+    with DecktutorStub(latency=args.latency) as server:
+        transport = create_transport({"pool_connections": 1, "pool_maxsize": args.concurrency})
+        api_factory.configure(
+            username="bench", password="bench",
+            api=Api(username="bench", password="bench", mode="live", endpoint=server.url, transport=transport),
+            auth_api=Api(username="bench", password="bench", mode="live", endpoint=server.url,
+                         authenticate=True, transport=transport),
+        )
+        for name, run in (("serial", serial), ("threaded", threaded), ("async", run_async(server))):
+            measure(name, run, args.calls, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
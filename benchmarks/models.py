@@ -0,0 +1,68 @@
+"""
+Memory of a synthetic inventory of 100k insertions held as plain dicts and as Insertion models,
+built from the same json items as streamed by Api.stream, before and after reading one field of
+every row.
+
+Run from the repository root::
+    python -m benchmarks.models --rows 100000
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+
+from decktutorsdk.models import Insertion
+from decktutorsdk.streaming import default_loads
+
+
+def items(rows):
+    # bytearrays, as read from the response: models copy them and hold the raw json
+    return [
+        bytearray(json.dumps(
+            {"code": str(index), "game": "mtg", "category": "single", "name": "card %d" % index,
+             "expansion": "set %d" % (index % 50), "price": 1.0 + index % 100 / 10.0, "quantity": 1 + index % 4,
+             "condition": "NM", "language": "en", "foil": index % 7 == 0, "notes": "",
+             "created_at": "2016-03-01T10:%02d:00+01:00" % (index % 60),
+             "updated_at": "2016-03-02T10:%02d:00+01:00" % (index % 60)},
+            separators=(",", ":")
+        ).encode("utf-8"))
+        for index in range(rows)
+    ]
+
+
+def as_dicts(content):
+    loads = default_loads()
+    return [loads(item) for item in content]
+
+
+def as_models(content):
+    return [Insertion.from_json(item) for item in content]
+
+
+def measure(name, load, content, touch=False):
+    gc.collect()
+    tracemalloc.start()
+    items = load(content)
+    if touch:
+        for item in items:
+            item.price if isinstance(item, Insertion) else item["price"]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("%-28s %8.1f MB held %8.1f MB peak" % (name, current / 2.0 ** 20, peak / 2.0 ** 20))
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    content = items(args.rows)
+    print("%d rows, %.1f MB of json" % (args.rows, sum(len(item) for item in content) / 2.0 ** 20))
+    measure("dicts", as_dicts, content)
+    measure("models, not decoded", as_models, content)
+    measure("models, decoded", as_models, content, touch=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Counts the tcp connections (and therefore tls handshakes on https) needed for 1000 api calls
+with and without the pooled transport.
+
+Run from the repository root::
+    python -m benchmarks.transport
+"""
+import time
+
+from decktutorsdk.api import Api
+from test.stub_server import StubServer
+
+CALLS = 1000
+
+
+def run(transport):
+    with StubServer(body={"results": []}) as server:
+        api = Api(username="bench", password="bench", endpoint=server.url, mode="live",
+                  transport=transport)
+        start = time.time()
+        for _ in range(CALLS):
+            api.request("/search/serp", "POST", body={})
+        elapsed = time.time() - start
+        api.transport.close()
+        return server.connections, elapsed
+
+
+def main():
+    for name, transport in (("requests.request", False), ("SessionTransport", None)):
+        connections, elapsed = run(transport)
+        print("%-18s handshakes/%d calls: %5d  total: %.2fs  (%.0f calls/s)" % (
+            name, CALLS, connections, elapsed, CALLS / elapsed))
+
+
+if __name__ == "__main__":
+    main()
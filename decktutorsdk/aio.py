@@ -0,0 +1,377 @@
+"""
+asyncio client, requires python 3.6+ (iter is an async generator)
+
+Usage::
+    api = AsyncApi(username="user", password="pwd", max_concurrency=200)
+    decktutor = AsyncDecktutor(api=api)
+    insertion = await decktutor.insertions.info(url_entry={'code': 123})
+"""
+import asyncio
+import collections
+import concurrent.futures
+import datetime
+import json
+import logging
+
+import requests
+
+from . import exceptions
+from .api import Api
+from .cache import MISSING
+from .deadline import create_deadline
+from .decktutor import Decktutor, default_api_map
+from .pagination import extract_items
+from .retry import create_retry_policy, RETRYABLE_ERRORS
+from .transport import create_transport, SessionTransport
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class Response(object):
+    """
+    Minimal response object exposing what Api.handle_response and exceptions need
+    """
+    def __init__(self, status_code, reason, content, headers=None):
+        self.status_code = status_code
+        self.reason = reason
+        self.content = content
+        self.headers = headers or {}
+
+
+class AsyncTransport(object):
+    """
+    Base async transport, `request` is a coroutine returning a response with
+    `status_code`, `reason` and `content` attributes
+    """
+    async def request(self, method, url, **kwargs):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class ExecutorTransport(AsyncTransport):
+    """
+    Runs a blocking Transport on a thread pool, used when aiohttp is not installed
+    """
+    def __init__(self, transport=None, max_workers=100):
+        self.transport = transport or SessionTransport(pool_maxsize=max_workers)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    async def request(self, method, url, **kwargs):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self.executor, lambda: self.transport.request(method, url, **kwargs)
+        )
+
+    async def close(self):
+        self.executor.shutdown(wait=False)
+        self.transport.close()
+
+
+class AiohttpTransport(AsyncTransport):
+    """
+    Non blocking transport on a keep-alive aiohttp connection pool
+    """
+    def __init__(self, limit=100, limit_per_host=0, keepalive_timeout=15):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.session = None
+
+    def get_session(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host, keepalive_timeout=self.keepalive_timeout
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def request(self, method, url, data=None, params=None, headers=None, timeout=None, **kwargs):
+        params = dict((key, str(value)) for key, value in (params or {}).items())
+        if isinstance(timeout, tuple):
+            timeout = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+        elif timeout is not None:
+            timeout = aiohttp.ClientTimeout(total=timeout)
+        extra = {"timeout": timeout} if timeout is not None else {}
+        try:
+            async with self.get_session().request(method, url, data=data, params=params,
+                                                  headers=headers, **extra) as response:
+                content = await response.read()
+                return Response(response.status, response.reason, content, response.headers)
+        # raise the same errors as the blocking transports, so they are retried the same way
+        except aiohttp.ClientConnectionError as error:
+            raise requests.exceptions.ConnectionError(error)
+        except asyncio.TimeoutError as error:
+            raise requests.exceptions.Timeout(error)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+def create_async_transport(transport=None, max_concurrency=100):
+    """
+    Build an async transport: an AsyncTransport instance is returned as is, otherwise aiohttp is
+    used when installed and the blocking transport options are run on a thread pool when it is not
+    """
+    if isinstance(transport, AsyncTransport):
+        return transport
+    if transport is None and aiohttp is not None:
+        return AiohttpTransport(limit=max_concurrency)
+    if transport is None:
+        transport = {"pool_maxsize": max_concurrency}
+    return ExecutorTransport(create_transport(transport), max_workers=max_concurrency)
+
+
+class AsyncApi(Api):
+    """
+    Api whose token acquisition and http calls are coroutines.
+    At most `max_concurrency` requests are in flight at the same time.
+    """
+    def __init__(self, options=None, **kwargs):
+        super(AsyncApi, self).__init__(options, **kwargs)
+        self.max_concurrency = self.options.get("max_concurrency", 100)
+        self.async_transport = create_async_transport(self.options.get("async_transport"), self.max_concurrency)
+        # asyncio primitives are created lazily so they belong to the running loop
+        self._semaphore = None
+        self._loop = None
+
+    @property
+    def semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def get_token(self, deadline=None):
+        """
+        Returns a valid token through the TokenManager, like Api.get_token: logins are serialized by
+        the token store and tokens close to expiry are refreshed in background. A valid token is
+        returned right away, otherwise the manager runs on the default executor.
+        """
+        token = self.token
+        if token is not None:
+            expires_in = self.token_manager.expires_in(token)
+            if expires_in is None or expires_in > self.token_manager.refresh_margin:
+                return token
+        self._loop = asyncio.get_event_loop()
+        return await self._loop.run_in_executor(None, self.token_manager.get, deadline)
+
+    def login(self, deadline=None):
+        """
+        Login called by the TokenManager from a worker thread, run on the event loop with the async
+        transport
+        """
+        future = asyncio.run_coroutine_threadsafe(self.async_login(deadline), self._loop)
+        try:
+            # bounded, a background refresh must not wait forever on a loop that stopped running
+            return future.result(deadline.remaining() if deadline is not None else self.login_timeout())
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise requests.exceptions.Timeout("Login timed out")
+
+    def login_timeout(self):
+        if isinstance(self.timeout, tuple):
+            return sum(value or 0 for value in self.timeout) or None
+        return self.timeout
+
+    async def async_login(self, deadline=None):
+        extra = {}
+        if deadline is not None:
+            extra["deadline"] = deadline
+        self.token_request_at = datetime.datetime.now()
+        return await self.http_call(
+            self.token_endpoint, "POST",
+            data=self.basic_auth(),
+            headers=self.base_headers(), **extra)
+
+    async def headers(self, authenticate=None, deadline=None):
+        if authenticate is None:
+            authenticate = self.authenticate
+
+        if authenticate:
+            return self.signed_headers(await self.get_token(deadline))
+        return self.base_headers()
+
+    async def request(self, url, method, page_size=None, page=None, headers=None, body=None, params=None,
+                      authenticate=None, cache_ttl=None, retry=None, idempotent=None, timeout=None, deadline=None,
+                      endpoint_name=None):
+        """
+        Coroutine version of Api.request, `authenticate` overrides the api default for this call
+        """
+        http_params = self.pagination_params(page, page_size)
+        http_params.update(params or {})
+        deadline = create_deadline(deadline)
+        if deadline is not None:
+            deadline.check()
+        call = None
+        if self.hooks:
+            call = self.hooks.start(endpoint_name, method, self.endpoint + url)
+        try:
+            response = await self.fetch(self.endpoint + url, method, headers, body, http_params, authenticate,
+                                        cache_ttl, retry, idempotent, call, timeout, deadline)
+        except Exception as error:
+            if call is not None:
+                self.hooks.finish(call, error)
+            raise
+        if call is not None:
+            self.hooks.finish(call)
+        return response
+
+    async def fetch(self, full_url, method, headers, body, http_params, authenticate=None, cache_ttl=None,
+                    retry=None, idempotent=None, call=None, timeout=None, deadline=None):
+        cache_key = self.cache_key(full_url, method, http_params, cache_ttl)
+        if cache_key is not None:
+            response = self.cache.get(cache_key)
+            if response is not MISSING:
+                if call is not None:
+                    call.cached = True
+                return response
+
+        retry_policy = create_retry_policy(retry, default=self.retry_policy)
+        data = json.dumps(body)
+        attempt = 0
+        token_refreshed = False
+        extra = {"timeout": timeout} if timeout is not None else {}
+        if deadline is not None:
+            extra["deadline"] = deadline
+        while True:
+            attempt += 1
+            if deadline is not None:
+                deadline.check()
+            http_headers = await self.headers(authenticate, deadline)
+            http_headers.update(headers or {})
+            token = self.token
+            if call is not None:
+                call.attempts = attempt
+            try:
+                response = await self.http_call(full_url, method, data=data, params=http_params,
+                                                headers=http_headers, call=call, **extra)
+                break
+
+            except exceptions.BadRequest as error:
+                return {"error": json.loads(error.content)}
+
+            except (exceptions.UnauthorizedAccess,) + RETRYABLE_ERRORS as error:
+                delay = self.retry_delay(error, method, full_url, attempt, retry_policy, idempotent, token,
+                                         token_refreshed, deadline)
+                if delay is None:
+                    token_refreshed = True
+                else:
+                    await asyncio.sleep(delay)
+
+        if self.recorder is not None:
+            self.recorder.record(method, full_url, response)
+        if cache_key is not None:
+            self.cache.set(cache_key, response, cache_ttl)
+        return response
+
+    async def http_call(self, url, method, **kwargs):
+        """
+        Makes a http call with logging, waiting for a free slot when max_concurrency is reached.
+        Neither the rate limiter nor the slot are waited for beyond `deadline`.
+        """
+        call = kwargs.pop("call", None)
+        deadline = kwargs.pop("deadline", None)
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.reserve(self.rate_group(url),
+                                              None if deadline is None else deadline.remaining())
+            if delay is None:
+                raise self.rate_limit_exceeded(deadline)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await self.acquire_slot(deadline)
+        try:
+            self.set_timeout(kwargs, deadline)
+            logging.info('Request[%s]: %s' % (method, url))
+            start_time = datetime.datetime.now()
+
+            response = await self.async_transport.request(method, url, **kwargs)
+            if call is not None:
+                call.status = response.status_code
+                call.bytes = len(response.content)
+
+            duration = datetime.datetime.now() - start_time
+            logging.info('Response[%d]: %s, Duration: %s.%ss.' % (
+                response.status_code, response.reason, duration.seconds, duration.microseconds
+            ))
+        finally:
+            self.semaphore.release()
+        return self.handle_response(response, response.content.decode('utf-8'))
+
+    async def acquire_slot(self, deadline=None):
+        """
+        Waits for one of the max_concurrency slots, DeadlineExceeded once `deadline` passes
+        """
+        if deadline is None:
+            await self.semaphore.acquire()
+            return
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), max(deadline.remaining(), 0))
+        except asyncio.TimeoutError:
+            raise exceptions.DeadlineExceeded("Deadline of %ss exceeded waiting for a free connection slot"
+                                              % deadline.seconds)
+
+    async def close(self):
+        await self.async_transport.close()
+        self.transport.close()
+
+
+class AsyncDecktutor(Decktutor):
+    """
+    Same attribute tree as Decktutor, every call returns a coroutine:
+        await decktutor.insertions.info(url_entry={'code':123})
+    """
+    def __init__(self, api_map=None, api=None, parent=None, name=None, **kwargs):
+        super(AsyncDecktutor, self).__init__(api_map=default_api_map if api_map is None else api_map,
+                                             parent=parent, name=name)
+        self.api = api
+
+    def get_child(self, api_map, name=None):
+        return AsyncDecktutor(api_map=api_map, api=self.api, parent=self, name=name)
+
+    def __call__(self, url_entry=None, page=None, page_size=None, **kwargs):
+        if self.endpoint.operation is not None:
+            # bulk operations run blocking calls on a thread pool
+            raise exceptions.MissingConfig("Cannot run operations on the async client, use Decktutor.")
+        resolver = self.get_resolver()
+        resolver.setup(api_map=self.api_map, url_entry=url_entry, page_size=page_size)
+        return self.api.request(
+            url=resolver.url, method=resolver.method, page_size=resolver.page_size, page=page,
+            authenticate=resolver.authenticate, **resolver.request_kwargs(kwargs)
+        )
+
+    def stream(self, *args, **kwargs):
+        raise exceptions.MissingConfig("Cannot stream on the async client, use iter.")
+
+    def export(self, *args, **kwargs):
+        raise exceptions.MissingConfig("Cannot export with the async client, use Decktutor.export.")
+
+    async def iter(self, page_size=None, page=0, prefetch=0, **kwargs):
+        """
+        Async generator over the items of a paginated call:
+            async for insertion in decktutor.search.self_serp.iter(body={...}):
+                ...
+        With `prefetch` > 0 the next `prefetch` pages are requested concurrently as tasks.
+        """
+        paginator = self.get_paginator(self, page_size=page_size, page=page, **kwargs)
+        window = max(prefetch, 1)
+        pending = collections.deque()
+        next_page = paginator.page
+        try:
+            while True:
+                while len(pending) < window:
+                    pending.append(asyncio.ensure_future(paginator.fetch(next_page, paginator.page_size)))
+                    next_page += 1
+                items = extract_items(await pending.popleft(), paginator.items_key)
+                for item in items:
+                    yield item
+                if paginator.is_last(items):
+                    return
+        finally:
+            for task in pending:
+                task.cancel()
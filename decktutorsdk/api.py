@@ -1,5 +1,4 @@
 import hashlib
-import requests
 import json
 import logging
 import os
@@ -8,6 +7,16 @@ import time
 
 from . import utils
 from . import exceptions
+from .cache import create_cache, MISSING
+from .deadline import create_deadline, create_timeout
+from .metrics import create_hooks
+from .ratelimit import create_rate_limiter
+from .recording import create_recorder
+from .retry import create_retry_policy, RETRYABLE_ERRORS
+from .singleflight import create_single_flight
+from .streaming import iter_items
+from .tokens import TokenManager
+from .transport import create_transport
 from .api_map import api_map
 from .version import __version__
 
@@ -30,16 +39,41 @@ class Api(object):
         self.mode = kwargs.get("mode", "sandbox")
         self.endpoint = kwargs.get("endpoint", self.default_endpoint())
         self.token_endpoint = kwargs.get("token_endpoint", self.default_token_endpoint(base=self.endpoint))
-        self.token = None
+        # tokens and sequence numbers are shared by the apis using the same store and username
+        self.token_manager = TokenManager(
+            self.login, kwargs.get("token_refresh_margin", 60), store=kwargs.get("token_store"),
+            key="%s@%s" % (self.username, self.token_endpoint)
+        )
         self.page_size = self.default_page_size()
         self.token_request_at = None
         self.incremental = int(time.time())
+        # connection pool shared by every call made through this api
+        self.transport = create_transport(kwargs.get("transport"))
+        # opt-in cache for GET endpoints declaring a 'cache_ttl' in the api_map
+        self.cache = create_cache(kwargs.get("cache"))
+        # default retry policy, api_map entries can declare their own 'retry'
+        self.retry_policy = create_retry_policy(kwargs.get("retry"))
+        self.rate_limiter = create_rate_limiter(kwargs.get("rate_limit"))
+        # (connect, read) timeout of calls not giving their own
+        self.timeout = create_timeout(kwargs.get("timeout"))
+        # identical GETs in flight at the same time share one http call
+        self.single_flight = create_single_flight(kwargs.get("coalesce"))
+        # metrics and tracing hooks, see decktutorsdk.metrics
+        self.hooks = create_hooks(kwargs.get("hooks"))
+        # responses are recorded in background, by default in sandbox mode only
+        self.recorder = create_recorder(kwargs.get("record"), self.mode)
         # setup SSL certificate verification if private certificate provided
         ssl_options = kwargs.get("ssl_options", {})
         if "cert" in ssl_options:
             os.environ["REQUESTS_CA_BUNDLE"] = ssl_options["cert"]
 
         self.options = kwargs
+        # static headers shared by every call, signed calls only add the per call signature
+        self._base_headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "User-Agent": self.user_agent
+        }
 
     def default_endpoint(self):
         if self.mode == "live":
@@ -67,82 +101,229 @@ class Api(object):
         )
         return credentials
 
-    def get_token(self):
-        """
-        Generate new token by making a POST request
-        """
-        payload = self.basic_auth()
+    @property
+    def token(self):
+        return self.token_manager.token
 
-        self._validate_token_hash()
-        if self.token is not None:
-            return self.token
-        else:
-            self.token_request_at = datetime.datetime.now()
+    @token.setter
+    def token(self, token):
+        self.token_manager.token = token
 
-        login = self.http_call(
-            self.token_endpoint, "POST",
-            data=payload,
-            headers=self.headers(authenticate=False))
-
-        self.token = login
-        return self.token
+    def get_token(self, deadline=None):
+        """
+        Returns a valid token, see TokenManager for how concurrent refreshes are handled
+        """
+        return self.token_manager.get(deadline)
 
-    def sequence_number(self):
+    def login(self, deadline=None):
         """
-        return an incremental number, dependent on timestamp getted on the api init call
+        Generate new token by making a POST request
         """
-        self.incremental += 1
-        return self.incremental
+        self.token_request_at = datetime.datetime.now()
+        extra = {}
+        if deadline is not None:
+            extra["deadline"] = deadline
+        return self.http_call(
+            self.token_endpoint, "POST",
+            data=self.basic_auth(),
+            headers=self.headers(authenticate=False), **extra)
 
-    def _validate_token_hash(self):
+    def sequence_number(self):
         """
-        Checks if token duration has expired and if so resets token
+        return an incremental number, dependent on timestamp getted on the api init call.
+        Numbers are drawn atomically from the token store, so concurrent callers never share one.
         """
-        if self.token and self.token.get("auth_token_expiration") is not None:
-            date = utils.parse_datetime(self.token.get("auth_token_expiration"))
-            if utils.time_now() > date:
-                self.token = None
+        sequence = self.token_manager.next_sequence(self.incremental)
+        self.incremental = sequence
+        return sequence
 
-    def request(self, url, method, page_size=None, page=None, headers=None, body=None, params=None):
+    def request(self, url, method, page_size=None, page=None, headers=None, body=None, params=None,
+                cache_ttl=None, retry=None, idempotent=None, timeout=None, deadline=None, endpoint_name=None):
         """
         Make HTTP call, formats response and does error handling. Uses http_call method in API class.
         'body' param will be JSONyfied!
+        GET responses are cached for `cache_ttl` seconds when the api has a cache.
+        Concurrent identical GETs share a single http call, see SingleFlight.
+        Transient errors are retried following `retry` (see RetryPolicy), or the api default policy.
+        `timeout` overrides the api (connect, read) timeout, `deadline` (seconds or a Deadline) bounds
+        the whole call, token and retries included: see decktutorsdk.deadline.
+        `endpoint_name` is the api_map path of the call given to hooks, filled in by the resolvers.
         Usage::
             api.request("/things", "GET", {})
             api.request("/other/things", "POST", "{}", {} )
         """
-        http_headers = utils.merge_dict(self.headers(), headers or {})
         params = utils.merge_dict(self.pagination_params(page, page_size), params or {})
-        url = self.endpoint+url
+        deadline = create_deadline(deadline)
+        if deadline is not None:
+            deadline.check()
+        call = None
+        if self.hooks:
+            call = self.hooks.start(endpoint_name, method, self.endpoint+url)
         try:
-            response = self.http_call(
-                url, method, data=json.dumps(body), params=params, headers=http_headers
-            )
-            if self.mode == "sandbox":
-                self.write_response_file(response, url)
-
+            response = self.fetch(self.endpoint+url, method, headers, body, params, cache_ttl, retry, idempotent,
+                                  call, timeout, deadline)
+        except Exception as error:
+            if call is not None:
+                self.hooks.finish(call, error)
+            raise
+        if call is not None:
+            self.hooks.finish(call)
+        return response
+
+    def fetch(self, url, method, headers, body, params, cache_ttl=None, retry=None, idempotent=None, call=None,
+              timeout=None, deadline=None):
+        """
+        Response of a call to a full url from the cache, the identical call in flight or the server
+        """
+        cache_key = self.cache_key(url, method, params, cache_ttl)
+        if cache_key is not None:
+            response = self.cache.get(cache_key)
+            if response is not MISSING:
+                if call is not None:
+                    call.cached = True
+                return response
+
+        send = lambda: self.send(url, method, headers, body, params, cache_key, cache_ttl, retry, idempotent, call,
+                                 timeout=timeout, deadline=deadline)
+        coalesce_key = self.coalesce_key(url, method, params, headers, timeout, retry, idempotent)
+        if coalesce_key is not None:
+            if call is not None:
+                # reset by send when this call is the one going to the server
+                call.coalesced = True
+            return self.single_flight.do(coalesce_key, send, deadline)
+        return send()
+
+    def send(self, url, method, headers, body, params, cache_key=None, cache_ttl=None, retry=None,
+             idempotent=None, call=None, stream=False, timeout=None, deadline=None):
+        """
+        Signs and sends a call to a full url, retrying it when allowed, and caches the response.
+        With `stream` the unread http response is returned instead, see http_stream.
+        No attempt starts once `deadline` has passed and no retry waits beyond it.
+        """
+        http_call = self.http_stream if stream else self.http_call
+        extra = {}
+        if call is not None:
+            call.coalesced = False
+            extra["call"] = call
+        retry_policy = create_retry_policy(retry, default=self.retry_policy)
+        data = json.dumps(body)
+        attempt = 0
+        token_refreshed = False
+        if timeout is not None:
+            extra["timeout"] = timeout
+        if deadline is not None:
+            extra["deadline"] = deadline
+        while True:
+            attempt += 1
+            if deadline is not None:
+                deadline.check()
+            # every attempt is signed again, sequence numbers can't be reused
+            http_headers = utils.merge_dict(self.headers(deadline=deadline), headers or {})
+            token = self.token
+            if call is not None:
+                call.attempts = attempt
+            try:
+                response = http_call(url, method, data=data, params=params, headers=http_headers, **extra)
+                break
+
+            # Format Error message for bad request
+            except exceptions.BadRequest as error:
+                if stream:
+                    raise
+                return {"error": json.loads(error.content)}
+
+            except (exceptions.UnauthorizedAccess,) + RETRYABLE_ERRORS as error:
+                delay = self.retry_delay(error, method, url, attempt, retry_policy, idempotent, token,
+                                         token_refreshed, deadline)
+                if delay is None:
+                    token_refreshed = True
+                else:
+                    time.sleep(delay)
+
+        if stream:
             return response
+        if self.recorder is not None:
+            self.recorder.record(method, url, response)
+        if cache_key is not None:
+            self.cache.set(cache_key, response, cache_ttl)
+        return response
+
+    def retry_delay(self, error, method, url, attempt, retry_policy, idempotent=None, token=None,
+                    token_refreshed=False, deadline=None):
+        """
+        Decision after a failed attempt, shared by the sync and async apis: raises `error` when the
+        call is over, returns None when the expired `token` was dropped and the call can be sent
+        again right away (once per call), otherwise the seconds to wait before the next attempt
+        """
+        # Handle Expired token, once
+        if isinstance(error, exceptions.UnauthorizedAccess):
+            if token_refreshed or not (self.token and self.username and self.password):
+                raise error
+            self.token_manager.invalidate(token)
+            return None
+
+        if deadline is not None:
+            # a timeout capped by the deadline means the deadline passed
+            deadline.check()
+        if not retry_policy.should_retry(method, error, attempt, idempotent):
+            raise error
+        delay = retry_policy.delay(attempt, error)
+        if deadline is not None and not deadline.allows(delay):
+            raise error
+        logging.warning('Retrying[%s]: %s in %.2fs after %r' % (method, url, delay, error))
+        return delay
+
+    def stream(self, url, method, page_size=None, page=None, headers=None, body=None, params=None,
+               retry=None, idempotent=None, items_key=None, chunk_size=64 * 1024, loads=None, timeout=None,
+               deadline=None):
+        """
+        Same call as request, returning an iterator over the items of the response array, parsed
+        while the body is read (see decktutorsdk.streaming). Streamed calls are not cached,
+        coalesced nor recorded, bad requests raise BadRequest.
+        Usage::
+            for item in api.stream("/search/serp", "POST", body={...}, page_size=5000, page=0):
+                ...
+        """
+        params = utils.merge_dict(self.pagination_params(page, page_size), params or {})
+        response = self.send(self.endpoint+url, method, headers, body, params, retry=retry, idempotent=idempotent,
+                             stream=True, timeout=timeout, deadline=create_deadline(deadline))
+        return iter_items(response, items_key, chunk_size, loads)
 
-        # Format Error message for bad request
-        except exceptions.BadRequest as error:
-            return {"error": json.loads(error.content)}
+    def coalesce_key(self, url, method, params, headers=None, timeout=None, retry=None, idempotent=None):
+        """
+        Returns the key identical in flight GETs share, None when the call can't be coalesced.
+        Calls only share an http call made with the same timeout and retries, deadlines are per caller.
+        """
+        if self.single_flight is None or method != "GET":
+            return None
+        return json.dumps([url, params, headers, timeout, retry, idempotent], sort_keys=True, default=str)
 
-        # Handle Expired token
-        except exceptions.UnauthorizedAccess as error:
-            if self.token and self.username and self.password:
-                self.token = None
-                return self.request(url, method, body, headers)
-            else:
-                raise error
+    def cache_key(self, url, method, params, cache_ttl):
+        """
+        Returns the cache key for a cacheable call, None otherwise
+        """
+        if self.cache is None or not cache_ttl or method != "GET":
+            return None
+        return self.cache.key(method, url, params)
 
     def http_call(self, url, method, **kwargs):
         """
-        Makes a http call with logging.
+        Makes a http call with logging, waiting first for the rate limiter if any.
+        The status and size of the response are recorded on the RequestInfo given as `call`.
+        Calls not giving a `timeout` use the api one, capped by the time left to `deadline` once the
+        rate limiter let the call through.
         """
+        call = kwargs.pop("call", None)
+        deadline = kwargs.pop("deadline", None)
+        self.wait_rate_limit(url, deadline)
+        self.set_timeout(kwargs, deadline)
         logging.info('Request[%s]: %s' % (method, url))
         start_time = datetime.datetime.now()
 
-        response = requests.request(method, url, **kwargs)
+        response = self.transport.request(method, url, **kwargs)
+        if call is not None:
+            call.status = response.status_code
+            call.bytes = len(response.content)
 
         duration = datetime.datetime.now() - start_time
         logging.info('Response[%d]: %s, Duration: %s.%ss.' % (
@@ -152,12 +333,60 @@ class Api(object):
         #>>> response.content.decode('utf-8')
         return self.handle_response(response, response.content.decode('utf-8'))
 
-    def write_response_file(self, json_res, title):
-        fname = '{}_{:%Y%m%d%H%M%S}_.xml'.format(title.split("/")[-1], datetime.datetime.now())
-        fname = os.path.join(os.path.dirname(os.path.realpath(__file__)), fname)
-        with open(fname, 'w') as ofile:
-            text = json.dumps(json_res, indent=4, sort_keys=True)
-            ofile.write(text)
+    def http_stream(self, url, method, **kwargs):
+        """
+        Makes a streamed http call: a 2xx response is returned unread, other responses raise the
+        same errors as http_call
+        """
+        call = kwargs.pop("call", None)
+        deadline = kwargs.pop("deadline", None)
+        self.wait_rate_limit(url, deadline)
+        self.set_timeout(kwargs, deadline)
+        logging.info('Request[%s]: %s (streamed)' % (method, url))
+
+        response = self.transport.request(method, url, stream=True, **kwargs)
+        if call is not None:
+            call.status = response.status_code
+        if 200 <= response.status_code <= 299:
+            return response
+        try:
+            return self.handle_response(response, response.content.decode('utf-8'))
+        finally:
+            response.close()
+
+    def wait_rate_limit(self, url, deadline=None):
+        """
+        Waits for the rate limiter, if any. A call whose `deadline` would pass while waiting raises
+        DeadlineExceeded right away, without taking a rate token.
+        """
+        if self.rate_limiter is None:
+            return
+        group = self.rate_group(url)
+        if deadline is None:
+            self.rate_limiter.wait(group)
+        elif self.rate_limiter.wait(group, max_delay=deadline.remaining()) is None:
+            raise self.rate_limit_exceeded(deadline)
+
+    @staticmethod
+    def rate_limit_exceeded(deadline):
+        return exceptions.DeadlineExceeded("Deadline of %ss would pass waiting for the rate limiter" % deadline.seconds)
+
+    def set_timeout(self, kwargs, deadline=None):
+        """
+        Sets the timeout of a http call about to be sent: the api one when the call gives none, capped
+        by the time left to `deadline`
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if deadline is not None:
+            deadline.check()
+            kwargs["timeout"] = deadline.timeout(kwargs["timeout"])
+
+    def rate_group(self, url):
+        """
+        Endpoint group of a full url, the first segment of its api path: /search/serp -> search
+        """
+        path = url[len(self.endpoint):] if url.startswith(self.endpoint) else url
+        return path.split("?")[0].split("/")[1] if path.startswith("/") else None
 
     def handle_response(self, response, content):
         """
@@ -184,6 +413,8 @@ class Api(object):
             raise exceptions.ResourceGone(response, content)
         elif status == 422:
             raise exceptions.ResourceInvalid(response, content)
+        elif status == 429:
+            raise exceptions.TooManyRequests(response, content)
         elif 401 <= status <= 499:
             raise exceptions.ClientError(response, content)
         elif 500 <= status <= 599:
@@ -208,28 +439,28 @@ class Api(object):
             'limit': limit
         }
 
-    def headers(self, authenticate=None):
+    def headers(self, authenticate=None, deadline=None):
         if authenticate is None:
             authenticate = self.authenticate
 
         if authenticate:
-            token = self.get_token()
-            sequence = self.sequence_number()
-            signature = ("%02d:%s" % (sequence, token['auth_token_secret'])).encode("UTF-8")
-            headers = {
-                "x-dt-Auth-Token": ("%s" % token['auth_token']),
-                "x-dt-Signature": ("%s" % hashlib.md5(signature).hexdigest()),
-                "x-dt-Sequence": ("%s" % sequence),
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-                "User-Agent": self.user_agent
-            }
-        else:
-            headers = {
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-                "User-Agent": self.user_agent
-            }
+            return self.signed_headers(self.get_token(deadline))
+        return self.base_headers()
+
+    def base_headers(self):
+        return dict(self._base_headers)
+
+    def signed_headers(self, token):
+        """
+        Headers for an authenticated call, signed with the token secret and a new sequence number.
+        Safe to call from many threads, every call gets its own sequence number.
+        """
+        sequence = self.sequence_number()
+        signature = ("%02d:%s" % (sequence, token['auth_token_secret'])).encode("UTF-8")
+        headers = dict(self._base_headers)
+        headers["x-dt-Auth-Token"] = "%s" % token['auth_token']
+        headers["x-dt-Signature"] = hashlib.md5(signature).hexdigest()
+        headers["x-dt-Sequence"] = "%s" % sequence
         return headers
 
 
@@ -243,6 +474,21 @@ class ApiFactory(object):
         self._username = None
         self._password = None
         self._mode = None
+        self._transport = None
+        self._cache = None
+        self._token_store = None
+        self._rate_limiter = None
+        self._hooks = create_hooks()
+        self._record = None
+        self._timeout = None
+
+    def get_transport(self):
+        """
+        Returns the transport shared by the default and the authenticated api
+        """
+        if self._transport is None:
+            self._transport = create_transport()
+        return self._transport
 
     def get_instance(self, authenticate=True):
         """
@@ -263,20 +509,40 @@ class ApiFactory(object):
         if not authenticate:
             if self._api is None:
                 self._api = Api(mode=self._mode, username=self._username,
-                                password=self._password, authenticate=authenticate)
+                                password=self._password, authenticate=authenticate,
+                                transport=self.get_transport(), cache=self._cache,
+                                token_store=self._token_store, rate_limit=self._rate_limiter,
+                                hooks=self._hooks, record=self._record,
+                                timeout=self._timeout)
             return self._api
 
         if self._auth_api is None:
             self._auth_api = Api(mode=self._mode, username=self._username,
-                                 password=self._password, authenticate=authenticate)
+                                 password=self._password, authenticate=authenticate,
+                                 transport=self.get_transport(), cache=self._cache,
+                                 token_store=self._token_store, rate_limit=self._rate_limiter,
+                                 hooks=self._hooks, record=self._record,
+                                 timeout=self._timeout)
         return self._auth_api
 
-    def configure(self, username=None, password=None, mode=None, api=None, auth_api=None):
+    def configure(self, username=None, password=None, mode=None, api=None, auth_api=None, transport=None,
+                  cache=None, token_store=None, rate_limit=None, hooks=None, record=None, timeout=None):
         """
         Configure the api before get()
         """
         self._api = api or self._api
         self._auth_api = auth_api or self._auth_api
+        self._transport = create_transport(transport) if transport is not None else self._transport
+        self._cache = create_cache(cache) if cache is not None else self._cache
+        self._token_store = token_store or self._token_store
+        self._rate_limiter = create_rate_limiter(rate_limit) or self._rate_limiter
+        if hooks is not None:
+            # the apis already created share the same Hooks
+            self._hooks.hooks = list(hooks)
+        if record is not None:
+            # one recorder shared by both apis, False turns recording off
+            self._record = create_recorder(record) or False
+        self._timeout = timeout if timeout is not None else self._timeout
         self._username = username
         self._password = password
         self._mode = mode
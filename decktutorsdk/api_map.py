@@ -23,11 +23,17 @@ _API_MAP = {
             },
             'handlings': {
 
+                'bulk_step': {
+                    'description': 'Move many handlings to a step concurrently, see decktutorsdk.bulk',
+                    'operation': 'decktutorsdk.bulk.bulk_step',
+                },
                 'search': {
                     'url': '/handlings/search/seller',
                     'description': 'Search and list handlings based on role and filters',
                     'method': 'POST',
-                    'resolver': 'decktutorsdk.resolvers.AuthResolver'
+                    'resolver': 'decktutorsdk.resolvers.AuthResolver',
+                    'paginated': True,
+                    'idempotent': True,
                 },
                 'report': {
                     'url': '/handlings/{code}/report',
@@ -41,23 +47,38 @@ _API_MAP = {
                         'description': 'Mark an handling in state new as paid',
                         'method': 'POST',
                         'resolver': 'decktutorsdk.resolvers.AuthResolver',
+                        'idempotent': True,
                     },
                     'unpaid': {
                         'url': '/handlings/{code}/step/unpaid',
                         'description': 'Mark an handling in state new as unpaid',
                         'method': 'POST',
                         'resolver': 'decktutorsdk.resolvers.AuthResolver',
+                        'idempotent': True,
                     },
                     'shipped': {
                         'url': '/handlings/{code}/step/shipped',
                         'description': 'Mark an handling in state paid as shipped',
                         'method': 'POST',
                         'resolver': 'decktutorsdk.resolvers.AuthResolver',
+                        'idempotent': True,
                     },
                 },
             },
             'insertions': {
 
+                'bulk_create': {
+                    'description': 'Create many insertions concurrently, see decktutorsdk.bulk',
+                    'operation': 'decktutorsdk.bulk.bulk_create',
+                },
+                'bulk_update': {
+                    'description': 'Update many insertion fields concurrently, see decktutorsdk.bulk',
+                    'operation': 'decktutorsdk.bulk.bulk_update',
+                },
+                'bulk_publish': {
+                    'description': 'Publish many insertions in groups, see decktutorsdk.bulk',
+                    'operation': 'decktutorsdk.bulk.bulk_publish',
+                },
                 'create': {
                     'url': '/insertions/create/{game}/{category}',
                     'description': 'Create a new insertion in a given category',
@@ -111,6 +132,7 @@ _API_MAP = {
                     'description': 'Retrieve the list of public messages related to an insertion',
                     'method': 'GET',
                     'resolver': 'decktutorsdk.resolvers.AuthResolver',
+                    'paginated': True,
                 },
                 'create_message': {
                     'url': '/insertions/{code}/publicMessages',
@@ -123,6 +145,7 @@ _API_MAP = {
                     'description': 'Purchase an insertion',
                     'method': 'POST',
                     'resolver': 'decktutorsdk.resolvers.AuthResolver',
+                    'retry': False,
                 },
                 'purchase_info': {
                     'url': '/insertions/purchases/',
@@ -152,6 +175,7 @@ _API_MAP = {
                     'description': 'Retrieve a specific product by its unique code',
                     'method': 'GET',
                     'resolver': 'decktutorsdk.resolvers.AuthResolver',
+                    'cache_ttl': 24 * 60 * 60,
                 }
             },
             'search': {
@@ -161,18 +185,21 @@ _API_MAP = {
                     'description': 'Find card versions related to a specific card name or set',
                     'method': 'GET',
                     'resolver': 'decktutorsdk.resolvers.AuthResolver',
+                    'cache_ttl': 24 * 60 * 60,
                 },
                 'list_categories': {
                     'url': '/search/set/{game}/{code}/categories',
                     'description': 'List available categories for a particular expansion set',
                     'method': 'GET',
-                    'resolver': 'decktutorsdk.resolvers.AuthResolver'
+                    'resolver': 'decktutorsdk.resolvers.AuthResolver',
+                    'cache_ttl': 24 * 60 * 60,
                 },
                 'list_filters': {
                     'url': '/search/category/{code}/filters',
                     'description': 'List all possible filters for a category including possible values',
                     'method': 'GET',
                     'resolver': 'decktutorsdk.resolvers.AuthResolver',
+                    'cache_ttl': 24 * 60 * 60,
                 },
                 'card_version': {
                     'url': '/search/card/version',
@@ -191,12 +218,16 @@ _API_MAP = {
                     'description': 'Main search endpoint',
                     'method': 'POST',
                     'resolver': 'decktutorsdk.resolvers.AuthResolver',
+                    'paginated': True,
+                    'idempotent': True,
                 },
                 'self_serp': {
                     'url': '/search/self/serp',
                     'description': 'Search through the insertions database for own insertions',
                     'method': 'POST',
                     'resolver': 'decktutorsdk.resolvers.AuthResolver',
+                    'paginated': True,
+                    'idempotent': True,
                 },
                 'code': {
                     'url': '/search/insertion/code',
@@ -0,0 +1,265 @@
+"""
+Bulk operations, running many calls concurrently with a bounded number of requests in flight.
+They are declared in the api_map with an 'operation' and called on the decktutor tree:
+    for report in decktutor.insertions.bulk_create("collection.csv", concurrency=16):
+        ...
+"""
+import collections
+import csv
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import six
+
+from . import exceptions
+
+RowResult = collections.namedtuple("RowResult", "index row result error")
+ItemResult = collections.namedtuple("ItemResult", "code action result error")
+
+
+def run_bounded(func, items, concurrency=8):
+    """
+    Calls `func` on every item on a thread pool, with at most `concurrency` calls in flight.
+    Items are read lazily and (item, result, error) tuples are yielded as calls complete.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {}
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[executor.submit(func, item)] = item
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                yield item, None if error else future.result(), error
+
+
+def check_response(response):
+    """
+    Api.request returns bad requests as {"error": ...}, turn them back into an exception
+    """
+    if isinstance(response, dict) and "error" in response:
+        raise exceptions.BadRequest(None, response["error"])
+    return response
+
+
+def read_rows(source):
+    """
+    Rows from an iterable of dicts, a csv file object or the path of a csv file, read lazily
+    """
+    if isinstance(source, six.string_types):
+        with open(source) as csv_file:
+            for row in csv.DictReader(csv_file):
+                yield row
+    elif hasattr(source, "read"):
+        for row in csv.DictReader(source):
+            yield row
+    else:
+        for row in source:
+            yield row
+
+
+class Checkpoint(object):
+    """
+    Append only file recording the index of every row done, so a job can resume after a crash.
+    The file is only opened for writing by the first mark.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path) as checkpoint_file:
+                self.done = set(int(line) for line in checkpoint_file if line.strip())
+        self._file = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, index):
+        return index in self.done
+
+    def mark(self, index):
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self._file.write("%d\n" % index)
+            self._file.flush()
+            self.done.add(index)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def bulk_create(insertions, rows, concurrency=8, checkpoint=None):
+    """
+    Creates one insertion for each row, rows hold the 'game' and 'category' of the insertion and
+    its fields. Yields a RowResult for each row as soon as it is done, failed rows carry the error.
+    With a `checkpoint` path the rows already created by a previous run are skipped.
+    """
+    checkpoint = Checkpoint(checkpoint) if checkpoint else None
+
+    def create(indexed_row):
+        index, row = indexed_row
+        body = dict(row)
+        url_entry = dict((key, body.pop(key)) for key in ("game", "category") if key in body)
+        return check_response(insertions.create(url_entry=url_entry, body=body))
+
+    todo = ((index, row) for index, row in enumerate(read_rows(rows))
+            if checkpoint is None or index not in checkpoint)
+    try:
+        for (index, row), result, error in run_bounded(create, todo, concurrency):
+            if error is None and checkpoint is not None:
+                checkpoint.mark(index)
+            yield RowResult(index, row, result, error)
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
+
+class BulkReport(object):
+    """
+    Iterable over the results of a bulk operation, counting them as they are consumed:
+        report = decktutor.insertions.bulk_update(updates)
+        failed = [item for item in report if item.error]
+        report.stats()  # {'items': ..., 'failed': ..., 'elapsed': ..., 'per_second': ...}
+    """
+    def __init__(self, results):
+        self.results = results
+        self.items = 0
+        self.failed = 0
+        self.started_at = None
+        self.finished_at = None
+
+    def __iter__(self):
+        self.started_at = time.time()
+        for item in self.results:
+            self.items += 1
+            if item.error is not None:
+                self.failed += 1
+            yield item
+        self.finished_at = time.time()
+
+    def stats(self):
+        elapsed = (self.finished_at or time.time()) - (self.started_at or time.time())
+        return {
+            "items": self.items,
+            "failed": self.failed,
+            "elapsed": elapsed,
+            "per_second": self.items / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+def merge_updates(updates):
+    """
+    Groups (code, field, value) updates by insertion code, the last value of a field wins
+    """
+    merged = collections.OrderedDict()
+    for code, field, value in updates:
+        merged.setdefault(code, collections.OrderedDict())[field] = value
+    return merged
+
+
+def chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def publish_groups(insertions, codes, group_size=50, concurrency=4):
+    """
+    Publishes the codes in groups through publish_list, the codes of a group are joined by commas
+    in the url. Yields an ItemResult for each code.
+    """
+    def publish(group):
+        return check_response(insertions.publish_list(url_entry={'code': ",".join(str(code) for code in group)}))
+
+    for group, result, error in run_bounded(publish, chunks(codes, group_size), concurrency):
+        for code in group:
+            yield ItemResult(code, "publish", result, error)
+
+
+def bulk_publish(insertions, codes, group_size=50, concurrency=4):
+    """
+    Publishes many insertions with one publish_list call per group of `group_size` codes
+    """
+    return BulkReport(publish_groups(insertions, codes, group_size, concurrency))
+
+
+def bulk_update(insertions, updates, concurrency=8, publish=False, group_size=50):
+    """
+    Applies many (code, field, value) updates. The api updates one field per call, so updates are
+    merged by code: repeated fields are sent once and the fields of a code are sent one after the
+    other by the same worker, while different codes run in parallel. With `publish` the updated
+    insertions are then published in groups. Returns a BulkReport of ItemResults.
+    """
+    def update(item):
+        code, fields = item
+        return dict(
+            (name, check_response(insertions.update(url_entry={'code': code, 'name': name}, body=value)))
+            for name, value in fields.items()
+        )
+
+    def results():
+        updated = []
+        for (code, fields), result, error in run_bounded(update, merge_updates(updates).items(), concurrency):
+            if error is None:
+                updated.append(code)
+            yield ItemResult(code, "update", result, error)
+        if publish and updated:
+            for item in publish_groups(insertions, updated, group_size, concurrency):
+                yield item
+
+    return BulkReport(results())
+
+
+def unique(items):
+    seen = set()
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            yield item
+
+
+def bulk_step(handlings, step, codes, concurrency=8):
+    """
+    Moves many handlings to `step` (paid, unpaid, shipped), each code once. A 409 conflict means the
+    handling is already in that state and counts as done, with a None result. Returns a BulkReport
+    of ItemResults streamed as transitions complete.
+    """
+    transition = getattr(handlings.steps, step)
+
+    def move(code):
+        try:
+            return check_response(transition(url_entry={'code': code}))
+        except exceptions.ResourceConflict:
+            return None
+
+    def results():
+        for code, result, error in run_bounded(move, unique(codes), concurrency):
+            yield ItemResult(code, step, result, error)
+
+    return BulkReport(results())
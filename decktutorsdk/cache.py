@@ -0,0 +1,193 @@
+import collections
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .pagination import extract_items
+
+MISSING = object()
+
+
+class ResponseCache(object):
+    """
+    In memory TTL + LRU cache for GET responses.
+
+    Responses are stored serialized, so every hit returns a fresh copy and the memory used is
+    known: the least recently used entries are evicted once `max_entries` or `max_bytes` is exceeded.
+    """
+    def __init__(self, max_entries=1024, max_bytes=16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(method, url, params=None):
+        # json, params values can be lists
+        return json.dumps([method, url, params or {}], sort_keys=True, default=str)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.time():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self.hits += 1
+            # move to the end, last entries are the most recently used
+            self._entries[key] = self._entries.pop(key)
+        return json.loads(entry[1])
+
+    def set(self, key, value, ttl):
+        content = json.dumps(value)
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl, content)
+            self.size += len(content)
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        expires_at, content = self._entries.pop(key)
+        self.size -= len(content)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": self.size,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache(object):
+    """
+    Disk backed response cache shared by every process using the same file.
+
+    Usage::
+        api_factory.configure(username="user", password="pwd", cache=SQLiteCache("/var/cache/decktutor.db"))
+
+    The database runs in WAL mode so readers never block while another process writes, concurrent
+    writers wait up to `timeout` seconds for the lock. Expired entries are ignored on read and purged
+    every `purge_every` writes.
+    """
+    def __init__(self, path, timeout=30, purge_every=100):
+        self.path = path
+        self.timeout = timeout
+        self.purge_every = purge_every
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.connection().execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, expires_at REAL, content TEXT)"
+        )
+
+    def connection(self):
+        """
+        sqlite connections can't be shared between threads or forked processes, keep one for each
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def key(method, url, params=None):
+        return json.dumps([method, url, params or {}], sort_keys=True, default=str)
+
+    def get(self, key):
+        row = self.connection().execute(
+            "SELECT content FROM responses WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return MISSING
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        connection = self.connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO responses (key, expires_at, content) VALUES (?, ?, ?)",
+            (key, time.time() + ttl, json.dumps(value))
+        )
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % self.purge_every == 0
+        if purge:
+            self.purge()
+
+    def purge(self):
+        self.connection().execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+
+    def clear(self):
+        self.connection().execute("DELETE FROM responses")
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self),
+        }
+
+    def __len__(self):
+        return self.connection().execute(
+            "SELECT COUNT(*) FROM responses WHERE expires_at > ?", (time.time(),)
+        ).fetchone()[0]
+
+
+def warm(game, set_codes, decktutor=None):
+    """
+    Preloads the cache with the categories of every given expansion set of a game and the filters
+    of each category. Returns the number of calls made.
+    """
+    if decktutor is None:
+        from .decktutor import decktutor
+
+    calls = 0
+    for set_code in set_codes:
+        categories = decktutor.search.list_categories(url_entry={'game': game, 'code': set_code})
+        calls += 1
+        for category in extract_items(categories):
+            decktutor.search.list_filters(url_entry={'code': category['code']})
+            calls += 1
+    return calls
+
+
+def create_cache(options=None):
+    """
+    Build a response cache from Api options: None or False disable caching, True uses the defaults,
+    a dict is used as ResponseCache arguments and any other object is used as the cache itself
+    """
+    if options is None or options is False:
+        return None
+    if options is True:
+        return ResponseCache()
+    if isinstance(options, dict):
+        return ResponseCache(**options)
+    return options
@@ -0,0 +1,79 @@
+"""
+Overall deadlines of sdk calls, carried through token acquisition, retries and pagination:
+    decktutor.insertions.info(url_entry={'code': 123}, deadline=10)
+    for item in decktutor.search.self_serp.iter(body={...}, deadline=Deadline(60)):
+        ...
+
+Work left when the deadline has passed is not started and raises DeadlineExceeded, http timeouts
+are capped by the time left.
+"""
+import time
+
+from .exceptions import DeadlineExceeded
+
+# (connect, read) seconds of every http call, api_map entries and calls can give their own 'timeout'
+DEFAULT_TIMEOUT = (5, 60)
+
+clock = getattr(time, "monotonic", time.time)
+
+
+class Deadline(object):
+    """
+    Point in time, `seconds` from now, by which a call must be done
+    """
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = clock() + seconds
+
+    def remaining(self):
+        return self.expires_at - clock()
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self, what="call"):
+        """
+        Raises DeadlineExceeded once the deadline has passed
+        """
+        if self.expired:
+            raise DeadlineExceeded("Deadline of %ss exceeded before the %s" % (self.seconds, what))
+
+    def timeout(self, timeout=None):
+        """
+        Http timeout capped by the time left: a number or a (connect, read) tuple
+        """
+        remaining = max(self.remaining(), 0.001)
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if value is None else min(value, remaining) for value in timeout)
+        return min(timeout, remaining)
+
+    def allows(self, delay):
+        """
+        Whether waiting `delay` seconds still leaves time for a call
+        """
+        return delay < self.remaining()
+
+
+def create_deadline(options=None):
+    """
+    Build a deadline from call options: None has no deadline, a number of seconds starts one and
+    a Deadline is returned as is, to share it between calls
+    """
+    if options is None or isinstance(options, Deadline):
+        return options
+    return Deadline(options)
+
+
+def create_timeout(options=None):
+    """
+    Build the default http timeout of an api from its options: None uses DEFAULT_TIMEOUT, False
+    waits forever, a number or a (connect, read) tuple is used as is
+    """
+    if options is None:
+        return DEFAULT_TIMEOUT
+    if options is False:
+        return None
+    return options
@@ -1,7 +1,10 @@
+from .api import api_factory
 from .api_map import api_map as global_map
+from .deadline import create_deadline
+from .endpoints import compile_endpoint
 from .exceptions import MissingConfig
-from .resolvers import DefaultResolver
-from . import utils
+from .export import export
+from .pagination import Paginator, PrefetchPaginator, StreamingPaginator
 
 default_api_map = global_map["current"]["api"]
 
@@ -12,39 +15,111 @@ class Decktutor(object):
         decktutor.insertions.info(url_entry={'code':123}, params={'param1': 'abc', 'param2': 'def'})
     will call GET on http://dev.decktutor.com/ws-2.0/app/v2/insertions/123?param1=abc&param2=def
     """
-    def __init__(self, api_map=None, **kwargs):
+    def __init__(self, api_map=None, parent=None, name=None, **kwargs):
         """
-        Create a Decktutor object used to call resolvers
+        Create a Decktutor object used to call resolvers, `name` is its api_map path (insertions.info)
         """
         self.api_map = api_map
+        self.parent = parent
+        self.name = name
+        self._endpoint = None
 
     def __getattr__(self, name):
         if name not in self.api_map:
             raise MissingConfig("No sdk configuration found in api_map module for this call: " +
                                 name)
 
-        instance = Decktutor(api_map=self.api_map[name])
+        instance = self.get_child(self.api_map[name], name if self.name is None else self.name + "." + name)
         # Cache the instance for current name
         setattr(self, name, instance)
         return instance
 
+    def get_child(self, api_map, name=None):
+        return Decktutor(api_map=api_map, parent=self, name=name)
+
     def __call__(self, *args, **kwargs):
-        #'url' is intended for internal mapping use only
-        if 'url' not in self.api_map:
-            raise MissingConfig("Cannot perform this call. Url param missing.")
+        endpoint = self.endpoint
+        # operations run on the group they belong to, e.g. bulk_create on insertions
+        if endpoint.operation is not None:
+            return endpoint.operation(self.parent, *args, **kwargs)
 
-        return self.get_resolver().resolve(api_map=self.api_map, **kwargs)
+        return endpoint.resolver().resolve(api_map=self.api_map, **kwargs)
 
-    def get_resolver_class(self):
-        resolver_class = self.api_map.get('resolver')
-        if resolver_class is None:
-            return DefaultResolver
+    @property
+    def endpoint(self):
+        """
+        The api_map entry of this node compiled on first use, see decktutorsdk.endpoints
+        """
+        if self._endpoint is None:
+            self._endpoint = compile_endpoint(self.api_map, self.name)
+        return self._endpoint
 
-        return utils.load_class(resolver_class)
+    def iter(self, page_size=None, page=0, prefetch=0, stream=False, **kwargs):
+        """
+        Generator over the items of a paginated call, pages are fetched lazily:
+            for insertion in decktutor.search.self_serp.iter(body={...}, page_size=50):
+                ...
+        With `prefetch` > 0 the next `prefetch` pages are fetched concurrently in background,
+        with `stream` every page is streamed (see stream) and large pages cost no extra memory.
+        A `deadline` bounds the whole walk, not each page.
+        """
+        call = self.stream if stream else self
+        return iter(self.get_paginator(call, page_size=page_size, page=page, prefetch=prefetch, stream=stream,
+                                       **kwargs))
+
+    def stream(self, url_entry=None, page=None, page_size=None, **kwargs):
+        """
+        Iterator over the items of the response array, decoded one at a time while the response
+        is read, see Api.stream:
+            for insertion in decktutor.search.serp.stream(body={...}, page=0, page_size=5000):
+                ...
+        """
+        endpoint = self.endpoint
+        if endpoint.operation is not None:
+            raise MissingConfig("Cannot stream this call. It is an operation.")
+
+        resolver = endpoint.resolver()
+        resolver.setup(api_map=self.api_map, url_entry=url_entry, page_size=page_size)
+        options = resolver.request_kwargs(kwargs)
+        # streams are not cached nor measured by hooks
+        options.pop('cache_ttl', None)
+        options.pop('endpoint_name', None)
+        options.setdefault('items_key', self.api_map.get('items_key'))
+        return api_factory.get_instance(authenticate=resolver.authenticate).stream(
+            url=resolver.url, method=resolver.method, page_size=resolver.page_size, page=page, **options
+        )
+
+    def export(self, destination, format=None, batch_size=10000, columns=None, prefetch=2, **kwargs):
+        """
+        Writes every item of a paginated call to a csv, json lines, Arrow or Parquet file, see
+        decktutorsdk.export. Pages are prefetched so writing overlaps the network:
+            decktutor.search.self_serp.export("inventory.csv", body={...}, page_size=1000)
+        """
+        if not kwargs.get('stream'):
+            kwargs['prefetch'] = prefetch
+        return export(self.iter(**kwargs), destination, format=format, batch_size=batch_size, columns=columns)
+
+    def get_paginator(self, call, page_size=None, page=0, prefetch=0, stream=False, **kwargs):
+        if not self.api_map.get('paginated'):
+            raise MissingConfig("Cannot iterate this call. It is not paginated.")
+
+        page_size = self.api_map.get('page_size') or page_size or global_map["current"]["api_page_size"]
+        if kwargs.get('deadline') is not None:
+            # one deadline for the whole walk, pages fetched once it has passed raise DeadlineExceeded
+            kwargs['deadline'] = create_deadline(kwargs['deadline'])
+        fetch = lambda page, page_size: call(page=page, page_size=page_size, **kwargs)
+        items_key = self.api_map.get('items_key')
+        if stream:
+            return StreamingPaginator(fetch, page_size, items_key=items_key, page=page)
+        if prefetch:
+            return PrefetchPaginator(fetch, page_size, items_key=items_key, page=page, prefetch=prefetch)
+        return Paginator(fetch, page_size, items_key=items_key, page=page)
+
+    def get_resolver_class(self):
+        return self.endpoint.resolver_class
 
     def get_resolver(self):
-        resolver_class = self.get_resolver_class()
-        return resolver_class()
+        return self.endpoint.resolver()
 
 
 decktutor = Decktutor(api_map=default_api_map)
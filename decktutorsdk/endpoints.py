@@ -0,0 +1,122 @@
+"""
+api_map entries compiled once into Endpoint objects, so a call only builds its url:
+the resolver class is loaded, the url template parsed and the options collected up front.
+"""
+import operator
+import re
+import string
+
+from . import utils
+from .exceptions import MissingConfig, MissingParam
+
+# api_map entry keys forwarded to Api.request as per endpoint options
+REQUEST_OPTIONS = ('cache_ttl', 'retry', 'idempotent', 'timeout')
+
+DEFAULT_RESOLVER = 'decktutorsdk.resolvers.DefaultResolver'
+
+
+class Endpoint(object):
+    """
+    A compiled api_map entry. Entries with an 'operation' only hold the loaded operation.
+    The `name` of an entry (insertions.info) is given to Api.request as `endpoint_name`, for hooks.
+    """
+    __slots__ = ("name", "api_map", "url", "method", "resolver_class", "authenticate", "page_size",
+                 "has_page_size", "paginated", "options", "operation", "_pattern", "_fields", "_regex")
+
+    def __init__(self, api_map, name=None):
+        self.name = name
+        self.api_map = api_map
+        self.operation = utils.load_class(api_map['operation']) if 'operation' in api_map else None
+        self.url = api_map.get('url')
+        self.method = api_map.get('method')
+        self.resolver_class = None
+        self.authenticate = False
+        self.page_size = api_map.get('page_size')
+        self.has_page_size = 'page_size' in api_map
+        self.paginated = bool(api_map.get('paginated'))
+        self.options = dict((key, api_map[key]) for key in REQUEST_OPTIONS if key in api_map)
+        self._regex = None
+        if self.operation is not None:
+            return
+
+        if self.url is None or self.method is None:
+            raise Exception("Resolve must be called with a map with 'url' and 'method'")
+        self.resolver_class = utils.load_class(api_map.get('resolver') or DEFAULT_RESOLVER)
+        self.authenticate = getattr(self.resolver_class, 'authenticate', False)
+        self._pattern, self._fields = self.compile_url(self.url)
+
+    def resolver(self):
+        """
+        New resolver of this endpoint. Resolver classes are built with no argument, custom ones with
+        their own __init__ included, and are given the endpoint afterwards.
+        """
+        resolver = self.resolver_class()
+        resolver.endpoint = self
+        return resolver
+
+    @staticmethod
+    def compile_url(url):
+        """
+        Turns '/insertions/{code}/field/{name}' into ('/insertions/%s/field/%s', getter of code and name),
+        templates using format specs or conversions are kept for str.format
+        """
+        pattern = []
+        fields = []
+        for literal, field, spec, conversion in string.Formatter().parse(url):
+            pattern.append(literal.replace("%", "%%"))
+            if field is None:
+                continue
+            if spec or conversion or not field or not re.match(r"^\w+$", field):
+                return None, None
+            pattern.append("%s")
+            fields.append(field)
+        if not fields:
+            return url, ()
+        getter = operator.itemgetter(*fields)
+        if len(fields) == 1:
+            single = getter
+            getter = lambda url_entry: (single(url_entry),)
+        return "".join(pattern), getter
+
+    def build_url(self, url_entry=None):
+        try:
+            if self._fields is None:
+                return self.url.format(**(url_entry or {}))
+            if not self._fields:
+                return self._pattern
+            return self._pattern % self._fields(url_entry or {})
+        except KeyError as ke:
+            raise MissingParam("Missing url sdk parameter: '%s'" % ke.args[0])
+
+    @property
+    def regex(self):
+        """
+        Regular expression matching the paths of this endpoint, capturing the url parameters
+        """
+        if self._regex is None:
+            self._regex = re.compile("^%s$" % re.sub(r"\\{\w+\\}", "([^/]+)", re.escape(self.url)))
+        return self._regex
+
+
+def compile_endpoint(api_map, name=None):
+    """
+    Endpoint of an api_map entry, MissingConfig when the entry is a group of endpoints
+    """
+    if 'url' not in api_map and 'operation' not in api_map:
+        raise MissingConfig("Cannot perform this call. Url param missing.")
+    return Endpoint(api_map, name)
+
+
+def compile_api_map(tree, prefix=""):
+    """
+    Every endpoint of an api_map tree by dotted name: {'insertions.info': Endpoint, ...}
+    """
+    endpoints = {}
+    for name, entry in tree.items():
+        if not isinstance(entry, dict):
+            continue
+        if 'url' in entry or 'operation' in entry:
+            endpoints[prefix + name] = Endpoint(entry, prefix + name)
+        else:
+            endpoints.update(compile_api_map(entry, prefix + name + "."))
+    return endpoints
@@ -34,6 +34,13 @@ class MissingConfig(Exception):
     pass
 
 
+class DeadlineExceeded(Exception):
+    """
+    The deadline of a call passed before it could complete, it is never retried
+    """
+    pass
+
+
 class ClientError(ConnectionError):
     """
     4xx Client Error
@@ -90,6 +97,13 @@ class ResourceInvalid(ClientError):
     pass
 
 
+class TooManyRequests(ClientError):
+    """
+    429 Too Many Requests
+    """
+    pass
+
+
 class ServerError(ConnectionError):
     """
     5xx Server Error
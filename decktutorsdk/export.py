@@ -0,0 +1,273 @@
+"""
+Streaming export of paginated results to csv, json lines and, with pyarrow installed, Arrow or
+Parquet files:
+    decktutor.search.self_serp.export("inventory.parquet", body={"game": "mtg"}, page_size=1000)
+
+Items are written in record batches of `batch_size` as pages arrive, only one batch is held in
+memory. The columns are the keys of the first batch, later keys not in it are dropped.
+"""
+import csv
+import io
+import json
+import logging
+
+import six
+
+from .bulk import chunks
+from .exceptions import MissingConfig
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".parquet": "parquet",
+}
+
+
+def guess_format(destination):
+    name = getattr(destination, "name", destination)
+    if isinstance(name, six.string_types):
+        for extension, format in FORMATS.items():
+            if name.endswith(extension):
+                return format
+    raise MissingConfig("Cannot guess the export format of %r, pass format=" % (destination,))
+
+
+def as_row(item):
+    """
+    Plain dict of an item, typed models included
+    """
+    return item.to_dict() if hasattr(item, "to_dict") else item
+
+
+def infer_columns(rows):
+    """
+    Keys of the rows in order of first appearance
+    """
+    columns = []
+    seen = set()
+    for row in rows:
+        for key in row:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+    return columns
+
+
+def dump_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+class Writer(object):
+    """
+    Writes batches of rows with fixed columns to a path or to an open file
+    """
+    binary = False
+
+    def __init__(self, destination, columns):
+        self.columns = columns
+        self.rows = 0
+        self.owned = not hasattr(destination, "write")
+        if self.owned:
+            destination = io.open(destination, "wb") if self.binary else \
+                io.open(destination, "w", encoding="utf-8", newline="")
+        self.file = destination
+
+    def write(self, rows):
+        self.rows += len(rows)
+
+    def close(self):
+        if self.owned:
+            self.file.close()
+
+
+class CsvWriter(Writer):
+    """
+    One header line then one line per row, nested values as compact json
+    """
+    def __init__(self, destination, columns):
+        super(CsvWriter, self).__init__(destination, columns)
+        self.write_lines([columns])
+
+    def write(self, rows):
+        super(CsvWriter, self).write(rows)
+        self.write_lines([dump_value(row.get(column)) for column in self.columns] for row in rows)
+
+    def write_lines(self, lines):
+        """
+        Formats the lines in memory then writes them as text, the python 2 csv module only writes bytes
+        """
+        if six.PY2:
+            buffer = io.BytesIO()
+            lines = ([value.encode("utf-8") if isinstance(value, six.text_type) else value for value in line]
+                     for line in lines)
+        else:
+            buffer = io.StringIO()
+        csv.writer(buffer).writerows(lines)
+        text = buffer.getvalue()
+        self.file.write(text.decode("utf-8") if six.PY2 else text)
+
+
+class JsonLinesWriter(Writer):
+    """
+    One compact json object per line, with orjson when installed
+    """
+    binary = True
+
+    def write(self, rows):
+        super(JsonLinesWriter, self).write(rows)
+        lines = []
+        for row in rows:
+            row = dict((column, row.get(column)) for column in self.columns)
+            if orjson is not None:
+                lines.append(orjson.dumps(row, default=str))
+            else:
+                lines.append(json.dumps(row, separators=(",", ":"), default=str).encode("utf-8"))
+        self.file.write(b"\n".join(lines) + b"\n")
+
+
+class ArrowWriter(Writer):
+    """
+    Arrow ipc file of record batches, the schema is inferred from the first batch and every value of
+    that batch is written as is: nested values, mixed types and columns null in all of its rows are
+    stored as strings (nested values as json). The schema can't change once the file is open, later
+    values that don't fit their column (2.5 in an integer column) are written as nulls, with a warning.
+    """
+    def __init__(self, destination, columns):
+        if pyarrow is None:
+            raise MissingConfig("Arrow and Parquet exports need the pyarrow package")
+        self.columns = columns
+        self.rows = 0
+        self.destination = destination
+        self.schema = None
+        self.writer = None
+
+    @staticmethod
+    def infer_type(values):
+        try:
+            kind = pyarrow.array(values).type
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+            return pyarrow.string()
+        if pyarrow.types.is_null(kind) or pyarrow.types.is_nested(kind):
+            return pyarrow.string()
+        return kind
+
+    @staticmethod
+    def fits(value, kind):
+        try:
+            pyarrow.array([value], type=kind)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, TypeError, ValueError):
+            return False
+        return True
+
+    @staticmethod
+    def strings(values):
+        return pyarrow.array([value if value is None or isinstance(value, six.string_types) else
+                              json.dumps(value, default=str) for value in values], type=pyarrow.string())
+
+    def first_array(self, values):
+        """
+        Array of a column of the first batch, as a string column when its values don't fit the type
+        inferred for them
+        """
+        kind = self.infer_type(values)
+        if not pyarrow.types.is_string(kind):
+            try:
+                return pyarrow.array(values, type=kind)
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, TypeError, ValueError):
+                pass
+        return self.strings(values)
+
+    def convert(self, column, values, kind):
+        if pyarrow.types.is_string(kind):
+            return self.strings(values)
+        try:
+            return pyarrow.array(values, type=kind)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, TypeError, ValueError):
+            converted = [value if self.fits(value, kind) else None for value in values]
+            logging.warning("Export: %d values of column %r are not %s, written as nulls" % (
+                sum(1 for value, fitted in zip(values, converted) if fitted is None and value is not None),
+                column, kind))
+            return pyarrow.array(converted, type=kind)
+
+    def arrays(self, rows):
+        columns = [[row.get(column) for row in rows] for column in self.columns]
+        if self.schema is None:
+            arrays = [self.first_array(values) for values in columns]
+            self.schema = pyarrow.schema([(column, array.type) for column, array in zip(self.columns, arrays)])
+            return arrays
+        return [self.convert(column, values, self.schema.field(index).type)
+                for index, (column, values) in enumerate(zip(self.columns, columns))]
+
+    def open_writer(self, schema):
+        return pyarrow.ipc.new_file(self.destination, schema)
+
+    def write(self, rows):
+        self.rows += len(rows)
+        arrays = self.arrays(rows)
+        if self.writer is None:
+            self.writer = self.open_writer(self.schema)
+        self.write_record_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def write_record_batch(self, batch):
+        self.writer.write_batch(batch)
+
+    def close(self):
+        if self.writer is None:
+            self.writer = self.open_writer(pyarrow.schema([(column, pyarrow.string()) for column in self.columns]))
+        self.writer.close()
+
+
+class ParquetWriter(ArrowWriter):
+    """
+    Parquet file with one row group per batch
+    """
+    def open_writer(self, schema):
+        return pyarrow.parquet.ParquetWriter(self.destination, schema)
+
+    def write_record_batch(self, batch):
+        self.writer.write_table(pyarrow.Table.from_batches([batch]))
+
+
+WRITERS = {
+    "csv": CsvWriter,
+    "jsonl": JsonLinesWriter,
+    "arrow": ArrowWriter,
+    "parquet": ParquetWriter,
+}
+
+
+def export(items, destination, format=None, batch_size=10000, columns=None):
+    """
+    Writes `items` to `destination`, a path or an open file, in batches of `batch_size`.
+    The format is guessed from the extension when not given. Returns the number of rows written.
+    """
+    writer_class = WRITERS[format or guess_format(destination)]
+    writer = None
+    try:
+        for batch in chunks(items, batch_size):
+            rows = [as_row(item) for item in batch]
+            if writer is None:
+                writer = writer_class(destination, columns or infer_columns(rows))
+            writer.write(rows)
+        if writer is None:
+            writer = writer_class(destination, columns or [])
+    finally:
+        if writer is not None:
+            writer.close()
+    return writer.rows
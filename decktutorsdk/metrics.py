@@ -0,0 +1,192 @@
+"""
+Hooks called before and after every Api.request, with what is needed to measure the sdk:
+    collector = PrometheusCollector()
+    api_factory.configure(username="user", password="pwd", hooks=[collector])
+    ...
+    print(collector.render())
+
+A hook implements `before(request)` and/or `after(request)`, `request` being a RequestInfo.
+With no hook registered nothing is measured at all.
+"""
+import bisect
+import logging
+import threading
+import time
+
+from .exceptions import MissingConfig
+
+
+class RequestInfo(object):
+    """
+    One Api.request call: `name` is the api_map path (insertions.info), None for calls not made through
+    the decktutor tree. `status` and `bytes` belong to the last http response, `attempts` counts the
+    http calls made, `latency` is in seconds.
+    `cached` and `coalesced` calls made no http call of their own. `context` is free for hooks.
+    """
+    __slots__ = ("name", "method", "url", "status", "bytes", "attempts", "cached", "coalesced", "error",
+                 "started_at", "latency", "context")
+
+    def __init__(self, name, method, url):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.status = None
+        self.bytes = 0
+        self.attempts = 0
+        self.cached = False
+        self.coalesced = False
+        self.error = None
+        self.started_at = time.time()
+        self.latency = None
+        self.context = {}
+
+
+class Hook(object):
+    """
+    Base hook doing nothing, subclasses override what they need
+    """
+    def before(self, request):
+        pass
+
+    def after(self, request):
+        pass
+
+
+class Hooks(object):
+    """
+    The hooks registered on an api. A failing hook is logged and never breaks the call.
+    """
+    def __init__(self, hooks=None):
+        self.hooks = list(hooks or [])
+
+    def add(self, hook):
+        self.hooks.append(hook)
+
+    def __bool__(self):
+        return bool(self.hooks)
+
+    __nonzero__ = __bool__
+
+    def start(self, name, method, url):
+        request = RequestInfo(name, method, url)
+        self.notify("before", request)
+        return request
+
+    def finish(self, request, error=None):
+        request.error = error
+        request.latency = time.time() - request.started_at
+        self.notify("after", request)
+
+    def notify(self, event, request):
+        for hook in self.hooks:
+            try:
+                getattr(hook, event)(request)
+            except Exception:
+                logging.exception("Request hook %r failed on %s" % (hook, event))
+
+
+def create_hooks(options=None):
+    """
+    Build the hooks of an api from its options: a list of hooks or a Hooks instance, shared as is
+    """
+    if isinstance(options, Hooks):
+        return options
+    return Hooks(options)
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class PrometheusCollector(Hook):
+    """
+    In process request metrics, rendered in the Prometheus text format:
+    a latency histogram and counters of response bytes, retries, cache hits and coalesced calls,
+    labelled by endpoint, method and status.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS, prefix="decktutor"):
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def after(self, request):
+        labels = (request.name or "unknown", request.method,
+                  str(request.status) if request.status is not None else type(request.error).__name__)
+        with self._lock:
+            histogram = self.histograms.get(labels)
+            if histogram is None:
+                histogram = self.histograms[labels] = [[0] * len(self.buckets), 0, 0.0]
+            index = bisect.bisect_left(self.buckets, request.latency)
+            if index < len(self.buckets):
+                histogram[0][index] += 1
+            histogram[1] += 1
+            histogram[2] += request.latency
+            self.count("response_bytes_total", labels, request.bytes)
+            self.count("retries_total", labels, max(request.attempts - 1, 0))
+            self.count("cache_hits_total", labels, int(request.cached))
+            self.count("coalesced_total", labels, int(request.coalesced))
+
+    def count(self, name, labels, value):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    @staticmethod
+    def format_labels(labels, **extra):
+        pairs = list(zip(("endpoint", "method", "status"), labels)) + sorted(extra.items())
+        return "{%s}" % ",".join('%s="%s"' % (key, value) for key, value in pairs)
+
+    def render(self):
+        lines = []
+        name = "%s_request_duration_seconds" % self.prefix
+        with self._lock:
+            lines.append("# TYPE %s histogram" % name)
+            for labels, (counts, total, latency) in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    lines.append("%s_bucket%s %d" % (name, self.format_labels(labels, le=bound), cumulative))
+                lines.append("%s_bucket%s %d" % (name, self.format_labels(labels, le="+Inf"), total))
+                lines.append("%s_sum%s %f" % (name, self.format_labels(labels), latency))
+                lines.append("%s_count%s %d" % (name, self.format_labels(labels), total))
+            for counter in sorted(set(key[0] for key in self.counters)):
+                lines.append("# TYPE %s_%s counter" % (self.prefix, counter))
+                for (key, labels), value in sorted(self.counters.items()):
+                    if key == counter:
+                        lines.append("%s_%s%s %d" % (self.prefix, counter, self.format_labels(labels), value))
+        return "\n".join(lines) + "\n"
+
+
+class OpenTelemetryHook(Hook):
+    """
+    One client span for each request, from the given tracer or the opentelemetry global one
+    """
+    def __init__(self, tracer=None):
+        if tracer is None:
+            try:
+                from opentelemetry import trace
+            except ImportError:
+                raise MissingConfig("OpenTelemetryHook needs a tracer or the opentelemetry-api package")
+            tracer = trace.get_tracer("decktutorsdk")
+        self.tracer = tracer
+
+    def before(self, request):
+        request.context["span"] = self.tracer.start_span(
+            "decktutor %s" % (request.name or request.method),
+            attributes={"http.method": request.method, "http.url": request.url},
+        )
+
+    def after(self, request):
+        span = request.context.pop("span", None)
+        if span is None:
+            return
+        if request.status is not None:
+            span.set_attribute("http.status_code", request.status)
+        span.set_attribute("decktutor.endpoint", request.name or "")
+        span.set_attribute("decktutor.response_bytes", request.bytes)
+        span.set_attribute("decktutor.attempts", request.attempts)
+        span.set_attribute("decktutor.cached", request.cached)
+        span.set_attribute("decktutor.coalesced", request.coalesced)
+        if request.error is not None:
+            span.record_exception(request.error)
+        span.end()
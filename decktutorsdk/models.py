@@ -0,0 +1,152 @@
+"""
+Compact typed results, opt in:
+    for insertion in decktutor.search.self_serp.iter(body={...}, stream=True, loads=Insertion.from_json):
+        print(insertion.code, insertion.price, insertion.created_at)
+
+A model built from a streamed item keeps the raw json of the item and decodes it on the first field
+access, after which only the decoded values are kept; dates are parsed with utils.parse_datetime when
+read. Fields missing from the item are None, other keys are read with `model["key"]`.
+"""
+import six
+
+from . import utils
+from .streaming import default_loads
+
+
+class Field(object):
+    """
+    Attribute reading a model field by position, parsing dates on first access
+    """
+    __slots__ = ("name", "index", "date")
+
+    def __init__(self, name, index, date=False):
+        self.name = name
+        self.index = index
+        self.date = date
+
+    def __get__(self, model, owner):
+        if model is None:
+            return self
+        values = model.decode()
+        value = values[self.index]
+        if self.date and isinstance(value, six.string_types):
+            value = values[self.index] = utils.parse_datetime(value)
+        return value
+
+
+class ModelType(type):
+    """
+    Turns the `fields` of a model into Field attributes, models have no instance __dict__
+    """
+    def __new__(mcs, name, bases, namespace):
+        fields = namespace.get('fields', ())
+        dates = namespace.get('dates', ())
+        for index, field in enumerate(fields):
+            namespace[field] = Field(field, index, field in dates)
+        namespace['_index'] = dict((field, index) for index, field in enumerate(fields))
+        namespace.setdefault('__slots__', ())
+        return super(ModelType, mcs).__new__(mcs, name, bases, namespace)
+
+
+@six.add_metaclass(ModelType)
+class Model(object):
+    """
+    Base of the typed results: `fields` are read as attributes, the ones in `dates` as datetimes
+    """
+    __slots__ = ("_raw", "_values", "_extra")
+
+    fields = ()
+    dates = ()
+    loads = staticmethod(default_loads())
+
+    def __init__(self, raw=None, values=None, extra=None):
+        self._raw = raw
+        self._values = values
+        self._extra = extra
+
+    @classmethod
+    def from_json(cls, raw):
+        """
+        Model of a json item, not decoded until read: pass it as `loads` to stream or iter(stream=True)
+        """
+        return cls(raw=bytes(raw))
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Model of an already decoded item
+        """
+        extra = dict((key, value) for key, value in data.items() if key not in cls._index)
+        return cls(values=[data.get(field) for field in cls.fields], extra=extra or None)
+
+    @classmethod
+    def wrap(cls, items):
+        return [cls.from_dict(item) for item in items]
+
+    def decode(self):
+        """
+        Field values, decoding the raw json the first time
+        """
+        if self._values is None:
+            data = self.loads(self._raw)
+            self._values = [data.pop(field, None) for field in self.fields]
+            self._extra = data or None
+            self._raw = None
+        return self._values
+
+    def __getitem__(self, key):
+        if key in self._index:
+            return getattr(self, key)
+        self.decode()
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        """
+        The item as a plain dict, parsed dates back to iso strings. Fields missing from the item are
+        included as None.
+        """
+        values = self.decode()
+        data = dict((field, value.isoformat() if field in self.dates and hasattr(value, "isoformat") else value)
+                    for field, value in zip(self.fields, values))
+        data.update(self._extra or {})
+        return data
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "<%s %s>" % (type(self).__name__, self.code if 'code' in self._index else id(self))
+
+
+class Insertion(Model):
+    fields = ("code", "game", "category", "name", "expansion", "price", "quantity", "condition", "language",
+              "foil", "notes", "created_at", "updated_at")
+    dates = ("created_at", "updated_at")
+
+
+class Product(Model):
+    fields = ("code", "game", "category", "name", "expansion", "number", "rarity", "created_at")
+    dates = ("created_at",)
+
+
+class Handling(Model):
+    fields = ("code", "state", "seller", "buyer", "total", "currency", "items", "created_at", "updated_at",
+              "paid_at", "shipped_at")
+    dates = ("created_at", "updated_at", "paid_at", "shipped_at")
+
+
+class SearchHit(Model):
+    fields = ("code", "game", "name", "expansion", "price", "quantity", "condition", "language", "seller")
@@ -0,0 +1,104 @@
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+from . import exceptions
+
+
+def extract_items(response, items_key=None):
+    """
+    Returns the list of items contained in a page response.
+    A list response is the page itself, otherwise the list is read from `items_key` or,
+    when not configured, from the only list value of the response.
+    """
+    if isinstance(response, list):
+        return response
+    if not isinstance(response, dict):
+        return []
+    if "error" in response:
+        raise exceptions.BadRequest(None, response["error"])
+    if items_key is not None:
+        return response.get(items_key) or []
+    lists = [value for value in response.values() if isinstance(value, list)]
+    return lists[0] if len(lists) == 1 else []
+
+
+class Paginator(object):
+    """
+    Walks a paginated endpoint one page at a time, the next page is fetched only when the
+    previous one has been consumed and the walk stops on the first short page.
+
+    Usage::
+        paginator = Paginator(lambda page, page_size: api.request(url, "POST", page_size, page), 100)
+        for item in paginator:
+            ...
+    """
+    def __init__(self, fetch, page_size, items_key=None, page=0):
+        self.fetch = fetch
+        self.page_size = int(page_size)
+        self.items_key = items_key
+        self.page = page
+
+    def is_last(self, items):
+        return len(items) < self.page_size
+
+    def pages(self):
+        page = self.page
+        while True:
+            items = extract_items(self.fetch(page, self.page_size), self.items_key)
+            if items:
+                yield items
+            if self.is_last(items):
+                return
+            page += 1
+
+    def __iter__(self):
+        for items in self.pages():
+            for item in items:
+                yield item
+
+
+class PrefetchPaginator(Paginator):
+    """
+    Paginator keeping the next `prefetch` pages in flight on a thread pool while the current one
+    is consumed. Pages are still yielded in order and no new fetch starts once a short page marks
+    the end of the data. Every page in the window is already being fetched by then: up to
+    `prefetch` - 1 requests past the last page reach the server and their results are discarded.
+    """
+    def __init__(self, fetch, page_size, items_key=None, page=0, prefetch=4):
+        super(PrefetchPaginator, self).__init__(fetch, page_size, items_key=items_key, page=page)
+        self.prefetch = max(int(prefetch), 1)
+
+    def pages(self):
+        executor = ThreadPoolExecutor(max_workers=self.prefetch)
+        pending = collections.deque()
+        next_page = self.page
+        try:
+            while True:
+                while len(pending) < self.prefetch:
+                    pending.append(executor.submit(self.fetch, next_page, self.page_size))
+                    next_page += 1
+                items = extract_items(pending.popleft().result(), self.items_key)
+                if items:
+                    yield items
+                if self.is_last(items):
+                    return
+        finally:
+            # one worker per page in the window, the pending fetches are running and can't be cancelled
+            executor.shutdown(wait=False)
+
+
+class StreamingPaginator(Paginator):
+    """
+    Paginator over streamed pages: `fetch` returns an iterator over the items of a page, so
+    memory doesn't depend on the page size
+    """
+    def __iter__(self):
+        page = self.page
+        while True:
+            count = 0
+            for item in self.fetch(page, self.page_size):
+                count += 1
+                yield item
+            if count < self.page_size:
+                return
+            page += 1
@@ -0,0 +1,110 @@
+import threading
+import time
+
+
+class TokenBucket(object):
+    """
+    Token bucket refilled with `rate` tokens per second, holding at most `capacity` tokens.
+
+    `reserve` never blocks: it takes a token, possibly borrowing it from the future, and returns how
+    long the caller has to wait before using it. Threads sleep for it, coroutines await it. A caller
+    not willing to wait more than `max_delay` gets None instead, and no token is taken.
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.tokens = self.capacity
+        self.updated_at = time.time()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1, max_delay=None):
+        with self._lock:
+            now = time.time()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            delay = max(tokens - self.tokens, 0) / self.rate
+            if max_delay is not None and delay > max_delay:
+                return None
+            self.tokens -= tokens
+            return delay
+
+    def cancel(self, tokens=1):
+        """
+        Gives back reserved tokens that won't be used
+        """
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+
+class RateLimiter(object):
+    """
+    Client side rate limiting: a global bucket and optional buckets for endpoint groups, the first
+    segment of the api path (search, insertions, handlings, ...).
+
+    Usage::
+        limiter = RateLimiter(rate=20, groups={"search": 5, "insertions": {"rate": 10, "capacity": 30}})
+        api = Api(username="user", password="pwd", rate_limit=limiter)
+        limiter.stats()  # calls, delayed calls and total delay, globally and for each group
+    """
+    def __init__(self, rate=None, capacity=None, groups=None):
+        self.bucket = TokenBucket(rate, capacity) if rate else None
+        self.groups = {}
+        for name, options in (groups or {}).items():
+            options = options if isinstance(options, dict) else {"rate": options}
+            self.groups[name] = TokenBucket(**options)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, group=None, max_delay=None):
+        """
+        Seconds to wait before a call to `group`, None when it is longer than `max_delay`: then the
+        call is not counted and takes no token
+        """
+        delay = 0
+        if self.bucket is not None:
+            delay = self.bucket.reserve(max_delay=max_delay)
+            if delay is None:
+                return None
+        if group in self.groups:
+            group_delay = self.groups[group].reserve(max_delay=max_delay)
+            if group_delay is None:
+                if self.bucket is not None:
+                    self.bucket.cancel()
+                return None
+            delay = max(delay, group_delay)
+        with self._lock:
+            for name in (None, group) if group else (None,):
+                stats = self._stats.setdefault(name, {"calls": 0, "delayed": 0, "delay": 0.0})
+                stats["calls"] += 1
+                if delay > 0:
+                    stats["delayed"] += 1
+                    stats["delay"] += delay
+        return delay
+
+    def wait(self, group=None, max_delay=None):
+        """
+        Blocks until a call to `group` is allowed, returns the seconds waited or None, right away, when
+        it would be longer than `max_delay`
+        """
+        delay = self.reserve(group, max_delay)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats.get(None, {"calls": 0, "delayed": 0, "delay": 0.0}))
+            stats["groups"] = dict((name, dict(value)) for name, value in self._stats.items() if name)
+        return stats
+
+
+def create_rate_limiter(options=None):
+    """
+    Build a rate limiter from Api options: None disables it, a dict is used as RateLimiter arguments
+    and a RateLimiter is returned as is
+    """
+    if options is None or options is False:
+        return None
+    if isinstance(options, dict):
+        return RateLimiter(**options)
+    return options
@@ -0,0 +1,180 @@
+"""
+Recording of api responses, on by default in sandbox mode:
+    api_factory.configure(username="user", password="pwd", record={"directory": "/var/log/decktutor",
+                                                                   "compress": True})
+
+Responses are queued and written by a background thread as one compact json line each, the
+request thread never waits for the disk. When the queue is full responses are dropped.
+"""
+import atexit
+import datetime
+import gzip
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from six.moves import queue
+
+
+class ResponseRecorder(object):
+    """
+    Writes {"time", "method", "url", "response"} lines to `directory`/responses.jsonl, gzipped with
+    `compress`. The file is rotated once it exceeds `max_bytes`, keeping `backups` old files
+    (responses.1.jsonl is the most recent).
+
+    Responses are serialized by the writer thread: a response changed by the caller right after
+    the call may be recorded changed. Write errors are logged and counted, never raised.
+    """
+    def __init__(self, directory=None, max_bytes=64 * 1024 * 1024, backups=5, compress=False, queue_size=1000):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "decktutorsdk")
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.compress = compress
+        self.recorded = 0
+        self.dropped = 0
+        self.errors = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._file = None
+        self._raw = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self.file_path(0)
+
+    def file_path(self, index):
+        name = "responses.%d.jsonl" % index if index else "responses.jsonl"
+        return os.path.join(self.directory, name + (".gz" if self.compress else ""))
+
+    def record(self, method, url, response):
+        """
+        Queues a response, never blocks: with the queue full the response is dropped
+        """
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(("record", (datetime.datetime.utcnow(), method, url, response)))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.run, name="decktutor-recorder")
+            self._thread.daemon = True
+            self._thread.start()
+        atexit.register(self.close)
+
+    def run(self):
+        while True:
+            action, item = self._queue.get()
+            if action == "stop":
+                break
+            try:
+                if action == "flush":
+                    if self._file is not None:
+                        self._file.flush()
+                    item.set()
+                    continue
+                self.write(*item)
+                if self._queue.empty():
+                    self._file.flush()
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                logging.exception("Cannot record the response of %s" % item[2])
+        self.close_file()
+
+    def write(self, recorded_at, method, url, response):
+        line = json.dumps({"time": recorded_at.isoformat(), "method": method, "url": url, "response": response},
+                          separators=(",", ":"))
+        if self._file is None:
+            self.open_file()
+        self._file.write(line.encode("utf-8") + b"\n")
+        self.recorded += 1
+        if self._raw.tell() >= self.max_bytes:
+            self.rotate()
+
+    def open_file(self):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        self._raw = open(self.path, "ab")
+        self._file = gzip.GzipFile(fileobj=self._raw, mode="ab") if self.compress else self._raw
+
+    def close_file(self):
+        if self._file is not None:
+            self._file.close()
+            if self._raw is not self._file:
+                self._raw.close()
+            self._file = self._raw = None
+
+    def rotate(self):
+        self.close_file()
+        for index in range(self.backups, 0, -1):
+            source = self.file_path(index - 1)
+            if os.path.exists(source):
+                if index == self.backups and os.path.exists(self.file_path(index)):
+                    os.remove(self.file_path(index))
+                os.rename(source, self.file_path(index))
+        if self.backups == 0:
+            os.remove(self.path)
+
+    def flush(self, timeout=None):
+        """
+        Waits until the responses queued so far are written, returns False on timeout
+        """
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self, timeout=5):
+        """
+        Writes the queued responses and stops the writer thread
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(("stop", None))
+        thread.join(timeout)
+
+    def stats(self):
+        return {"recorded": self.recorded, "dropped": self.dropped, "errors": self.errors,
+                "queued": self._queue.qsize()}
+
+
+_default_recorder = None
+
+
+def default_recorder():
+    """
+    The recorder shared by sandbox apis configured without a `record` option
+    """
+    global _default_recorder
+    if _default_recorder is None:
+        _default_recorder = ResponseRecorder()
+    return _default_recorder
+
+
+def create_recorder(options=None, mode="sandbox"):
+    """
+    Build a response recorder from Api options: None records in sandbox mode only, False disables
+    recording, True uses the defaults, a dict is used as ResponseRecorder arguments and a
+    ResponseRecorder is returned as is
+    """
+    if options is None:
+        return default_recorder() if mode == "sandbox" else None
+    if options is False:
+        return None
+    if options is True:
+        return ResponseRecorder()
+    if isinstance(options, dict):
+        return ResponseRecorder(**options)
+    return options
@@ -1,27 +1,51 @@
 from .api import api_factory
-from decktutorsdk.exceptions import MissingParam
+from .endpoints import Endpoint
 
 
 class BaseResolver(object):
     """
     Basic resolver Mixin.
+    Resolvers are built with no argument, dispatch then sets the compiled `endpoint` they resolve.
     """
+    authenticate = False
+    endpoint = None
+
+    def __init__(self, endpoint=None):
+        """
+        `endpoint` is the compiled api_map entry, resolvers built without one compile the map they get
+        """
+        self.endpoint = endpoint
 
     def setup(self, api_map=None, url_entry=None, page_size=None):
         if api_map is None:
             raise Exception("Resolve must be called with 'api_map' argument")
-        elif api_map.get('url') is None or api_map.get('method') is None:
-            raise Exception("Resolve must be called with a map with 'url' and 'method'")
 
-        url, method = api_map['url'], api_map['method']
-        url_entry = url_entry or {}
-        try:
-            url = url.format(**url_entry)
-        except KeyError as ke:
-            raise MissingParam("Missing url sdk parameter: '%s'" % ke.message)
-        self.url = url
-        self.method = method
-        self.page_size = api_map.get('page_size', page_size)
+        endpoint = self.endpoint
+        if endpoint is None or endpoint.api_map is not api_map:
+            endpoint = Endpoint(api_map)
+        self.url = endpoint.build_url(url_entry)
+        self.method = endpoint.method
+        self.page_size = endpoint.page_size if endpoint.has_page_size else page_size
+        self.options = endpoint.options
+        self.name = endpoint.name
+
+    def request_kwargs(self, kwargs):
+        """
+        Per endpoint options declared in the api_map, overridden by the ones given to the call, and
+        the api_map path of the endpoint when it has one
+        """
+        options = dict(self.options)
+        if self.name is not None:
+            options['endpoint_name'] = self.name
+        options.update(kwargs)
+        return options
+
+    def resolve(self, api_map=None, url_entry=None, page=None, page_size=None, **kwargs):
+        self.setup(api_map=api_map, url_entry=url_entry, page_size=page_size)
+
+        return api_factory.get_instance(authenticate=self.authenticate).request(
+            url=self.url, method=self.method, page_size=self.page_size, page=page, **self.request_kwargs(kwargs)
+        )
 
 
 class DefaultResolver(BaseResolver):
@@ -32,12 +56,7 @@ class DefaultResolver(BaseResolver):
             api_map={'url':'/{id}', 'method':'POST'}, url_entry={'id':123}, body={''}, params={''}
         ).resolve()
     """
-    def resolve(self, api_map=None, url_entry=None, page=None, page_size=None, **kwargs):
-        self.setup(api_map=api_map, url_entry=url_entry, page_size=page_size)
-
-        return api_factory.get_instance(authenticate=False).request(
-            url=self.url, method=self.method, page_size=self.page_size, page=page, **kwargs
-        )
+    authenticate = False
 
 
 class AuthResolver(BaseResolver):
@@ -48,9 +67,4 @@ class AuthResolver(BaseResolver):
             api_map={'url':'/authd/{id}', 'method':'POST'}, url_entry={'id':123}, body={''}, params={''}
         ).resolve()
     """
-    def resolve(self, api_map=None, url_entry=None, page=None, page_size=None, **kwargs):
-        self.setup(api_map=api_map, url_entry=url_entry, page_size=page_size)
-
-        return api_factory.get_instance(authenticate=True).request(
-            url=self.url, method=self.method, page_size=self.page_size, page=page, **kwargs
-        )
\ No newline at end of file
+    authenticate = True
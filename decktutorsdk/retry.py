@@ -0,0 +1,86 @@
+import email.utils
+import random
+import time
+
+import requests
+
+from . import exceptions
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+# errors worth a new attempt: transient server errors, throttling and broken connections
+RETRYABLE_ERRORS = (
+    exceptions.ServerError,
+    exceptions.TooManyRequests,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
+
+class RetryPolicy(object):
+    """
+    When and how long to wait before retrying a failed call.
+
+    Idempotent calls (by method, or declared with 'idempotent' in the api_map) are retried on
+    RETRYABLE_ERRORS up to `max_attempts` times with exponential backoff and full jitter, or after the
+    delay asked by a Retry-After header. Other calls are only retried when throttled with a 429,
+    which the server sends before doing anything.
+    """
+    def __init__(self, max_attempts=3, backoff=0.5, max_backoff=30, jitter=True):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+    def should_retry(self, method, error, attempt, idempotent=None):
+        if attempt >= self.max_attempts or not isinstance(error, RETRYABLE_ERRORS):
+            return False
+        if isinstance(error, exceptions.TooManyRequests):
+            return True
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        return idempotent
+
+    def delay(self, attempt, error=None):
+        """
+        Seconds to wait before the attempt following `attempt` (1 based)
+        """
+        retry_after = self.retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        backoff = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+    @staticmethod
+    def retry_after(error):
+        """
+        Delay in seconds asked by the Retry-After header of the error response, if any
+        """
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        value = headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            date = email.utils.parsedate_tz(value)
+            if date is None:
+                return None
+            return max(email.utils.mktime_tz(date) - time.time(), 0)
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+def create_retry_policy(options=None, default=None):
+    """
+    Build a retry policy from Api or api_map options: None returns `default`, False disables
+    retries, a dict is used as RetryPolicy arguments and a RetryPolicy is returned as is
+    """
+    if options is None:
+        return default if default is not None else RetryPolicy()
+    if options is False:
+        return NO_RETRY
+    if isinstance(options, dict):
+        return RetryPolicy(**options)
+    return options
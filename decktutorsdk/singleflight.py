@@ -0,0 +1,77 @@
+import copy
+import threading
+
+from .exceptions import DeadlineExceeded
+
+
+class _Call(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Coalesces identical concurrent calls: while a call for a key is in flight, callers asking for
+    the same key wait for it and receive its result, or its exception, instead of making their own.
+
+    Nothing is kept once a call completes, so it never returns stale data. Waiting callers get a
+    copy of the result, callers mutating their response can't affect each other.
+
+    A caller with a `deadline` waits no longer than it allows. The deadline of the call in flight is
+    its own: when it runs out, waiting callers make the call again instead of sharing the error.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.deduplicated = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, deadline=None):
+        with self._lock:
+            self.calls += 1
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+            else:
+                self.deduplicated += 1
+
+        if not leader:
+            if not call.done.wait(None if deadline is None else max(deadline.remaining(), 0)):
+                raise DeadlineExceeded("Deadline of %ss exceeded waiting for the identical call in flight"
+                                       % deadline.seconds)
+            if isinstance(call.error, DeadlineExceeded):
+                return self.do(key, func, deadline)
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "deduplicated": self.deduplicated, "in_flight": len(self._in_flight)}
+
+
+def create_single_flight(options=None):
+    """
+    Build the coalescing layer from Api options: None or True enable it, False disables it and a
+    SingleFlight is returned as is, to share it between apis
+    """
+    if options is False:
+        return None
+    if options is None or options is True:
+        return SingleFlight()
+    return options
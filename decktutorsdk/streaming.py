@@ -0,0 +1,155 @@
+"""
+Streaming decoding of json responses: the items of the response array are parsed one at a time
+while the body is read, so memory depends on the size of an item and not of the response.
+
+Usage::
+    for insertion in decktutor.search.serp.stream(body={...}, page_size=5000):
+        ...
+"""
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SPECIAL = re.compile(br'[\[\]{}",:]')
+STRING_SPECIAL = re.compile(br'["\\]')
+WHITESPACE = b" \t\r\n"
+
+SEARCH, ITEMS, DONE = range(3)
+
+
+def default_loads():
+    """
+    orjson when installed, the standard json module otherwise
+    """
+    if orjson is not None:
+        return orjson.loads
+    return lambda content: json.loads(content.decode("utf-8"))
+
+
+class ItemParser(object):
+    """
+    Incremental parser yielding the items of the array of a json document fed in chunks.
+
+    The array is the document itself when it is a list, otherwise the `items_key` value of the
+    document object or, without `items_key`, its first array value. Only the item being read is
+    kept in memory, items are decoded with `loads` (see default_loads).
+
+    Usage::
+        parser = ItemParser(items_key="results")
+        for chunk in chunks:
+            for item in parser.feed(chunk):
+                ...
+    """
+    def __init__(self, items_key=None, loads=None):
+        self.items_key = items_key.encode("utf-8") if items_key is not None else None
+        self.loads = loads or default_loads()
+        self.state = SEARCH
+        self.depth = 0
+        self.items_depth = None
+        self.in_string = False
+        self.escape = False
+        self.expect_key = False
+        self.last_key = None
+        # bytes of the item (or object key) being read, from the previous chunks and this one
+        self.capture = None
+        self.capture_start = 0
+
+    def start_capture(self, position):
+        self.capture = bytearray()
+        self.capture_start = position
+
+    def end_capture(self, chunk, position):
+        captured = self.capture + chunk[self.capture_start:position]
+        self.capture = None
+        return captured
+
+    def item(self, chunk, position, items):
+        content = bytes(self.end_capture(chunk, position)).strip(WHITESPACE)
+        if content:
+            items.append(self.loads(content))
+
+    def is_target(self):
+        if self.depth == 0:
+            return True
+        return self.depth == 1 and (self.items_key is None or self.last_key == self.items_key)
+
+    def feed(self, chunk):
+        """
+        Parses a chunk, returning the items completed by it
+        """
+        items = []
+        position = 0
+        end = len(chunk)
+        if self.state == DONE:
+            return items
+        if self.escape:
+            self.escape = False
+            position = 1
+
+        while position < end:
+            if self.in_string:
+                match = STRING_SPECIAL.search(chunk, position)
+                if match is None:
+                    break
+                if match.group() == b"\\":
+                    position = match.end() + 1
+                    self.escape = position > end
+                    continue
+                self.in_string = False
+                position = match.end()
+                if self.capture is not None and self.state == SEARCH:
+                    self.last_key = bytes(self.end_capture(chunk, position - 1))
+                continue
+
+            match = SPECIAL.search(chunk, position)
+            if match is None:
+                break
+            char = match.group()
+            position = match.end()
+            if char == b'"':
+                self.in_string = True
+                if self.state == SEARCH and self.depth == 1 and self.expect_key:
+                    self.start_capture(position)
+            elif char in b"[{":
+                if self.state == SEARCH and char == b"[" and self.is_target():
+                    self.state = ITEMS
+                    self.items_depth = self.depth + 1
+                    self.start_capture(position)
+                self.depth += 1
+                self.expect_key = char == b"{" and self.depth == 1
+            elif char in b"]}":
+                if self.state == ITEMS and self.depth == self.items_depth:
+                    self.item(chunk, position - 1, items)
+                    self.state = DONE
+                    return items
+                self.depth -= 1
+            elif char == b",":
+                if self.state == ITEMS and self.depth == self.items_depth:
+                    self.item(chunk, position - 1, items)
+                    self.start_capture(position)
+                elif self.depth == 1:
+                    self.expect_key = True
+            elif char == b":" and self.depth == 1:
+                self.expect_key = False
+
+        if self.capture is not None:
+            self.capture += chunk[self.capture_start:]
+            self.capture_start = 0
+        return items
+
+
+def iter_items(response, items_key=None, chunk_size=64 * 1024, loads=None):
+    """
+    Items of a streamed requests response, the response is closed once done
+    """
+    parser = ItemParser(items_key, loads)
+    try:
+        for chunk in response.iter_content(chunk_size):
+            for item in parser.feed(chunk):
+                yield item
+    finally:
+        response.close()
@@ -0,0 +1,152 @@
+"""
+Incremental sync of the seller inventory against a local snapshot:
+    sync = InventorySync("/var/lib/decktutor/inventory.db")
+    for change in sync.run(body={"game": "mtg"}):
+        print(change.kind, change.code, change.details)
+
+Own insertions are walked page by page through search.self_serp, only rows whose summary changed
+since the previous run are fetched with insertions.page.
+"""
+import collections
+import hashlib
+import json
+import sqlite3
+
+from .bulk import check_response, run_bounded
+
+ADDED = "added"
+CHANGED = "changed"
+REMOVED = "removed"
+
+Change = collections.namedtuple("Change", "kind code summary details error")
+
+
+def summary_hash(row):
+    content = json.dumps(row, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.md5(content.encode("utf-8")).hexdigest()
+
+
+class Snapshot(object):
+    """
+    On disk snapshot of own insertions: code, summary hash, price and quantity, one sqlite row each
+    """
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS insertions "
+            "(code TEXT PRIMARY KEY, hash TEXT, price REAL, quantity INTEGER, run INTEGER)"
+        )
+
+    def begin(self):
+        """
+        Starts a run, returning its number. Rows not seen by the run are the removed ones.
+        """
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection.execute("SELECT COALESCE(MAX(run), 0) + 1 FROM insertions").fetchone()[0]
+
+    def commit(self):
+        self.connection.execute("COMMIT")
+
+    def rollback(self):
+        self.connection.execute("ROLLBACK")
+
+    def get_hash(self, code):
+        row = self.connection.execute("SELECT hash FROM insertions WHERE code = ?", (code,)).fetchone()
+        return row[0] if row else None
+
+    def seen(self, code, run, hash=None, price=None, quantity=None):
+        """
+        Marks `code` as seen by `run`, storing its summary when given
+        """
+        if hash is None:
+            self.connection.execute("UPDATE insertions SET run = ? WHERE code = ?", (run, code))
+        else:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO insertions (code, hash, price, quantity, run) VALUES (?, ?, ?, ?, ?)",
+                (code, hash, price, quantity, run)
+            )
+
+    def unseen(self, run):
+        return self.connection.execute(
+            "SELECT code, price, quantity FROM insertions WHERE run < ?", (run,)
+        ).fetchall()
+
+    def remove(self, run):
+        self.connection.execute("DELETE FROM insertions WHERE run < ?", (run,))
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM insertions").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+
+class InventorySync(object):
+    """
+    Emits the insertions added, changed or removed since the previous run.
+
+    A run streams search.self_serp pages, so memory stays bounded by the page size, and calls
+    insertions.page only for added or changed rows, `concurrency` at a time. The snapshot is updated
+    in a single transaction committed when the walk completes: an interrupted run leaves it
+    untouched and its changes are emitted again by the next run. A row whose page can't be fetched
+    is emitted with the error and kept as changed for the next run.
+    """
+    def __init__(self, path, decktutor=None, code_key="code", price_key="price", quantity_key="quantity",
+                 page_size=None, prefetch=0, concurrency=4, fetch_details=True):
+        if decktutor is None:
+            from .decktutor import decktutor
+
+        self.decktutor = decktutor
+        self.snapshot = Snapshot(path)
+        self.code_key = code_key
+        self.price_key = price_key
+        self.quantity_key = quantity_key
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.concurrency = concurrency
+        self.fetch_details = fetch_details
+
+    def run(self, **kwargs):
+        """
+        Generator of Changes, keyword arguments are passed to search.self_serp
+        """
+        run = self.snapshot.begin()
+        try:
+            for change in self.walk(run, **kwargs):
+                yield change
+            for code, price, quantity in self.snapshot.unseen(run):
+                summary = {self.code_key: code, self.price_key: price, self.quantity_key: quantity}
+                yield Change(REMOVED, code, summary, None, None)
+            self.snapshot.remove(run)
+        except BaseException:
+            self.snapshot.rollback()
+            raise
+        self.snapshot.commit()
+
+    def walk(self, run, **kwargs):
+        for (kind, code, row, row_hash), details, error in run_bounded(
+                self.details, self.changed_rows(run, **kwargs), self.concurrency):
+            # a failed row is stored without its hash, so it shows up as changed next time
+            self.snapshot.seen(code, run, row_hash if error is None else "",
+                               row.get(self.price_key), row.get(self.quantity_key))
+            yield Change(kind, code, row, details, error)
+
+    def changed_rows(self, run, **kwargs):
+        rows = self.decktutor.search.self_serp.iter(page_size=self.page_size, prefetch=self.prefetch, **kwargs)
+        for row in rows:
+            code = str(row[self.code_key])
+            row_hash = summary_hash(row)
+            stored = self.snapshot.get_hash(code)
+            if stored == row_hash:
+                self.snapshot.seen(code, run)
+            else:
+                yield ADDED if stored is None else CHANGED, code, row, row_hash
+
+    def details(self, changed):
+        if not self.fetch_details:
+            return None
+        return check_response(self.decktutor.insertions.page(url_entry={'code': changed[1]}))
+
+    def close(self):
+        self.snapshot.close()
@@ -0,0 +1,344 @@
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import struct
+import threading
+import time
+
+from . import utils
+from .deadline import clock
+from .exceptions import DeadlineExceeded
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+def poll(attempt, timeout, interval=0.01):
+    """
+    Calls `attempt` until it returns True, for at most `timeout` seconds: timed waits that work
+    on python 2 too. Returns whether `attempt` succeeded.
+    """
+    expires_at = clock() + timeout
+    while not attempt():
+        remaining = expires_at - clock()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
+    return True
+
+
+class TokenStore(object):
+    """
+    Base token store: keeps a token and the last used sequence number for each key.
+
+    Subclasses implement `read`/`write` of the whole {key: {"token": ..., "sequence": ...}} mapping and
+    `acquire`/`release` of the named locks excluding every other user of the store, threads and
+    processes alike: "data" guards read/write, "login" serializes logins without blocking data access.
+    `lock()` is reentrant for the thread holding it, `acquire` gives up after `timeout` seconds when
+    one is given. Timed waits poll every `poll_interval` seconds.
+    """
+    lock_names = ("data", "login")
+    poll_interval = 0.01
+
+    def __init__(self):
+        self._thread_locks = dict((name, threading.RLock()) for name in self.lock_names)
+        self._depth = dict((name, 0) for name in self.lock_names)
+
+    def acquire(self, name, timeout=None):
+        return True
+
+    def release(self, name):
+        pass
+
+    def read(self):
+        raise NotImplementedError
+
+    def write(self, data):
+        raise NotImplementedError
+
+    @contextlib.contextmanager
+    def lock(self, name="data", timeout=None):
+        """
+        Holds the lock `name`, raising DeadlineExceeded when it can't be taken within `timeout` seconds
+        """
+        expires_at = None if timeout is None else clock() + timeout
+        thread_lock = self._thread_locks[name]
+        if timeout is None:
+            thread_lock.acquire()
+        elif not poll(lambda: thread_lock.acquire(False), timeout, self.poll_interval):
+            raise DeadlineExceeded("Timed out waiting for the %s lock of the token store" % name)
+        try:
+            if self._depth[name] == 0:
+                if not self.acquire(name, None if expires_at is None else max(expires_at - clock(), 0)):
+                    raise DeadlineExceeded("Timed out waiting for the %s lock of the token store" % name)
+            self._depth[name] += 1
+            try:
+                yield
+            finally:
+                self._depth[name] -= 1
+                if self._depth[name] == 0:
+                    self.release(name)
+        finally:
+            thread_lock.release()
+
+    def load(self, key):
+        with self.lock():
+            return self.read().get(key, {}).get("token")
+
+    def save(self, key, token):
+        with self.lock():
+            data = self.read()
+            data.setdefault(key, {})["token"] = token
+            self.write(data)
+
+    def next_sequence(self, key, floor=0):
+        """
+        Returns a sequence number greater than `floor` and than any number returned for `key` before
+        """
+        with self.lock():
+            data = self.read()
+            entry = data.setdefault(key, {})
+            sequence = max(entry.get("sequence", 0), floor) + 1
+            entry["sequence"] = sequence
+            self.write(data)
+            return sequence
+
+
+class MemoryTokenStore(TokenStore):
+    """
+    Token store shared by the apis of the current process
+    """
+    def __init__(self):
+        super(MemoryTokenStore, self).__init__()
+        self._data = {}
+
+    def read(self):
+        return self._data
+
+    def write(self, data):
+        self._data = data
+
+    def load(self, key):
+        # single dict lookups are atomic, no lock needed on the hot path
+        return self._data.get(key, {}).get("token")
+
+    def next_sequence(self, key, floor=0):
+        with self._thread_locks["data"]:
+            entry = self._data.setdefault(key, {})
+            sequence = max(entry.get("sequence", 0), floor) + 1
+            entry["sequence"] = sequence
+            return sequence
+
+
+def private_open(path, flags):
+    """
+    File descriptor of `path` opened for writing, created readable by its owner only
+    """
+    return os.open(path, os.O_WRONLY | os.O_CREAT | flags, 0o600)
+
+
+class FileTokenStore(TokenStore):
+    """
+    Token store in a json file, shared by every process on the host.
+    Locks are exclusive flocks on `path`.data.lock and `path`.login.lock, the file is replaced atomically.
+    The files hold token secrets and are only readable by their owner.
+    """
+    def __init__(self, path):
+        if fcntl is None:
+            raise NotImplementedError("FileTokenStore requires fcntl file locks")
+        super(FileTokenStore, self).__init__()
+        self.path = path
+        self._lock_files = {}
+
+    def acquire(self, name, timeout=None):
+        lock_file = os.fdopen(private_open("%s.%s.lock" % (self.path, name), os.O_APPEND), "a")
+        if timeout is None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        elif not poll(lambda: self.try_flock(lock_file), timeout, self.poll_interval):
+            lock_file.close()
+            return False
+        self._lock_files[name] = lock_file
+        return True
+
+    @staticmethod
+    def try_flock(lock_file):
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except (IOError, OSError):
+            return False
+        return True
+
+    def release(self, name):
+        lock_file = self._lock_files.pop(name)
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+    def read(self):
+        try:
+            with open(self.path) as token_file:
+                return json.load(token_file)
+        except (IOError, ValueError):
+            return {}
+
+    def write(self, data):
+        temp_path = "%s.%s.tmp" % (self.path, os.getpid())
+        with os.fdopen(private_open(temp_path, os.O_TRUNC), "w") as token_file:
+            json.dump(data, token_file)
+        os.rename(temp_path, self.path)
+
+
+class SharedMemoryTokenStore(TokenStore):
+    """
+    Token store in a named shared memory block (python 3.8+).
+    Create it before starting a process pool: the multiprocessing locks are inherited by the workers,
+    which attach to the same block by name.
+    """
+    header = struct.Struct("I")
+
+    def __init__(self, name="decktutor-tokens", size=64 * 1024, locks=None):
+        if shared_memory is None:
+            raise NotImplementedError("SharedMemoryTokenStore requires python 3.8+")
+        super(SharedMemoryTokenStore, self).__init__()
+        self.name = name
+        self.size = size
+        self.process_locks = locks or dict((name, multiprocessing.Lock()) for name in self.lock_names)
+        try:
+            self.memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.header.pack_into(self.memory.buf, 0, 0)
+        except FileExistsError:
+            self.memory = shared_memory.SharedMemory(name=name)
+
+    def acquire(self, name, timeout=None):
+        return self.process_locks[name].acquire(True, timeout)
+
+    def release(self, name):
+        self.process_locks[name].release()
+
+    def read(self):
+        length = self.header.unpack_from(self.memory.buf, 0)[0]
+        if not length:
+            return {}
+        start = self.header.size
+        return json.loads(bytes(self.memory.buf[start:start + length]).decode("utf-8"))
+
+    def write(self, data):
+        content = json.dumps(data).encode("utf-8")
+        start = self.header.size
+        if start + len(content) > self.size:
+            raise ValueError("Token store is full, increase SharedMemoryTokenStore size")
+        self.memory.buf[start:start + len(content)] = content
+        self.header.pack_into(self.memory.buf, 0, len(content))
+
+    def close(self, unlink=False):
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+
+class TokenManager(object):
+    """
+    Keeps the auth token of an api in a token store and refreshes it through the `login` callable.
+
+    Only one login runs at a time for each store key: callers needing a new token wait for the one
+    in flight and reuse its result, in other threads and, with a shared store, in other processes.
+    A token expiring within `refresh_margin` seconds is still handed out while a background thread
+    replaces it, so callers never wait for a rollover or hit a 401 for it.
+    """
+    def __init__(self, login, refresh_margin=60, store=None, key="default"):
+        self.login = login
+        self.refresh_margin = refresh_margin
+        self.store = store if store is not None else MemoryTokenStore()
+        self.key = key
+        self._refreshing = False
+        self._refreshing_lock = threading.Lock()
+
+    @property
+    def token(self):
+        return self.store.load(self.key)
+
+    @token.setter
+    def token(self, token):
+        self.store.save(self.key, token)
+
+    def next_sequence(self, floor=0):
+        return self.store.next_sequence(self.key, floor)
+
+    def expires_in(self, token):
+        """
+        Seconds before the token expires, None when the token has no expiration
+        """
+        expiration = token.get("auth_token_expiration")
+        if expiration is None:
+            return None
+        return (utils.cached_parse_datetime(expiration) - utils.time_now()).total_seconds()
+
+    def get(self, deadline=None):
+        """
+        A valid token, logging in when needed within `deadline` (see decktutorsdk.deadline)
+        """
+        token = self.token
+        if token is None:
+            return self.refresh(token, deadline)
+
+        expires_in = self.expires_in(token)
+        if expires_in is None or expires_in > self.refresh_margin:
+            return token
+        if expires_in > 0:
+            self.refresh_in_background(token)
+            return token
+        return self.refresh(token, deadline)
+
+    def refresh(self, stale=None, deadline=None):
+        """
+        Replaces the `stale` token, if someone else already did it their token is returned
+        """
+        if deadline is not None:
+            deadline.check("login")
+        # waiting for the login of another caller is bounded by the deadline too
+        with self.store.lock("login", None if deadline is None else deadline.remaining()):
+            token = self.token
+            if token is not None and token != stale:
+                return token
+            if deadline is None:
+                token = self.login()
+            else:
+                deadline.check("login")
+                token = self.login(deadline=deadline)
+            self.token = token
+            return token
+
+    def refresh_in_background(self, stale):
+        with self._refreshing_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        thread = threading.Thread(target=self._background_refresh, args=(stale,))
+        thread.daemon = True
+        thread.start()
+
+    def _background_refresh(self, stale):
+        try:
+            self.refresh(stale)
+        except Exception:
+            # the token is still valid, callers will login again once it expires
+            logging.exception("Background token refresh failed")
+        finally:
+            with self._refreshing_lock:
+                self._refreshing = False
+
+    def invalidate(self, token=None):
+        """
+        Drops `token` (or the current token when not given) unless it was already replaced
+        """
+        with self.store.lock():
+            if token is None or self.token == token:
+                self.token = None
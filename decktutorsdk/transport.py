@@ -0,0 +1,76 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class Transport(object):
+    """
+    Base transport: sends a single http request and returns the raw response.
+    Subclasses only need to implement `request` with the `requests.request` signature.
+    """
+    def request(self, method, url, **kwargs):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class SimpleTransport(Transport):
+    """
+    Transport without connection reuse, every call opens a new connection
+    """
+    def request(self, method, url, **kwargs):
+        return requests.request(method, url, **kwargs)
+
+
+class SessionTransport(Transport):
+    """
+    Transport backed by a persistent `requests.Session` with a keep-alive connection pool.
+
+    Usage::
+        transport = SessionTransport(pool_connections=4, pool_maxsize=20)
+        api = Api(username="user", password="pwd", transport=transport)
+
+    `pool_connections` is the number of per-host pools kept alive, `pool_maxsize` is the number of
+    connections kept open for each host and `pool_block` blocks the caller instead of opening extra
+    connections once a host pool is full.
+    """
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True,
+                 max_retries=0):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.max_retries = max_retries
+        self.session = self.create_session()
+
+    def create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+            max_retries=self.max_retries
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+def create_transport(options=None):
+    """
+    Build a transport from Api options: an existing Transport instance is returned as is,
+    a dict is used as SessionTransport arguments and False disables connection pooling
+    """
+    if isinstance(options, Transport):
+        return options
+    if options is False:
+        return SimpleTransport()
+    return SessionTransport(**(options or {}))
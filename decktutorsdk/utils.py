@@ -42,16 +42,23 @@ class FixedOffset(tzinfo):
         return ZERO
 
 
+_fixed_timezones = {}
+
+
 def get_fixed_timezone(offset):
     """
     Returns a tzinfo instance with a fixed offset from UTC.
+    Instances are cached, one for each offset.
     """
     if isinstance(offset, timedelta):
         offset = offset.seconds // 60
-    sign = '-' if offset < 0 else '+'
-    hhmm = '%02d%02d' % divmod(abs(offset), 60)
-    name = sign + hhmm
-    return FixedOffset(offset, name)
+    timezone = _fixed_timezones.get(offset)
+    if timezone is None:
+        sign = '-' if offset < 0 else '+'
+        hhmm = '%02d%02d' % divmod(abs(offset), 60)
+        name = sign + hhmm
+        timezone = _fixed_timezones[offset] = FixedOffset(offset, name)
+    return timezone
 
 date_re = re.compile(
     r'(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})$'
@@ -108,6 +115,30 @@ def parse_datetime(value):
 
     Raises ValueError if the input is well formatted but not a valid datetime.
     Returns None if the input isn't well formatted.
+
+    Plain iso 8601 strings are parsed by datetime.fromisoformat when available,
+    anything else by the regular expression, see parse_datetime_re.
+    """
+    if _fromisoformat is not None and len(value) >= 16 and value[4] == '-' and value[7] == '-' and \
+            value[10] in 'T ' and value[13] == ':' and ',' not in value:
+        try:
+            parsed = _fromisoformat(value)
+        except ValueError:
+            return parse_datetime_re(value)
+        offset = parsed.utcoffset()
+        if offset is None:
+            return parsed
+        if offset.seconds % 60 or offset.microseconds:
+            return parse_datetime_re(value)
+        if value[-1] == 'Z':
+            return parsed.replace(tzinfo=utc)
+        return parsed.replace(tzinfo=get_fixed_timezone(offset.days * 1440 + offset.seconds // 60))
+    return parse_datetime_re(value)
+
+
+def parse_datetime_re(value):
+    """
+    parse_datetime through the regular expression only
     """
     match = datetime_re.match(value)
     if match:
@@ -130,6 +161,41 @@ def parse_datetime(value):
 End code from
 """
 
+# python >= 3.7, 'Z' is accepted from 3.11 and falls back to the regular expression before
+_fromisoformat = getattr(datetime, 'fromisoformat', None)
+
+_datetimes = {}
+DATETIMES_CACHE_SIZE = 1024
+
+
+def parse_datetimes(values):
+    """
+    parse_datetime over a list of strings, each distinct string is parsed once
+    """
+    parsed = {}
+    result = []
+    for value in values:
+        if value is None:
+            result.append(None)
+            continue
+        date = parsed.get(value)
+        if date is None:
+            date = parsed[value] = parse_datetime(value)
+        result.append(date)
+    return result
+
+
+def cached_parse_datetime(value):
+    """
+    parse_datetime memoized for the few strings parsed over and over, like token expirations
+    """
+    date = _datetimes.get(value)
+    if date is None:
+        if len(_datetimes) >= DATETIMES_CACHE_SIZE:
+            _datetimes.clear()
+        date = _datetimes[value] = parse_datetime(value)
+    return date
+
 
 def time_now():
     return datetime.utcnow().replace(tzinfo=utc)
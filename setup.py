@@ -20,7 +20,7 @@ setup(
   long_description="""
     Decktutor sdk with use of some endpoints.
   """,
-  install_requires=['requests', 'six'],
+  install_requires=['requests', 'six', 'futures; python_version < "3"'],
   classifiers=[
     'Intended Audience :: Developers',
     'Natural Language :: English',
@@ -0,0 +1,210 @@
+"""
+Local http server used by tests and benchmarks in place of the DeckTutor web services
+"""
+import collections
+import datetime
+import json
+import random
+import socket
+import sys
+import threading
+import time
+
+from six.moves import BaseHTTPServer, socketserver
+from six.moves.urllib.parse import parse_qs, urlparse
+
+from decktutorsdk.api_map import api_map
+from decktutorsdk.endpoints import compile_api_map
+
+
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Answers every request with the json body configured on the server
+    """
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        # headers and body are written separately, avoid the delayed ack stall on keep-alive
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.count_connection()
+
+    def handle_any(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        response = self.server.respond(self)
+        if response is None:
+            # simulate a connection reset
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        status, body, headers = response
+        content = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = handle_any
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """
+    Threaded stub server listening on a random local port.
+
+    Usage::
+        with StubServer() as server:
+            requests.get(server.url + "/search/serp")
+        server.connections  # number of tcp connections accepted
+
+    `failures` are answered, one per request, before the configured body: each is a status code,
+    a (status, headers) tuple or "reset" to drop the connection without answering.
+    """
+    daemon_threads = True
+
+    def __init__(self, body=None, failures=None, handler=StubHandler):
+        BaseHTTPServer.HTTPServer.__init__(self, ("127.0.0.1", 0), handler)
+        self.body = body if body is not None else {}
+        self.failures = list(failures or [])
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def handle_error(self, request, client_address):
+        # clients giving up on a slow response (timeouts, deadlines) are expected
+        if not isinstance(sys.exc_info()[1], socket.error):
+            BaseHTTPServer.HTTPServer.handle_error(self, request, client_address)
+
+    @property
+    def url(self):
+        return "http://%s:%s" % self.server_address
+
+    def count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def respond(self, handler):
+        with self._lock:
+            self.requests += 1
+            failure = self.failures.pop(0) if self.failures else None
+        if failure == "reset":
+            return None
+        if failure is not None:
+            status, headers = failure if isinstance(failure, tuple) else (failure, {})
+            return status, {"error": "stub failure"}, headers
+        return 200, self.body, {}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, args=(0.05,))
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+def api_routes():
+    """
+    (name, method, regex, authenticated, paginated) for every endpoint of the api_map
+    """
+    endpoints = compile_api_map(api_map["current"]["api"]).values()
+    routes = [(endpoint.name, endpoint.method, endpoint.regex, endpoint.authenticate, endpoint.paginated)
+              for endpoint in endpoints if endpoint.url]
+    # literal urls first: /search/insertion/code must not match a {placeholder}
+    return sorted(routes, key=lambda route: (route[2].pattern.count("[^/]+"), route[0]))
+
+
+class DecktutorStub(StubServer):
+    """
+    Stub of the DeckTutor web services answering every endpoint of the api_map.
+
+    Usage::
+        with DecktutorStub(items=1000, latency=0.005, error_rate=0.01) as server:
+            api = Api(username="user", password="pwd", endpoint=server.url, mode="live")
+
+    account.login hands out tokens lasting `token_ttl` seconds, authenticated endpoints answer 401
+    to unknown or expired tokens. Paginated endpoints serve `items` insertions sliced by the
+    offset/limit params, the others echo the endpoint name and url parameters. Every request waits
+    `latency` seconds and fails with a 503 with probability `error_rate`. `calls` counts the
+    requests for each endpoint.
+    """
+    def __init__(self, items=100, token_ttl=3600, latency=0, error_rate=0, seed=None, failures=None):
+        StubServer.__init__(self, failures=failures)
+        self.items = items
+        self.token_ttl = token_ttl
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.routes = api_routes()
+        self.tokens = {}
+        self.calls = collections.Counter()
+
+    def respond(self, handler):
+        response = StubServer.respond(self, handler)
+        if response is None or response[0] != 200:
+            return response
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            failed = self.error_rate and self.random.random() < self.error_rate
+        if failed:
+            return 503, {"error": "stub failure"}, {}
+
+        url = urlparse(handler.path)
+        for name, method, regex, authenticated, paginated in self.routes:
+            match = regex.match(url.path)
+            if match is None or method != handler.command:
+                continue
+            with self._lock:
+                self.calls[name] += 1
+            if name == "account.login":
+                return 200, self.login(), {}
+            if authenticated and not self.valid_token(handler.headers.get("x-dt-Auth-Token")):
+                return 401, {"error": "invalid token"}, {}
+            if paginated:
+                return 200, self.page(parse_qs(url.query)), {}
+            return 200, {"endpoint": name, "params": list(match.groups())}, {}
+        return 404, {"error": "not found"}, {}
+
+    def login(self):
+        with self._lock:
+            token = "token-%d" % len(self.tokens)
+            self.tokens[token] = time.time() + self.token_ttl
+        expiration = datetime.datetime.utcnow() + datetime.timedelta(seconds=self.token_ttl)
+        return {
+            "auth_token": token,
+            "auth_token_secret": "secret",
+            "auth_token_expiration": expiration.strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+        }
+
+    def valid_token(self, token):
+        with self._lock:
+            return self.tokens.get(token, 0) > time.time()
+
+    def expire_tokens(self):
+        with self._lock:
+            self.tokens = dict((token, 0) for token in self.tokens)
+
+    def page(self, query):
+        offset = int(query.get("offset", ["0"])[0])
+        limit = int(query.get("limit", [str(self.items - 1)])[0])
+        return {"results": [
+            {"code": str(index), "price": 1.0 + index % 10, "quantity": 1 + index % 3, "name": "card %d" % index}
+            for index in range(offset, min(limit + 1, self.items))
+        ]}
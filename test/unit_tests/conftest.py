@@ -0,0 +1,6 @@
+import sys
+
+collect_ignore = []
+if sys.version_info < (3, 6):
+    # the async client, and its tests, need python 3.6+
+    collect_ignore.append("test_aio.py")
@@ -0,0 +1,262 @@
+import asyncio
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from ..stub_server import StubServer
+from decktutorsdk import utils
+from decktutorsdk.aio import AsyncApi, AsyncDecktutor, AsyncTransport, ExecutorTransport, Response
+from decktutorsdk.deadline import Deadline
+from decktutorsdk.exceptions import DeadlineExceeded, MissingConfig
+from decktutorsdk.ratelimit import RateLimiter
+from decktutorsdk.retry import RetryPolicy
+from decktutorsdk.tokens import FileTokenStore
+from .test_metrics import Recorder
+
+
+class FakeTransport(AsyncTransport):
+    """
+    Records calls and the maximum number of concurrent requests
+    """
+    def __init__(self, body=None, delay=0):
+        self.body = body if body is not None else {}
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        if url.endswith("/account/login"):
+            body = {"auth_token": "token", "auth_token_secret": "secret",
+                    "auth_token_expiration": "2100-01-01T00:00:00+00:00"}
+        else:
+            body = self.body
+        return Response(200, "OK", json.dumps(body).encode("utf-8"))
+
+
+class AsyncDecktutorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = FakeTransport(body={"code": 123}, delay=0.01)
+        self.api = AsyncApi(username="test", password="password", mode="live", async_transport=self.transport,
+                            max_concurrency=5)
+        self.decktutor = AsyncDecktutor(api=self.api)
+
+    def test_auth_call(self):
+        result = asyncio.run(self.decktutor.insertions.info(url_entry={'code': 123}, params={'param1': 'abc'}))
+        self.assertEqual(result, {"code": 123})
+
+        login, call = self.transport.calls
+        self.assertEqual(login[1], "https://ws.decktutor.com/app/v2/account/login")
+        self.assertEqual(call[0], "GET")
+        self.assertEqual(call[1], "https://ws.decktutor.com/app/v2/insertions/123/")
+        self.assertEqual(call[2]["params"], {'param1': 'abc'})
+        self.assertEqual(call[2]["headers"]["x-dt-Auth-Token"], "token")
+
+    def test_default_resolver_is_not_authenticated(self):
+        asyncio.run(self.decktutor.account.login(body={"login": "test"}))
+        (call,) = self.transport.calls
+        self.assertNotIn("x-dt-Auth-Token", call[2]["headers"])
+
+    def test_pagination(self):
+        asyncio.run(self.decktutor.search.serp(body={}, page=2, page_size=10))
+        self.assertEqual(self.transport.calls[-1][2]["params"], {'offset': 20, 'limit': 29})
+
+    def test_bounded_concurrency_and_single_login(self):
+        async def run():
+            return await asyncio.gather(*[
+                self.decktutor.insertions.info(url_entry={'code': code}) for code in range(50)
+            ])
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 50)
+        logins = [call for call in self.transport.calls if call[1].endswith("/account/login")]
+        self.assertEqual(len(logins), 1)
+        self.assertEqual(self.transport.max_in_flight, 5)
+
+    def test_apis_share_store(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        store = FileTokenStore(os.path.join(directory, "tokens.json"))
+        transports = [FakeTransport(body={"code": 123}, delay=0.01) for _ in range(2)]
+        apis = [AsyncApi(username="test", password="password", mode="live", async_transport=transport,
+                         token_store=store) for transport in transports]
+
+        async def run():
+            return await asyncio.gather(*[
+                AsyncDecktutor(api=api).insertions.info(url_entry={'code': code})
+                for code in range(10) for api in apis
+            ])
+
+        self.assertEqual(len(asyncio.run(run())), 20)
+        logins = [call for transport in transports for call in transport.calls
+                  if call[1].endswith("/account/login")]
+        self.assertEqual(len(logins), 1)
+
+    def test_early_refresh(self):
+        expiration = utils.time_now() + datetime.timedelta(seconds=30)
+        self.api.token = {"auth_token": "old", "auth_token_secret": "secret",
+                          "auth_token_expiration": expiration.strftime("%Y-%m-%dT%H:%M:%S+00:00")}
+
+        async def run():
+            result = await self.decktutor.insertions.info(url_entry={'code': 1})
+            # the token expires within the refresh margin: replaced in background, not awaited
+            for _ in range(50):
+                if self.api.token["auth_token"] == "token":
+                    break
+                await asyncio.sleep(0.01)
+            return result
+
+        self.assertEqual(asyncio.run(run()), {"code": 123})
+        login = [call for call in self.transport.calls if call[1].endswith("/account/login")]
+        call = [call for call in self.transport.calls if not call[1].endswith("/account/login")]
+        self.assertEqual(len(login), 1)
+        self.assertEqual(call[0][2]["headers"]["x-dt-Auth-Token"], "old")
+        self.assertEqual(self.api.token["auth_token"], "token")
+
+    def test_missing_config(self):
+        with self.assertRaises(MissingConfig):
+            self.decktutor.insertions.missing
+
+    def test_sync_only_calls(self):
+        with self.assertRaises(MissingConfig):
+            self.decktutor.search.serp.stream(body={})
+        with self.assertRaises(MissingConfig):
+            self.decktutor.search.serp.export("results.csv", body={})
+        with self.assertRaises(MissingConfig):
+            self.decktutor.insertions.bulk_publish([1, 2])
+
+    def test_executor_transport(self):
+        async def run(api):
+            try:
+                return await AsyncDecktutor(api=api).account.login(body={})
+            finally:
+                await api.close()
+
+        with StubServer(body={"auth_token": "token"}) as server:
+            api = AsyncApi(username="test", password="password", mode="live", endpoint=server.url,
+                           async_transport=ExecutorTransport(max_workers=2))
+            self.assertEqual(asyncio.run(run(api)), {"auth_token": "token"})
+
+    def test_iter(self):
+        async def run():
+            return [item async for item in self.decktutor.search.serp.iter(body={}, page_size=2)]
+
+        pages = iter([{"results": [1, 2]}, {"results": [3]}])
+        original = self.transport.request
+
+        async def request(method, url, **kwargs):
+            if not url.endswith("/account/login"):
+                self.transport.body = next(pages)
+            return await original(method, url, **kwargs)
+
+        self.transport.request = request
+        self.assertEqual(asyncio.run(run()), [1, 2, 3])
+
+    def test_retry(self):
+        failures = [503, 502]
+        original = self.transport.request
+
+        async def request(method, url, **kwargs):
+            if failures and not url.endswith("/account/login"):
+                return Response(failures.pop(0), "Unavailable", b"{}")
+            return await original(method, url, **kwargs)
+
+        self.transport.request = request
+        self.api.retry_policy = RetryPolicy(backoff=0.01, jitter=False)
+        with self.assertLogs(level="WARNING") as logs:
+            result = asyncio.run(self.decktutor.insertions.info(url_entry={'code': 1}))
+        self.assertEqual(result, {"code": 123})
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn("Retrying[GET]", logs.output[0])
+
+    def test_rate_limit(self):
+        self.api.rate_limiter = RateLimiter(groups={"insertions": {"rate": 50, "capacity": 1}})
+
+        async def run():
+            return await asyncio.gather(*[
+                self.decktutor.insertions.info(url_entry={'code': code}) for code in range(10)
+            ])
+
+        start = time.time()
+        asyncio.run(run())
+        self.assertGreaterEqual(time.time() - start, 0.15)
+        self.assertEqual(self.api.rate_limiter.stats()["groups"]["insertions"]["calls"], 10)
+
+
+class AsyncDeadlineTest(unittest.TestCase):
+
+    def test_expired(self):
+        transport = FakeTransport()
+        api = AsyncApi(username="dummy", password="dummy", mode="live", async_transport=transport, timeout=(1, 2))
+        self.assertEqual(asyncio.run(api.request("/things", "GET")), {})
+        self.assertEqual(transport.calls[0][2]["timeout"], (1, 2))
+        with self.assertRaises(DeadlineExceeded):
+            asyncio.run(api.request("/things", "GET", deadline=Deadline(-1)))
+        self.assertEqual(len(transport.calls), 1)
+
+    def test_login_lock_within_deadline(self):
+        transport = FakeTransport()
+        api = AsyncApi(username="dummy", password="dummy", mode="live", async_transport=transport,
+                       authenticate=True)
+        holding, release = threading.Event(), threading.Event()
+
+        def hold():
+            with api.token_manager.store.lock("login"):
+                holding.set()
+                release.wait()
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        holding.wait()
+        try:
+            with self.assertRaises(DeadlineExceeded):
+                asyncio.run(api.request("/things", "GET", deadline=0.05))
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(transport.calls, [])
+
+    def test_slot_within_deadline(self):
+        transport = FakeTransport(delay=0.3)
+        api = AsyncApi(username="dummy", password="dummy", mode="live", async_transport=transport,
+                       max_concurrency=1)
+
+        async def run():
+            return await asyncio.gather(api.request("/things", "GET"),
+                                        api.request("/things", "GET", deadline=0.05), return_exceptions=True)
+
+        first, second = asyncio.run(run())
+        self.assertEqual(first, {})
+        self.assertIsInstance(second, DeadlineExceeded)
+        self.assertEqual(len(transport.calls), 1)
+
+    def test_rate_limit_within_deadline(self):
+        transport = FakeTransport()
+        api = AsyncApi(username="dummy", password="dummy", mode="live", async_transport=transport,
+                       rate_limit={"rate": 1, "capacity": 1})
+        asyncio.run(api.request("/things", "GET", deadline=0.2))
+        with self.assertRaises(DeadlineExceeded):
+            asyncio.run(api.request("/things", "GET", deadline=0.2))
+        self.assertEqual(len(transport.calls), 1)
+        self.assertEqual(api.rate_limiter.stats()["calls"], 1)
+
+
+class AsyncHooksTest(unittest.TestCase):
+
+    def test_request(self):
+        recorder = Recorder()
+        api = AsyncApi(username="test", password="password", mode="live", async_transport=FakeTransport({"id": 1}),
+                       hooks=[recorder])
+        asyncio.run(api.request("/products/12", "GET", endpoint_name="products.info"))
+        self.assertEqual(recorder.events[-1][:5], ("after", "products.info", 200, 9, 1))
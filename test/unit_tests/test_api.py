@@ -1,3 +1,5 @@
+import hashlib
+import threading
 import unittest
 from ..test_helper import mock
 from decktutorsdk.api import Api, ApiFactory
@@ -103,6 +105,29 @@ class ApiTest(unittest.TestCase):
         #is incremented by +1
         self.assertEqual(new_incr, old_incr+1)
 
+    def test_concurrent_sequence_numbers(self):
+        self.api.token = {"auth_token": "test", "auth_token_secret": "test"}
+        sequences = []
+
+        def work():
+            sequences.extend([self.api.headers()["x-dt-Sequence"] for _ in range(500)])
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(sequences)), 4000)
+
+    def test_signed_headers(self):
+        headers = self.api.signed_headers({"auth_token": "token", "auth_token_secret": "secret"})
+        sequence = int(headers["x-dt-Sequence"])
+        self.assertEqual(headers["x-dt-Auth-Token"], "token")
+        self.assertEqual(headers["x-dt-Signature"],
+                         hashlib.md5(("%02d:secret" % sequence).encode("UTF-8")).hexdigest())
+        self.assertEqual(headers["User-Agent"], self.api.user_agent)
+        self.assertNotIn("x-dt-Auth-Token", self.api.base_headers())
+
     def test_not_found(self):
         self.api.request.side_effect = ResourceNotFound("error")
         self.assertRaises(ResourceNotFound, self.api.request, ("/payments/payment?cnt=1", "GET"))
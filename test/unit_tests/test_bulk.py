@@ -0,0 +1,188 @@
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from ..test_helper import mock
+from decktutorsdk.api import api_factory
+from decktutorsdk.bulk import Checkpoint, merge_updates, read_rows, run_bounded
+from decktutorsdk.decktutor import decktutor
+from decktutorsdk.exceptions import BadRequest, MissingParam, ResourceConflict, ResourceNotFound
+
+
+class RunBoundedTest(unittest.TestCase):
+
+    def test_bounded(self):
+        lock = threading.Lock()
+        state = {"in_flight": 0, "max": 0}
+
+        def work(item):
+            with lock:
+                state["in_flight"] += 1
+                state["max"] = max(state["max"], state["in_flight"])
+            time.sleep(0.01)
+            with lock:
+                state["in_flight"] -= 1
+            if item == 3:
+                raise ValueError(item)
+            return item * 2
+
+        results = dict((item, (result, error)) for item, result, error in run_bounded(work, range(20), 4))
+        self.assertEqual(len(results), 20)
+        self.assertEqual(results[5], (10, None))
+        self.assertIsInstance(results[3][1], ValueError)
+        self.assertEqual(state["max"], 4)
+
+    def test_lazy_input(self):
+        consumed = []
+
+        def items():
+            for item in range(100):
+                consumed.append(item)
+                yield item
+
+        results = run_bounded(lambda item: item, items(), 2)
+        next(results)
+        self.assertLessEqual(len(consumed), 3)
+        results.close()
+
+
+class BulkCreateTest(unittest.TestCase):
+
+    def setUp(self):
+        api_factory.configure(username="test", password="password")
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_read_rows(self):
+        rows = list(read_rows(io.StringIO(u"game,category,price\nmtg,single,1.5\nmtg,single,2\n")))
+        self.assertEqual(rows, [{"game": "mtg", "category": "single", "price": "1.5"},
+                                {"game": "mtg", "category": "single", "price": "2"}])
+        self.assertEqual(list(read_rows([{"a": 1}])), [{"a": 1}])
+
+    @mock.patch("decktutorsdk.api.Api.request")
+    def test_bulk_create(self, mock_request):
+        def request(url, method, body=None, **kwargs):
+            if body["price"] == 0:
+                return {"error": {"price": "invalid"}}
+            return {"code": body["price"]}
+
+        mock_request.side_effect = request
+        rows = [{"game": "mtg", "category": "single", "price": price} for price in range(10)]
+        reports = sorted(decktutor.insertions.bulk_create(rows, concurrency=3))
+
+        self.assertEqual([report.index for report in reports], list(range(10)))
+        self.assertIsInstance(reports[0].error, BadRequest)
+        self.assertEqual(reports[4].result, {"code": 4})
+        self.assertIsNone(reports[4].error)
+        mock_request.assert_any_call(url="/insertions/create/mtg/single", method="POST", page=None,
+                                     page_size=None, body={"price": 4}, endpoint_name="insertions.create")
+
+    @mock.patch("decktutorsdk.api.Api.request")
+    def test_missing_url_entry(self, mock_request):
+        (report,) = list(decktutor.insertions.bulk_create([{"price": 1}]))
+        self.assertIsInstance(report.error, MissingParam)
+        self.assertFalse(mock_request.called)
+
+    @mock.patch("decktutorsdk.api.Api.request")
+    def test_resume(self, mock_request):
+        path = os.path.join(self.directory, "checkpoint")
+        rows = [{"game": "mtg", "category": "single", "price": price} for price in range(6)]
+        mock_request.side_effect = lambda url, method, body=None, **kwargs: (
+            {"code": 1} if body["price"] % 2 else {"error": "failed"})
+        list(decktutor.insertions.bulk_create(rows, checkpoint=path))
+        self.assertEqual(Checkpoint(path).done, {1, 3, 5})
+
+        mock_request.reset_mock()
+        mock_request.side_effect = lambda url, method, body=None, **kwargs: {"code": 1}
+        reports = list(decktutor.insertions.bulk_create(rows, checkpoint=path))
+        self.assertEqual(sorted(report.index for report in reports), [0, 2, 4])
+        self.assertEqual(mock_request.call_count, 3)
+        self.assertEqual(Checkpoint(path).done, set(range(6)))
+
+
+    def test_checkpoint(self):
+        path = os.path.join(self.directory, "checkpoint")
+        with Checkpoint(path) as checkpoint:
+            self.assertFalse(os.path.exists(path))
+            checkpoint.mark(3)
+            self.assertIn(3, checkpoint)
+        with Checkpoint(path) as checkpoint:
+            self.assertEqual(checkpoint.done, {3})
+
+class BulkUpdateTest(unittest.TestCase):
+
+    def setUp(self):
+        api_factory.configure(username="test", password="password")
+
+    def test_merge_updates(self):
+        merged = merge_updates([("1", "price", 1), ("2", "price", 2), ("1", "quantity", 3), ("1", "price", 4)])
+        self.assertEqual(list(merged), ["1", "2"])
+        self.assertEqual(dict(merged["1"]), {"price": 4, "quantity": 3})
+
+    @mock.patch("decktutorsdk.api.Api.request")
+    def test_bulk_update(self, mock_request):
+        def request(url, method, body=None, **kwargs):
+            if url == "/insertions/3/field/price":
+                return {"error": {"price": "invalid"}}
+            return {"ok": True}
+
+        mock_request.side_effect = request
+        updates = [(str(code), "price", code) for code in range(5)] + [("1", "quantity", 2)]
+        report = decktutor.insertions.bulk_update(updates, concurrency=3, publish=True, group_size=3)
+        items = list(report)
+
+        updated = dict((item.code, item) for item in items if item.action == "update")
+        published = sorted(item.code for item in items if item.action == "publish")
+        self.assertEqual(len(updated), 5)
+        self.assertIsInstance(updated["3"].error, BadRequest)
+        self.assertEqual(updated["1"].result, {"price": {"ok": True}, "quantity": {"ok": True}})
+        self.assertEqual(published, ["0", "1", "2", "4"])
+        mock_request.assert_any_call(url="/insertions/1/field/quantity", method="PUT", page=None,
+                                     page_size=None, body=2, endpoint_name="insertions.update")
+
+        publish_calls = [call for call in mock_request.call_args_list if call[1]["url"].endswith("/publish")]
+        self.assertEqual(len(publish_calls), 2)
+        stats = report.stats()
+        self.assertEqual((stats["items"], stats["failed"]), (9, 1))
+
+    @mock.patch("decktutorsdk.api.Api.request")
+    def test_bulk_publish(self, mock_request):
+        mock_request.return_value = {"ok": True}
+        items = list(decktutor.insertions.bulk_publish(["1", "2"], group_size=10))
+        self.assertEqual([item.code for item in items], ["1", "2"])
+        mock_request.assert_called_once_with(url="/insertions/1,2/publish", method="POST", page=None,
+                                             page_size=None, endpoint_name="insertions.publish_list")
+
+
+class BulkStepTest(unittest.TestCase):
+
+    def setUp(self):
+        api_factory.configure(username="test", password="password")
+
+    @mock.patch("decktutorsdk.api.Api.request")
+    def test_bulk_step(self, mock_request):
+        def request(url, method, **kwargs):
+            if url == "/handlings/2/step/shipped":
+                raise ResourceConflict(mock.Mock(status_code=409))
+            if url == "/handlings/3/step/shipped":
+                raise ResourceNotFound(mock.Mock(status_code=404))
+            return {"state": "shipped"}
+
+        mock_request.side_effect = request
+        report = decktutor.handlings.bulk_step("shipped", ["1", "2", "3", "1", "2"], concurrency=2)
+        items = dict((item.code, item) for item in report)
+
+        self.assertEqual(sorted(items), ["1", "2", "3"])
+        self.assertEqual(mock_request.call_count, 3)
+        self.assertEqual(items["1"].result, {"state": "shipped"})
+        self.assertIsNone(items["2"].error)
+        self.assertIsInstance(items["3"].error, ResourceNotFound)
+        self.assertEqual(report.stats()["failed"], 1)
+        mock_request.assert_any_call(url="/handlings/1/step/shipped", method="POST", page=None,
+                                     page_size=None, idempotent=True,
+                                     endpoint_name="handlings.steps.shipped")
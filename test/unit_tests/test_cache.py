@@ -0,0 +1,165 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from ..test_helper import mock
+from decktutorsdk.api import Api, api_factory
+from decktutorsdk.cache import MISSING, ResponseCache, SQLiteCache, create_cache, warm
+from decktutorsdk.decktutor import decktutor
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache(max_entries=2)
+
+    def test_get_set(self):
+        key = self.cache.key("GET", "/things", {"b": 2, "a": 1})
+        self.assertEqual(key, self.cache.key("GET", "/things", {"a": 1, "b": 2}))
+        self.assertIs(self.cache.get(key), MISSING)
+        self.cache.set(key, {"id": 1}, 60)
+        self.assertEqual(self.cache.get(key), {"id": 1})
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_list_params(self):
+        key = self.cache.key("GET", "/things", {"ids": [1, 2]})
+        self.assertIs(self.cache.get(key), MISSING)
+        self.cache.set(key, {"id": 1}, 60)
+        self.assertEqual(self.cache.get(self.cache.key("GET", "/things", {"ids": [1, 2]})), {"id": 1})
+
+    def test_hits_are_copies(self):
+        self.cache.set("key", {"items": [1]}, 60)
+        self.cache.get("key")["items"].append(2)
+        self.assertEqual(self.cache.get("key"), {"items": [1]})
+
+    @mock.patch("decktutorsdk.cache.time.time")
+    def test_ttl(self, mock_time):
+        mock_time.return_value = 1000
+        self.cache.set("key", {"id": 1}, 60)
+        mock_time.return_value = 1059
+        self.assertEqual(self.cache.get("key"), {"id": 1})
+        mock_time.return_value = 1061
+        self.assertIs(self.cache.get("key"), MISSING)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_lru_eviction(self):
+        self.cache.set("a", 1, 60)
+        self.cache.set("b", 2, 60)
+        self.cache.get("a")
+        self.cache.set("c", 3, 60)
+        self.assertIs(self.cache.get("b"), MISSING)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertEqual(self.cache.get("c"), 3)
+
+    def test_memory_bound(self):
+        cache = ResponseCache(max_bytes=15)
+        cache.set("a", "x" * 8, 60)
+        cache.set("b", "y" * 8, 60)
+        self.assertIs(cache.get("a"), MISSING)
+        self.assertEqual(cache.stats()["bytes"], 10)
+        cache.set("c", "z" * 30, 60)
+        self.assertIs(cache.get("c"), MISSING)
+
+    def test_create_cache(self):
+        self.assertIsNone(create_cache())
+        self.assertIsNone(create_cache(False))
+        self.assertIsInstance(create_cache(True), ResponseCache)
+        self.assertEqual(create_cache({"max_entries": 5}).max_entries, 5)
+
+
+class ApiCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = Api(username="test", password="password", mode="live", cache=True)
+
+    @mock.patch("decktutorsdk.api.Api.http_call")
+    def test_cached_get(self, mock_http):
+        mock_http.return_value = {"id": 1}
+        for _ in range(3):
+            self.assertEqual(self.api.request("/products/1", "GET", cache_ttl=60), {"id": 1})
+        self.assertEqual(mock_http.call_count, 1)
+
+        self.api.request("/products/1", "GET", cache_ttl=60, params={"lang": "it"})
+        self.assertEqual(mock_http.call_count, 2)
+        self.assertEqual(self.api.cache.stats()["hits"], 2)
+
+    @mock.patch("decktutorsdk.api.Api.http_call")
+    def test_not_cached(self, mock_http):
+        mock_http.return_value = {"id": 1}
+        self.api.request("/products/1", "GET")
+        self.api.request("/products/1", "GET")
+        self.api.request("/search/serp", "POST", cache_ttl=60)
+        self.api.request("/search/serp", "POST", cache_ttl=60)
+        self.assertEqual(mock_http.call_count, 4)
+
+    @mock.patch("decktutorsdk.api.Api.request")
+    def test_api_map_ttl(self, mock_request):
+        api_factory.configure(username="test", password="password")
+        decktutor.search.list_filters(url_entry={"code": 1})
+        mock_request.assert_called_once_with(
+            url="/search/category/1/filters", method="GET", page=None, page_size=None, cache_ttl=24 * 60 * 60,
+            endpoint_name="search.list_filters"
+        )
+
+
+class SQLiteCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache.db")
+        self.cache = SQLiteCache(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_shared_between_instances(self):
+        key = self.cache.key("GET", "/products/1", {"lang": "it"})
+        self.assertIs(self.cache.get(key), MISSING)
+        self.cache.set(key, {"id": 1}, 60)
+
+        other = SQLiteCache(self.path)
+        self.assertEqual(other.get(other.key("GET", "/products/1", {"lang": "it"})), {"id": 1})
+        self.assertEqual(other.stats(), {"hits": 1, "misses": 0, "entries": 1})
+
+    @mock.patch("decktutorsdk.cache.time.time")
+    def test_ttl(self, mock_time):
+        mock_time.return_value = 1000
+        self.cache.set("key", {"id": 1}, 60)
+        self.cache.set("other", {"id": 2}, 120)
+        mock_time.return_value = 1061
+        self.assertIs(self.cache.get("key"), MISSING)
+        self.assertEqual(len(self.cache), 1)
+        self.cache.purge()
+        mock_time.return_value = 0
+        self.assertEqual(len(self.cache), 1)
+
+    def test_concurrent_writers(self):
+        def write(worker):
+            cache = SQLiteCache(self.path)
+            for index in range(50):
+                cache.set("%s-%s" % (worker, index), {"index": index}, 60)
+
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.cache), 200)
+
+    @mock.patch("decktutorsdk.api.Api.http_call")
+    def test_api_cache(self, mock_http):
+        mock_http.return_value = {"id": 1}
+        api = Api(username="test", password="password", mode="live", cache=self.cache)
+        other = Api(username="test", password="password", mode="live", cache=SQLiteCache(self.path))
+        api.request("/products/1", "GET", cache_ttl=60)
+        self.assertEqual(other.request("/products/1", "GET", cache_ttl=60), {"id": 1})
+        self.assertEqual(mock_http.call_count, 1)
+
+    def test_warm(self):
+        decktutor = mock.Mock()
+        decktutor.search.list_categories.return_value = {"categories": [{"code": 10}, {"code": 11}]}
+        self.assertEqual(warm("mtg", ["ktk", "frf"], decktutor=decktutor), 6)
+        decktutor.search.list_categories.assert_called_with(url_entry={'game': 'mtg', 'code': 'frf'})
+        decktutor.search.list_filters.assert_called_with(url_entry={'code': 11})
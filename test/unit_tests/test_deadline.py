@@ -0,0 +1,119 @@
+import unittest
+from ..test_helper import mock
+from ..stub_server import DecktutorStub
+from decktutorsdk import deadline as deadline_module
+from decktutorsdk.api import Api, api_factory
+from decktutorsdk.deadline import DEFAULT_TIMEOUT, Deadline, create_deadline, create_timeout
+from decktutorsdk.decktutor import decktutor
+from decktutorsdk.exceptions import DeadlineExceeded, ServerError
+from decktutorsdk.ratelimit import RateLimiter
+from decktutorsdk.resolvers import AuthResolver
+from decktutorsdk.transport import Transport
+
+
+def response(status, content=b'{"id": 1}'):
+    return mock.Mock(status_code=status, reason="", content=content, headers={})
+
+
+class DeadlineTest(unittest.TestCase):
+
+    @mock.patch.object(deadline_module, "clock")
+    def test_deadline(self, clock):
+        clock.return_value = 100.0
+        deadline = Deadline(10)
+        clock.return_value = 104.0
+        self.assertEqual(deadline.remaining(), 6)
+        self.assertEqual(deadline.timeout((5, 60)), (5, 6))
+        self.assertEqual(deadline.timeout(None), 6)
+        self.assertEqual(deadline.timeout(3), 3)
+        self.assertTrue(deadline.allows(5))
+        self.assertFalse(deadline.allows(7))
+        deadline.check()
+        clock.return_value = 110.0
+        self.assertTrue(deadline.expired)
+        with self.assertRaises(DeadlineExceeded):
+            deadline.check()
+
+    def test_create(self):
+        deadline = Deadline(1)
+        self.assertIs(create_deadline(deadline), deadline)
+        self.assertIsNone(create_deadline(None))
+        self.assertEqual(create_deadline(5).seconds, 5)
+        self.assertEqual(create_timeout(None), DEFAULT_TIMEOUT)
+        self.assertIsNone(create_timeout(False))
+        self.assertEqual(create_timeout(2), 2)
+
+
+class ApiTimeoutTest(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = mock.Mock(spec=Transport)
+        self.transport.request.return_value = response(200)
+        self.api = Api(username="dummy", password="dummy", mode="live", transport=self.transport,
+                       timeout=(1, 2), retry={"max_attempts": 3, "backoff": 10, "jitter": False})
+
+    def timeouts(self):
+        return [call[1]["timeout"] for call in self.transport.request.call_args_list]
+
+    def test_timeouts(self):
+        self.api.request("/things", "GET")
+        self.api.request("/things", "GET", timeout=5)
+        self.assertEqual(self.timeouts(), [(1, 2), 5])
+
+    def test_endpoint_timeout(self):
+        api_factory.configure(username="dummy", password="dummy", auth_api=self.api)
+        self.addCleanup(setattr, api_factory, "_auth_api", None)
+        AuthResolver().resolve(api_map={'url': '/things', 'method': 'GET', 'timeout': (3, 4)})
+        self.assertEqual(self.timeouts(), [(3, 4)])
+
+    def test_expired(self):
+        with self.assertRaises(DeadlineExceeded):
+            self.api.request("/things", "GET", deadline=Deadline(-1))
+        self.assertFalse(self.transport.request.called)
+
+    def test_capped_timeout(self):
+        self.api.request("/things", "GET", deadline=0.5)
+        connect, read = self.timeouts()[0]
+        self.assertLessEqual(connect, 0.5)
+        self.assertLessEqual(read, 0.5)
+
+    def test_no_retry_past_deadline(self):
+        self.transport.request.return_value = response(503)
+        with self.assertRaises(ServerError):
+            self.api.request("/things", "GET", deadline=5)
+        self.assertEqual(self.transport.request.call_count, 1)
+
+    def test_login_within_deadline(self):
+        self.api.authenticate = True
+        self.transport.request.return_value = response(
+            200, b'{"auth_token": "token", "auth_token_secret": "secret"}'
+        )
+        self.api.request("/things", "GET", deadline=30)
+        login, call = self.transport.request.call_args_list
+        self.assertTrue(login[0][1].endswith("/account/login"))
+        self.assertLessEqual(login[1]["timeout"][1], 30)
+
+    def test_rate_limit_within_deadline(self):
+        self.api.rate_limiter = RateLimiter(rate=1, capacity=1)
+        self.api.request("/things", "GET", deadline=0.2)
+        with self.assertRaises(DeadlineExceeded):
+            self.api.request("/things", "GET", deadline=0.2)
+        self.assertEqual(self.transport.request.call_count, 1)
+        self.assertEqual(self.api.rate_limiter.stats()["calls"], 1)
+
+
+class PaginationDeadlineTest(unittest.TestCase):
+
+    def test_pages_after_deadline(self):
+        server = DecktutorStub(items=100, latency=0.05).start()
+        self.addCleanup(server.stop)
+        api = Api(username="test", password="password", mode="live", endpoint=server.url, authenticate=True)
+        api_factory.configure(username="test", password="password", auth_api=api)
+        self.addCleanup(setattr, api_factory, "_auth_api", None)
+        items = []
+        with self.assertRaises(DeadlineExceeded):
+            for item in decktutor.search.self_serp.iter(body={}, page_size=10, deadline=0.25):
+                items.append(item)
+        self.assertTrue(10 <= len(items) < 100)
+        self.assertLess(server.calls["search.self_serp"], 10)
+
@@ -73,7 +73,8 @@ class DecktutorTest(unittest.TestCase):
         decktutor.insertions.info(url_entry={'code': 123})
 
         mock_request.assert_called_once_with(
-            url="/insertions/123/", method="GET", page=None, page_size=None
+            url="/insertions/123/", method="GET", page=None, page_size=None,
+            endpoint_name="insertions.info"
         )
 
     @mock.patch("decktutorsdk.api.Api.request")
@@ -83,7 +84,8 @@ class DecktutorTest(unittest.TestCase):
         decktutor.insertions.info(url_entry={'code': 456}, params={'param1': 'abc'})
 
         mock_request.assert_called_once_with(
-            url="/insertions/456/", method="GET", page=None, page_size=None, params={'param1': 'abc'}
+            url="/insertions/456/", method="GET", page=None, page_size=None, params={'param1': 'abc'},
+            endpoint_name="insertions.info"
         )
 
     @mock.patch("decktutorsdk.api.Api.request")
@@ -93,7 +95,8 @@ class DecktutorTest(unittest.TestCase):
         decktutor.insertions.info(url_entry={'code': 456}, params={'param1': 'abc'}, page=3, page_size=50)
 
         mock_request.assert_called_once_with(
-            url="/insertions/456/", method="GET", page=3, page_size=50, params={'param1': 'abc'}
+            url="/insertions/456/", method="GET", page=3, page_size=50, params={'param1': 'abc'},
+            endpoint_name="insertions.info"
         )
 
     @mock.patch("decktutorsdk.api.Api.request")
@@ -103,7 +106,7 @@ class DecktutorTest(unittest.TestCase):
         decktutor.another.request(url_entry={'id': 123})
 
         mock_request.assert_called_once_with(
-            url="/things/123/url", page=None, page_size=None, method="POST"
+            url="/things/123/url", page=None, page_size=None, method="POST", endpoint_name="another.request"
         )
 
     @mock.patch("decktutorsdk.api.Api.request")
@@ -113,7 +116,7 @@ class DecktutorTest(unittest.TestCase):
         decktutor.another.request(url_entry={'id': 123}, page=2)
 
         mock_request.assert_called_once_with(
-            url="/things/123/url", page=2, page_size=None, method="POST"
+            url="/things/123/url", page=2, page_size=None, method="POST", endpoint_name="another.request"
         )
 
     @mock.patch("decktutorsdk.api.Api.request")
@@ -123,5 +126,6 @@ class DecktutorTest(unittest.TestCase):
         decktutor.another.request(url_entry={'id': 123}, body="my_body", params={"param1": "param"}, headers="head")
 
         mock_request.assert_called_once_with(
-            url="/things/123/url", method="POST", body="my_body", page=None, page_size=None, params={"param1": "param"}, headers="head"
+            url="/things/123/url", method="POST", body="my_body", page=None, page_size=None, params={"param1": "param"}, headers="head",
+            endpoint_name="another.request"
         )
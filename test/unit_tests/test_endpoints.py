@@ -0,0 +1,85 @@
+import unittest
+from ..test_helper import mock
+from decktutorsdk.api import api_factory
+from decktutorsdk.api_map import api_map
+from decktutorsdk.decktutor import Decktutor
+from decktutorsdk.endpoints import Endpoint, compile_api_map, compile_endpoint
+from decktutorsdk.exceptions import MissingConfig, MissingParam
+from decktutorsdk.resolvers import AuthResolver, BaseResolver, DefaultResolver
+
+
+class CustomResolver(BaseResolver):
+    """
+    Resolver with its own no argument __init__ and no `authenticate`
+    """
+    def __init__(self):
+        self.calls = 0
+
+    def resolve(self, **kwargs):
+        self.calls += 1
+        return super(CustomResolver, self).resolve(**kwargs)
+
+
+class EndpointTest(unittest.TestCase):
+
+    def test_compile(self):
+        endpoint = Endpoint({'url': '/insertions/{code}/field/{name}', 'method': 'PUT', 'idempotent': True,
+                             'resolver': 'decktutorsdk.resolvers.AuthResolver'}, name="insertions.update")
+        self.assertIs(endpoint.resolver_class, AuthResolver)
+        self.assertTrue(endpoint.authenticate)
+        self.assertEqual(endpoint.options, {'idempotent': True})
+        self.assertEqual(endpoint.build_url({'code': 12, 'name': 'price'}), '/insertions/12/field/price')
+        self.assertEqual(endpoint.regex.match('/insertions/12/field/price').groups(), ('12', 'price'))
+
+    def test_build_url(self):
+        self.assertEqual(Endpoint({'url': '/account/login', 'method': 'POST'}).build_url(), '/account/login')
+        self.assertEqual(Endpoint({'url': '/a/{id}', 'method': 'GET'}).build_url({'id': (1, 2)}), '/a/(1, 2)')
+        self.assertEqual(Endpoint({'url': '/100%/{id}', 'method': 'GET'}).build_url({'id': '%s'}), '/100%/%s')
+        self.assertEqual(Endpoint({'url': '/a/{id:03d}', 'method': 'GET'}).build_url({'id': 7}), '/a/007')
+        with self.assertRaises(MissingParam):
+            Endpoint({'url': '/a/{id}', 'method': 'GET'}).build_url({})
+
+    def test_default_resolver(self):
+        endpoint = Endpoint({'url': '/a', 'method': 'GET'})
+        self.assertIs(endpoint.resolver_class, DefaultResolver)
+        self.assertFalse(endpoint.authenticate)
+
+    def test_invalid(self):
+        with self.assertRaises(MissingConfig):
+            compile_endpoint({'info': {'url': '/a', 'method': 'GET'}})
+        with self.assertRaises(Exception):
+            Endpoint({'url': '/a'})
+
+    def test_compile_api_map(self):
+        endpoints = compile_api_map(api_map["current"]["api"])
+        self.assertEqual(endpoints["handlings.steps.paid"].url, '/handlings/{code}/step/paid')
+        self.assertIsNotNone(endpoints["insertions.bulk_create"].operation)
+        self.assertTrue(endpoints["search.self_serp"].paginated)
+
+
+class DispatchTest(unittest.TestCase):
+
+    def setUp(self):
+        api_factory.configure(username="test", password="password")
+
+    @mock.patch("decktutorsdk.decktutor.compile_endpoint", wraps=compile_endpoint)
+    @mock.patch("decktutorsdk.api.Api.request")
+    def test_compiled_once(self, mock_request, mock_compile):
+        decktutor = Decktutor(api_map={'insertions': {'info': {'url': '/insertions/{code}/', 'method': 'GET'}}})
+        decktutor.insertions.info(url_entry={'code': 1})
+        decktutor.insertions.info(url_entry={'code': 2})
+        self.assertEqual(mock_compile.call_count, 1)
+        mock_request.assert_called_with(url="/insertions/2/", method="GET", page=None, page_size=None,
+                                        endpoint_name="insertions.info")
+
+    @mock.patch("decktutorsdk.api.Api.request")
+    def test_custom_resolver(self, mock_request):
+        decktutor = Decktutor(api_map={'things': {'get': {
+            'url': '/things/{id}', 'method': 'GET', 'resolver': __name__ + '.CustomResolver'}}})
+        self.assertFalse(decktutor.things.get.endpoint.authenticate)
+        decktutor.things.get(url_entry={'id': 1})
+        mock_request.assert_called_once_with(url="/things/1", method="GET", page=None, page_size=None,
+                                             endpoint_name="things.get")
+        resolver = decktutor.things.get.get_resolver()
+        self.assertIsInstance(resolver, CustomResolver)
+        self.assertIs(resolver.endpoint, decktutor.things.get.endpoint)
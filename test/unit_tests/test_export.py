@@ -0,0 +1,117 @@
+import collections
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from ..test_helper import mock
+from ..stub_server import DecktutorStub
+from decktutorsdk import export as export_module
+from decktutorsdk.api import Api, api_factory
+from decktutorsdk.decktutor import decktutor
+from decktutorsdk.exceptions import MissingConfig
+from decktutorsdk.export import CsvWriter, export, guess_format
+from decktutorsdk.models import Insertion
+
+# ordered, python 2 dicts are not
+ROWS = [collections.OrderedDict(row) for row in (
+    [("code", "1"), ("price", 1.5), ("tags", ["foil"])],
+    [("code", "2"), ("quantity", 3)],
+    [("code", "3"), ("extra", "x")],
+)]
+
+
+class ExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_csv(self):
+        self.assertEqual(export(iter(ROWS), self.path("rows.csv"), batch_size=2), 3)
+        with open(self.path("rows.csv")) as csv_file:
+            rows = list(csv.reader(csv_file))
+        # columns come from the first batch, "extra" only appears in the second one
+        self.assertEqual(rows, [["code", "price", "tags", "quantity"], ["1", "1.5", '["foil"]', ""],
+                                ["2", "", "", "3"], ["3", "", "", ""]])
+
+    def test_jsonl(self):
+        output = io.BytesIO()
+        export([Insertion.from_dict(ROWS[0])], output, format="jsonl", columns=["code", "price"])
+        self.assertEqual(json.loads(output.getvalue().decode("utf-8")), {"code": "1", "price": 1.5})
+
+    def test_batches(self):
+        with mock.patch.object(CsvWriter, "write") as write:
+            export(iter(ROWS), io.StringIO(), format="csv", batch_size=2)
+        self.assertEqual([len(call[0][0]) for call in write.call_args_list], [2, 1])
+
+    def test_empty(self):
+        self.assertEqual(export([], self.path("rows.csv"), columns=["code"]), 0)
+        with open(self.path("rows.csv")) as csv_file:
+            self.assertEqual(csv_file.read().strip(), "code")
+
+    def test_format(self):
+        self.assertEqual(guess_format("results.ndjson"), "jsonl")
+        self.assertEqual(guess_format("results.parquet"), "parquet")
+        with self.assertRaises(MissingConfig):
+            guess_format("results.txt")
+
+    @mock.patch.object(export_module, "pyarrow", None)
+    def test_missing_pyarrow(self):
+        with self.assertRaises(MissingConfig):
+            export(ROWS, self.path("rows.parquet"))
+
+    @unittest.skipIf(export_module.pyarrow is None, "pyarrow is not installed")
+    def test_parquet(self):
+        import pyarrow.parquet
+        self.assertEqual(export(iter(ROWS), self.path("rows.parquet"), batch_size=2), 3)
+        table = pyarrow.parquet.read_table(self.path("rows.parquet"))
+        self.assertEqual(table.column_names, ["code", "price", "tags", "quantity"])
+        self.assertEqual(table.num_rows, 3)
+
+    @unittest.skipIf(export_module.pyarrow is None, "pyarrow is not installed")
+    def test_arrow_types_change(self):
+        import pyarrow
+        rows = [{"code": "1", "price": 1.5, "tags": {"foil": True}, "quantity": 1},
+                {"code": 2, "price": 2, "tags": ["x"], "quantity": "many"},
+                {"code": "3", "price": None, "tags": None, "quantity": 3}]
+        self.assertEqual(export(iter(rows), self.path("rows.arrow"), batch_size=1), 3)
+        table = pyarrow.ipc.open_file(self.path("rows.arrow")).read_all()
+        self.assertEqual(table.schema.field("price").type, pyarrow.float64())
+        self.assertEqual(table.schema.field("quantity").type, pyarrow.int64())
+        self.assertEqual(table.to_pylist(), [
+            {"code": "1", "price": 1.5, "tags": '{"foil": true}', "quantity": 1},
+            {"code": "2", "price": 2.0, "tags": '["x"]', "quantity": None},
+            {"code": "3", "price": None, "tags": None, "quantity": 3},
+        ])
+
+    @unittest.skipIf(export_module.pyarrow is None, "pyarrow is not installed")
+    def test_parquet_large_integers(self):
+        import pyarrow.parquet
+        rows = [{"code": 12345678901234567, "quantity": 3, "price": 1.5},
+                {"code": 2 ** 53 + 1, "quantity": 1, "price": 2}]
+        self.assertEqual(export(iter(rows), self.path("rows.parquet")), 2)
+        self.assertEqual(pyarrow.parquet.read_table(self.path("rows.parquet")).to_pylist(), [
+            {"code": 12345678901234567, "quantity": 3, "price": 1.5},
+            {"code": 2 ** 53 + 1, "quantity": 1, "price": 2.0},
+        ])
+
+    def test_decktutor_export(self):
+        server = DecktutorStub(items=25).start()
+        api = Api(username="test", password="password", mode="live", endpoint=server.url, authenticate=True)
+        api_factory.configure(username="test", password="password", auth_api=api)
+        try:
+            self.assertEqual(decktutor.search.self_serp.export(self.path("rows.jsonl"), body={}, page_size=10), 25)
+        finally:
+            server.stop()
+            api_factory._api = api_factory._auth_api = None
+        with open(self.path("rows.jsonl")) as jsonl_file:
+            codes = [json.loads(line)["code"] for line in jsonl_file]
+        self.assertEqual(codes, [str(index) for index in range(25)])
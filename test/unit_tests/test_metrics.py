@@ -0,0 +1,140 @@
+import unittest
+from ..test_helper import mock
+from decktutorsdk.api import Api
+from decktutorsdk.exceptions import ResourceNotFound
+from decktutorsdk.api import api_factory
+from decktutorsdk.decktutor import decktutor
+from decktutorsdk.metrics import Hook, Hooks, OpenTelemetryHook, PrometheusCollector, RequestInfo
+from decktutorsdk.transport import Transport
+
+
+class Recorder(Hook):
+
+    def __init__(self):
+        self.events = []
+
+    def before(self, request):
+        self.events.append(("before", request.name))
+
+    def after(self, request):
+        self.events.append(("after", request.name, request.status, request.bytes, request.attempts,
+                            request.cached, request.coalesced, type(request.error).__name__))
+
+
+def response(status, content=b'{"id": 1}'):
+    return mock.Mock(status_code=status, reason="", content=content, headers={})
+
+
+class EndpointNameTest(unittest.TestCase):
+
+    def setUp(self):
+        self.recorder = Recorder()
+        api_factory.configure(username="test", password="password", hooks=[self.recorder])
+        self.addCleanup(api_factory.configure, username="test", password="password")
+
+    @mock.patch("decktutorsdk.api.Api.http_call")
+    def test_name_from_tree(self, mock_http):
+        mock_http.return_value = {"auth_token": "token", "auth_token_secret": "secret"}
+        decktutor.insertions.info(url_entry={'code': 123})
+        decktutor.insertions.publish_list(url_entry={'code': "1,2"})
+        decktutor.handlings.steps.paid(url_entry={'code': 1})
+        names = [event[1] for event in self.recorder.events if event[0] == "after"]
+        self.assertEqual(names, ["insertions.info", "insertions.publish_list", "handlings.steps.paid"])
+
+    def test_direct_call(self):
+        transport = mock.Mock(spec=Transport)
+        transport.request.return_value = response(200)
+        api = Api(username="test", password="password", mode="live", transport=transport, hooks=[self.recorder])
+        api.request("/products/12", "GET")
+        self.assertEqual(self.recorder.events[0], ("before", None))
+
+
+class ApiHooksTest(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = mock.Mock(spec=Transport)
+        self.recorder = Recorder()
+        self.api = Api(username="test", password="password", mode="live", transport=self.transport,
+                       hooks=[self.recorder], cache=True)
+
+    def test_request(self):
+        self.transport.request.return_value = response(200)
+        self.api.request("/products/12", "GET", endpoint_name="products.info")
+        self.assertEqual(self.recorder.events, [
+            ("before", "products.info"),
+            ("after", "products.info", 200, 9, 1, False, False, "NoneType"),
+        ])
+
+    @mock.patch("decktutorsdk.api.time.sleep")
+    def test_retry_and_error(self, mock_sleep):
+        self.transport.request.side_effect = [response(503), response(404)]
+        with self.assertRaises(ResourceNotFound):
+            self.api.request("/products/12", "GET")
+        self.assertEqual(self.recorder.events[-1][2:], (404, 9, 2, False, False, "ResourceNotFound"))
+
+    def test_cached(self):
+        self.transport.request.return_value = response(200)
+        self.api.request("/products/12", "GET", cache_ttl=60)
+        self.api.request("/products/12", "GET", cache_ttl=60)
+        self.assertEqual(self.transport.request.call_count, 1)
+        self.assertEqual(self.recorder.events[-1][2:], (None, 0, 0, True, False, "NoneType"))
+
+    def test_failing_hook(self):
+        hook = mock.Mock(spec=Hook)
+        hook.before.side_effect = ValueError
+        self.api.hooks.add(hook)
+        self.transport.request.return_value = response(200)
+        self.assertEqual(self.api.request("/products/12", "GET"), {"id": 1})
+        self.assertTrue(hook.after.called)
+
+    def test_no_hooks(self):
+        self.api = Api(username="test", password="password", mode="live", transport=self.transport)
+        self.assertFalse(self.api.hooks)
+        self.transport.request.return_value = response(200)
+        self.api.request("/products/12", "GET")
+        self.assertNotIn("call", self.transport.request.call_args[1])
+
+
+class PrometheusCollectorTest(unittest.TestCase):
+
+    def finished(self, latency, status=200, error=None):
+        request = RequestInfo("products.info", "GET", "http://stub/products/1")
+        request.status, request.bytes, request.attempts = status, 100, 2
+        request.latency, request.error = latency, error
+        return request
+
+    def test_render(self):
+        collector = PrometheusCollector(buckets=(0.1, 1))
+        collector.after(self.finished(0.05))
+        collector.after(self.finished(0.5))
+        collector.after(self.finished(5))
+        collector.after(self.finished(0.5, status=None, error=ResourceNotFound(None)))
+        text = collector.render()
+
+        labels = 'endpoint="products.info",method="GET",status="200"'
+        self.assertIn('decktutor_request_duration_seconds_bucket{%s,le="0.1"} 1' % labels, text)
+        self.assertIn('decktutor_request_duration_seconds_bucket{%s,le="1"} 2' % labels, text)
+        self.assertIn('decktutor_request_duration_seconds_bucket{%s,le="+Inf"} 3' % labels, text)
+        self.assertIn('decktutor_request_duration_seconds_count{%s} 3' % labels, text)
+        self.assertIn('decktutor_response_bytes_total{%s} 300' % labels, text)
+        self.assertIn('decktutor_retries_total{%s} 3' % labels, text)
+        self.assertIn('status="ResourceNotFound"', text)
+
+
+class OpenTelemetryHookTest(unittest.TestCase):
+
+    def test_span(self):
+        tracer = mock.Mock()
+        hook = OpenTelemetryHook(tracer=tracer)
+        hooks = Hooks([hook])
+        request = hooks.start("products.info", "GET", "http://stub/products/1")
+        tracer.start_span.assert_called_once_with(
+            "decktutor products.info", attributes={"http.method": "GET", "http.url": "http://stub/products/1"})
+        request.status = 404
+        error = ResourceNotFound(None)
+        hooks.finish(request, error)
+
+        span = tracer.start_span.return_value
+        span.set_attribute.assert_any_call("http.status_code", 404)
+        span.record_exception.assert_called_once_with(error)
+        span.end.assert_called_once_with()
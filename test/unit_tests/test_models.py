@@ -0,0 +1,55 @@
+import datetime
+import json
+import unittest
+from decktutorsdk.models import Insertion, Handling, Model
+from decktutorsdk.streaming import ItemParser
+from decktutorsdk.utils import get_fixed_timezone
+
+ITEM = {"code": "123", "name": "Black Lotus", "price": 2.5, "quantity": 1,
+        "created_at": "2016-03-01T10:20:30+01:00", "seller": {"nick": "seller"}}
+
+
+class ModelTest(unittest.TestCase):
+
+    def test_lazy_decoding(self):
+        insertion = Insertion.from_json(json.dumps(ITEM).encode("utf-8"))
+        self.assertIsNone(insertion._values)
+        self.assertEqual(insertion.code, "123")
+        self.assertIsNone(insertion._raw)
+        self.assertEqual(insertion.price, 2.5)
+        self.assertIsNone(insertion.foil)
+        self.assertEqual(insertion["seller"], {"nick": "seller"})
+        self.assertEqual(insertion.get("missing", 0), 0)
+        with self.assertRaises(KeyError):
+            insertion["missing"]
+        with self.assertRaises(AttributeError):
+            insertion.missing = 1
+
+    def test_dates(self):
+        insertion = Insertion.from_dict(ITEM)
+        created_at = datetime.datetime(2016, 3, 1, 10, 20, 30, tzinfo=get_fixed_timezone(60))
+        self.assertEqual(insertion.created_at, created_at)
+        self.assertIs(insertion.created_at, insertion.created_at)
+        self.assertIsNone(insertion.updated_at)
+        self.assertEqual(insertion.to_dict()["created_at"], "2016-03-01T10:20:30+01:00")
+
+    def test_to_dict(self):
+        data = Insertion.from_json(json.dumps(ITEM).encode("utf-8")).to_dict()
+        self.assertEqual(dict((key, value) for key, value in data.items() if value is not None), ITEM)
+        self.assertEqual(Insertion.from_dict(ITEM), Insertion.from_json(json.dumps(ITEM).encode("utf-8")))
+        self.assertNotEqual(Insertion.from_dict(ITEM), Handling.from_dict(ITEM))
+        self.assertEqual(Insertion.wrap([ITEM, ITEM])[1].name, "Black Lotus")
+
+    def test_fields(self):
+        class Custom(Model):
+            fields = ("code", "day")
+            dates = ("day",)
+        custom = Custom.from_dict({"code": 1, "day": "2016-03-01 10:00"})
+        self.assertEqual(custom.day, datetime.datetime(2016, 3, 1, 10, 0))
+        self.assertEqual(repr(custom), "<Custom 1>")
+        self.assertFalse(hasattr(custom, "__dict__"))
+
+    def test_stream(self):
+        parser = ItemParser("results", loads=Insertion.from_json)
+        items = parser.feed(json.dumps({"results": [ITEM, ITEM]}).encode("utf-8"))
+        self.assertEqual([item.code for item in items], ["123", "123"])
@@ -0,0 +1,112 @@
+import threading
+import time
+import unittest
+from ..test_helper import mock
+from decktutorsdk.decktutor import Decktutor, decktutor
+from decktutorsdk.exceptions import BadRequest, MissingConfig
+from decktutorsdk.pagination import Paginator, PrefetchPaginator, extract_items
+
+
+def fake_pages(total):
+    """
+    Returns a request mock serving `total` items through offset/limit windows
+    """
+    def request(url, method, page_size=None, page=None, **kwargs):
+        offset = page * page_size
+        return {"results": list(range(total))[offset:offset + page_size], "count": total}
+    return mock.Mock(side_effect=request)
+
+
+class PaginatorTest(unittest.TestCase):
+
+    def test_extract_items(self):
+        self.assertEqual(extract_items([1, 2]), [1, 2])
+        self.assertEqual(extract_items({"results": [1], "count": 1}), [1])
+        self.assertEqual(extract_items({"a": [1], "b": [2]}, items_key="b"), [2])
+        self.assertEqual(extract_items({"a": [1], "b": [2]}), [])
+        with self.assertRaises(BadRequest):
+            extract_items({"error": {"message": "invalid"}})
+
+    def test_stops_on_short_page(self):
+        fetch = mock.Mock(side_effect=[[1, 2], [3, 4], [5]])
+        self.assertEqual(list(Paginator(fetch, 2)), [1, 2, 3, 4, 5])
+        self.assertEqual(fetch.call_args_list, [mock.call(0, 2), mock.call(1, 2), mock.call(2, 2)])
+
+    def test_stops_on_empty_page(self):
+        fetch = mock.Mock(side_effect=[[1, 2], []])
+        self.assertEqual(list(Paginator(fetch, 2)), [1, 2])
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_lazy_fetch(self):
+        fetch = mock.Mock(side_effect=[[1, 2], [3, 4]])
+        items = iter(Paginator(fetch, 2))
+        self.assertEqual(next(items), 1)
+        self.assertEqual(next(items), 2)
+        self.assertEqual(fetch.call_count, 1)
+
+
+class DecktutorIterTest(unittest.TestCase):
+
+    @mock.patch("decktutorsdk.api.Api.request")
+    def test_iter(self, mock_request):
+        mock_request.side_effect = fake_pages(25).side_effect
+        items = list(decktutor.search.serp.iter(body={"name": "island"}, page_size=10))
+
+        self.assertEqual(items, list(range(25)))
+        self.assertEqual(mock_request.call_count, 3)
+        mock_request.assert_called_with(
+            url="/search/serp", method="POST", page=2, page_size=10, body={"name": "island"}, idempotent=True,
+            endpoint_name="search.serp"
+        )
+
+    @mock.patch("decktutorsdk.api.Api.request")
+    def test_iter_default_page_size(self, mock_request):
+        mock_request.side_effect = fake_pages(100).side_effect
+        items = list(decktutor.insertions.messages.iter(url_entry={"code": 1}))
+
+        self.assertEqual(len(items), 100)
+        self.assertEqual(mock_request.call_count, 2)
+
+    def test_not_paginated(self):
+        with self.assertRaises(MissingConfig):
+            decktutor.insertions.info.iter(url_entry={"code": 1})
+        with self.assertRaises(MissingConfig):
+            Decktutor(api_map={'url': '/things', 'method': 'GET'}).iter()
+
+
+class PrefetchPaginatorTest(unittest.TestCase):
+
+    def test_pages_in_order(self):
+        def fetch(page, page_size):
+            # later pages answer first
+            time.sleep(0.01 * (5 - page) if page < 5 else 0)
+            return list(range(page * page_size, min((page + 1) * page_size, 23)))
+
+        self.assertEqual(list(PrefetchPaginator(fetch, 5, prefetch=3)), list(range(23)))
+
+    def test_nothing_past_window_after_last_page(self):
+        started = []
+        lock = threading.Lock()
+
+        def fetch(page, page_size):
+            with lock:
+                started.append(page)
+            if page == 0:
+                return [1]
+            time.sleep(0.05)
+            return [1, 2]
+
+        self.assertEqual(list(PrefetchPaginator(fetch, 2, prefetch=4)), [1])
+        time.sleep(0.1)
+        # pages in the window are fetched and discarded, nothing past the window is requested
+        self.assertIn(0, started)
+        self.assertTrue(set(started) <= set(range(4)))
+
+    @mock.patch("decktutorsdk.api.Api.request")
+    def test_decktutor_prefetch(self, mock_request):
+        mock_request.side_effect = fake_pages(95).side_effect
+        items = list(decktutor.search.self_serp.iter(body={}, page_size=10, prefetch=4))
+
+        self.assertEqual(items, list(range(95)))
+        requested = sorted(call[1]["page"] for call in mock_request.call_args_list)
+        self.assertEqual(requested[:10], list(range(10)))
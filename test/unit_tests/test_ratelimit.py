@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+from ..test_helper import mock
+from decktutorsdk.api import Api
+from decktutorsdk.ratelimit import RateLimiter, TokenBucket, create_rate_limiter
+from decktutorsdk.transport import Transport
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    @mock.patch("decktutorsdk.ratelimit.time.time")
+    def test_reserve(self, mock_time):
+        mock_time.return_value = 100
+        bucket = TokenBucket(rate=2, capacity=2)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0.5)
+        self.assertEqual(bucket.reserve(), 1)
+        # refilled, capped at capacity
+        mock_time.return_value = 110
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0.5)
+
+    @mock.patch("decktutorsdk.ratelimit.time.time")
+    def test_max_delay(self, mock_time):
+        mock_time.return_value = 100
+        bucket = TokenBucket(rate=1, capacity=1)
+        self.assertEqual(bucket.reserve(max_delay=0), 0)
+        self.assertIsNone(bucket.reserve(max_delay=0.5))
+        self.assertEqual(bucket.reserve(max_delay=1), 1)
+        bucket.cancel()
+        self.assertEqual(bucket.reserve(), 1)
+
+    def test_threads(self):
+        limiter = RateLimiter(rate=100, capacity=1)
+        start = time.time()
+        threads = [threading.Thread(target=lambda: [limiter.wait() for _ in range(10)]) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # 50 calls at 100/s with no burst
+        self.assertGreaterEqual(time.time() - start, 0.45)
+        self.assertEqual(limiter.stats()["calls"], 50)
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    @mock.patch("decktutorsdk.ratelimit.time.time")
+    def test_groups(self, mock_time):
+        mock_time.return_value = 100
+        limiter = RateLimiter(rate=10, groups={"search": 1, "insertions": {"rate": 2, "capacity": 4}})
+        self.assertEqual(limiter.reserve("search"), 0)
+        self.assertEqual(limiter.reserve("search"), 1)
+        for _ in range(4):
+            self.assertEqual(limiter.reserve("insertions"), 0)
+        self.assertEqual(limiter.reserve("handlings"), 0)
+
+        stats = limiter.stats()
+        self.assertEqual(stats["calls"], 7)
+        self.assertEqual(stats["delayed"], 1)
+        self.assertEqual(stats["groups"]["search"], {"calls": 2, "delayed": 1, "delay": 1})
+        self.assertEqual(stats["groups"]["insertions"]["delayed"], 0)
+
+    @mock.patch("decktutorsdk.ratelimit.time.time")
+    def test_max_delay(self, mock_time):
+        mock_time.return_value = 100
+        limiter = RateLimiter(rate=1, capacity=2, groups={"search": 1})
+        self.assertEqual(limiter.reserve("search"), 0)
+        # refused by the group: the global token is given back
+        self.assertIsNone(limiter.reserve("search", max_delay=0.5))
+        self.assertEqual(limiter.reserve(max_delay=0), 0)
+        self.assertIsNone(limiter.wait(max_delay=0.5))
+        self.assertEqual(limiter.stats()["calls"], 2)
+
+    def test_create_rate_limiter(self):
+        self.assertIsNone(create_rate_limiter())
+        self.assertEqual(create_rate_limiter({"rate": 5}).bucket.rate, 5)
+
+
+class ApiRateLimitTest(unittest.TestCase):
+
+    def test_rate_group(self):
+        api = Api(username="test", password="password", mode="live")
+        self.assertEqual(api.rate_group("https://ws.decktutor.com/app/v2/search/serp"), "search")
+        self.assertEqual(api.rate_group("https://ws.decktutor.com/app/v2/insertions/1/page"), "insertions")
+        self.assertEqual(api.rate_group("https://ws.decktutor.com/app/v2/account/login"), "account")
+
+    def test_http_call_waits(self):
+        transport = mock.Mock(spec=Transport)
+        transport.request.return_value = mock.Mock(status_code=200, reason="OK", content=b'{}')
+        limiter = mock.Mock(spec=RateLimiter)
+        api = Api(username="test", password="password", mode="live", transport=transport, rate_limit=limiter)
+        api.request("/handlings/1/report", "GET")
+        limiter.wait.assert_called_once_with("handlings")
@@ -0,0 +1,75 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from ..test_helper import mock
+from decktutorsdk.api import Api
+from decktutorsdk.recording import ResponseRecorder, create_recorder, default_recorder
+from decktutorsdk.transport import Transport
+
+
+class ResponseRecorderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self, path, compress=False):
+        with (gzip.open(path, "rb") if compress else open(path, "rb")) as recorded:
+            return [json.loads(line.decode("utf-8")) for line in recorded]
+
+    def test_record(self):
+        recorder = ResponseRecorder(self.directory)
+        recorder.record("GET", "http://stub/products/1", {"id": 1})
+        recorder.record("POST", "http://stub/search/serp", {"results": []})
+        self.assertTrue(recorder.flush(5))
+        lines = self.read(recorder.path)
+        self.assertEqual([(line["method"], line["url"], line["response"]) for line in lines],
+                         [("GET", "http://stub/products/1", {"id": 1}),
+                          ("POST", "http://stub/search/serp", {"results": []})])
+        recorder.close()
+        self.assertEqual(recorder.stats()["recorded"], 2)
+
+    def test_compress_and_rotate(self):
+        recorder = ResponseRecorder(self.directory, compress=True, max_bytes=1, backups=2)
+        for index in range(4):
+            recorder.record("GET", "http://stub/products/%d" % index, {"id": index})
+        recorder.close()
+        self.assertEqual(sorted(os.listdir(self.directory)), ["responses.1.jsonl.gz", "responses.2.jsonl.gz"])
+        self.assertEqual(self.read(recorder.file_path(1), compress=True)[0]["response"], {"id": 3})
+
+    def test_never_blocks(self):
+        recorder = ResponseRecorder(self.directory, queue_size=1)
+        with mock.patch.object(recorder, "start"):
+            recorder._thread = mock.Mock()
+            recorder.record("GET", "/a", {})
+            recorder.record("GET", "/b", {})
+        self.assertEqual(recorder.stats()["dropped"], 1)
+
+    def test_errors_are_counted(self):
+        path = os.path.join(self.directory, "file")
+        open(path, "w").close()
+        recorder = ResponseRecorder(os.path.join(path, "responses"))
+        recorder.record("GET", "/a", {})
+        recorder.record("GET", "/b", set())
+        recorder.close()
+        self.assertEqual(recorder.stats()["errors"], 2)
+
+    def test_create_recorder(self):
+        self.assertIs(create_recorder(None, "sandbox"), default_recorder())
+        self.assertIsNone(create_recorder(None, "live"))
+        self.assertIsNone(create_recorder(False, "sandbox"))
+        self.assertEqual(create_recorder({"directory": self.directory}).directory, self.directory)
+
+    def test_api_records(self):
+        transport = mock.Mock(spec=Transport)
+        transport.request.return_value = mock.Mock(status_code=200, reason="OK", content=b'{"id": 1}')
+        recorder = mock.Mock(spec=ResponseRecorder)
+        api = Api(username="test", password="password", transport=transport, record=recorder)
+        api.request("/products/1", "GET")
+        recorder.record.assert_called_once_with("GET", "https://ws.sandbox.decktutor.com/app/v2/products/1", {"id": 1})
+        self.assertIsNone(Api(username="test", password="password", record=False).recorder)
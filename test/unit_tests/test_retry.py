@@ -0,0 +1,113 @@
+import unittest
+from collections import namedtuple
+from ..test_helper import mock
+from ..stub_server import StubServer
+from decktutorsdk.api import Api
+from decktutorsdk.exceptions import ResourceNotFound, ServerError, TooManyRequests, UnauthorizedAccess
+from decktutorsdk.retry import NO_RETRY, RetryPolicy, create_retry_policy
+
+Response = namedtuple("Response", "status_code reason headers")
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3, backoff=1, max_backoff=5, jitter=False)
+        self.server_error = ServerError(Response(503, "Unavailable", {}))
+
+    def test_should_retry(self):
+        self.assertTrue(self.policy.should_retry("GET", self.server_error, 1))
+        self.assertTrue(self.policy.should_retry("GET", self.server_error, 2))
+        self.assertFalse(self.policy.should_retry("GET", self.server_error, 3))
+        self.assertFalse(self.policy.should_retry("GET", ResourceNotFound(Response(404, "", {})), 1))
+
+    def test_idempotency(self):
+        self.assertFalse(self.policy.should_retry("POST", self.server_error, 1))
+        self.assertTrue(self.policy.should_retry("POST", self.server_error, 1, idempotent=True))
+        self.assertFalse(self.policy.should_retry("GET", self.server_error, 1, idempotent=False))
+        throttled = TooManyRequests(Response(429, "Too Many Requests", {}))
+        self.assertTrue(self.policy.should_retry("POST", throttled, 1))
+
+    def test_backoff(self):
+        self.assertEqual([self.policy.delay(attempt) for attempt in range(1, 6)], [1, 2, 4, 5, 5])
+        policy = RetryPolicy(backoff=1, max_backoff=5)
+        for attempt in range(1, 6):
+            self.assertTrue(0 <= policy.delay(attempt) <= min(2 ** (attempt - 1), 5))
+
+    def test_retry_after(self):
+        error = ServerError(Response(503, "Unavailable", {"Retry-After": "2"}))
+        self.assertEqual(self.policy.delay(1, error), 2)
+        error = ServerError(Response(503, "Unavailable", {"Retry-After": "120"}))
+        self.assertEqual(self.policy.delay(1, error), 5)
+        error = ServerError(Response(503, "Unavailable", {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}))
+        self.assertEqual(self.policy.delay(1, error), 0)
+
+    def test_create_retry_policy(self):
+        self.assertIs(create_retry_policy(False), NO_RETRY)
+        self.assertEqual(create_retry_policy({"max_attempts": 7}).max_attempts, 7)
+        default = RetryPolicy()
+        self.assertIs(create_retry_policy(None, default=default), default)
+
+
+@mock.patch("decktutorsdk.api.time.sleep")
+class FlakyServerTest(unittest.TestCase):
+
+    def api(self, server, **kwargs):
+        return Api(username="test", password="password", mode="live", endpoint=server.url, **kwargs)
+
+    def test_retry_server_errors(self, mock_sleep):
+        with StubServer(body={"id": 1}, failures=[503, 502]) as server:
+            self.assertEqual(self.api(server).request("/insertions/1/", "GET"), {"id": 1})
+        self.assertEqual(server.requests, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_retry_connection_reset(self, mock_sleep):
+        with StubServer(body={"id": 1}, failures=["reset"]) as server:
+            self.assertEqual(self.api(server).request("/insertions/1/", "GET"), {"id": 1})
+        self.assertEqual(server.requests, 2)
+
+    def test_retry_after(self, mock_sleep):
+        with StubServer(body={"id": 1}, failures=[(429, {"Retry-After": "3"})]) as server:
+            self.assertEqual(self.api(server).request("/insertions/1/purchase", "POST"), {"id": 1})
+        mock_sleep.assert_called_once_with(3)
+
+    def test_give_up(self, mock_sleep):
+        with StubServer(body={"id": 1}, failures=[500, 500, 500]) as server:
+            with self.assertRaises(ServerError):
+                self.api(server, retry={"max_attempts": 3}).request("/insertions/1/", "GET")
+        self.assertEqual(server.requests, 3)
+
+    def test_post_not_retried(self, mock_sleep):
+        with StubServer(body={"id": 1}, failures=[503]) as server:
+            with self.assertRaises(ServerError):
+                self.api(server).request("/insertions/1/purchase", "POST")
+            self.assertEqual(self.api(server).request("/search/serp", "POST", idempotent=True), {"id": 1})
+        self.assertEqual(server.requests, 2)
+
+    def test_retry_disabled(self, mock_sleep):
+        with StubServer(body={"id": 1}, failures=[503]) as server:
+            with self.assertRaises(ServerError):
+                self.api(server).request("/insertions/1/", "GET", retry=False)
+
+
+class UnauthorizedRetryTest(unittest.TestCase):
+
+    @mock.patch("decktutorsdk.api.Api.http_call")
+    def test_unauthorized_retried_once(self, mock_http):
+        token = {"auth_token": "token", "auth_token_secret": "secret"}
+        api = Api(username="test", password="password", authenticate=True, mode="live")
+        api.token = token
+        mock_http.side_effect = [UnauthorizedAccess(Response(401, "", {})), token, {"id": 1}]
+        self.assertEqual(api.request("/insertions/1/", "GET", body={"a": 1}), {"id": 1})
+        # the retry keeps url and body and is signed again: the login sits in the middle
+        first, login, retry = mock_http.call_args_list
+        self.assertEqual(retry[0], ("https://ws.decktutor.com/app/v2/insertions/1/", "GET"))
+        self.assertEqual(retry[1]["data"], first[1]["data"])
+        self.assertNotEqual(retry[1]["headers"]["x-dt-Sequence"], first[1]["headers"]["x-dt-Sequence"])
+
+        mock_http.reset_mock()
+        mock_http.side_effect = [UnauthorizedAccess(Response(401, "", {})), token,
+                                 UnauthorizedAccess(Response(401, "", {}))]
+        with self.assertRaises(UnauthorizedAccess):
+            api.request("/insertions/1/", "GET")
+        self.assertEqual(mock_http.call_count, 3)
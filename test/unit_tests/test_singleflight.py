@@ -0,0 +1,182 @@
+import threading
+import time
+import unittest
+from ..test_helper import mock
+from decktutorsdk.api import Api
+from decktutorsdk.deadline import Deadline
+from decktutorsdk.exceptions import DeadlineExceeded, ResourceNotFound
+from decktutorsdk.singleflight import SingleFlight, create_single_flight
+from decktutorsdk.transport import Transport
+
+
+def run_threads(target, count):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(target())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def test_coalesce(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            release.wait()
+            return {"id": 1}
+
+        threads, results = run_threads(lambda: flight.do("key", func), 5)
+        while flight.stats()["deduplicated"] < 4:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"id": 1}] * 5)
+        # waiting callers get their own copy
+        self.assertEqual(len(set(id(result) for result in results)), 5)
+        self.assertEqual(flight.stats(), {"calls": 5, "deduplicated": 4, "in_flight": 0})
+
+    def test_error_shared(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def func():
+            release.wait()
+            raise ValueError("failed")
+
+        def call():
+            try:
+                flight.do("key", func)
+            except ValueError as error:
+                errors.append(error)
+
+        threads, _ = run_threads(call, 3)
+        while flight.deduplicated < 2:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 3)
+
+    def test_follower_deadline(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        threads, results = run_threads(lambda: flight.do("key", lambda: release.wait()), 1)
+        while not flight.stats()["in_flight"]:
+            time.sleep(0.001)
+        start = time.time()
+        with self.assertRaises(DeadlineExceeded):
+            flight.do("key", lambda: "follower", deadline=Deadline(0.05))
+        self.assertLess(time.time() - start, 0.5)
+        release.set()
+        threads[0].join()
+        self.assertEqual(results, [True])
+
+    def test_leader_deadline_not_shared(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def leader():
+            release.wait()
+            raise DeadlineExceeded("leader")
+
+        threads, _ = run_threads(lambda: self.assertRaises(DeadlineExceeded, flight.do, "key", leader), 1)
+        while not flight.stats()["in_flight"]:
+            time.sleep(0.001)
+        follower, results = run_threads(lambda: flight.do("key", lambda: "follower", deadline=Deadline(5)), 1)
+        while not flight.deduplicated:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads + follower:
+            thread.join()
+        self.assertEqual(results, ["follower"])
+
+    def test_not_kept(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do("key", lambda: 1), 1)
+        self.assertEqual(flight.do("key", lambda: 2), 2)
+        self.assertEqual(flight.deduplicated, 0)
+
+    def test_create_single_flight(self):
+        self.assertIsNone(create_single_flight(False))
+        self.assertIsInstance(create_single_flight(), SingleFlight)
+        flight = SingleFlight()
+        self.assertIs(create_single_flight(flight), flight)
+
+
+class ApiCoalesceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.transport = mock.Mock(spec=Transport)
+
+        def request(method, url, **kwargs):
+            self.release.wait()
+            status = 404 if url.endswith("/missing") else 200
+            return mock.Mock(status_code=status, reason="", content=b'{"id": 1}')
+
+        self.transport.request.side_effect = request
+        self.api = Api(username="test", password="password", mode="live", transport=self.transport)
+
+    def concurrent(self, url, method="GET", count=4):
+        def call():
+            try:
+                return self.api.request(url, method)
+            except ResourceNotFound as error:
+                return error
+
+        threads, results = run_threads(call, count)
+        time.sleep(0.05)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_identical_gets(self):
+        results = self.concurrent("/products/1/")
+        self.assertEqual(results, [{"id": 1}] * 4)
+        self.assertEqual(self.transport.request.call_count, 1)
+        self.assertEqual(self.api.single_flight.deduplicated, 3)
+
+    def test_shared_error(self):
+        results = self.concurrent("/products/missing")
+        self.assertTrue(all(isinstance(result, ResourceNotFound) for result in results))
+        self.assertEqual(self.transport.request.call_count, 1)
+
+    def test_posts_not_coalesced(self):
+        self.concurrent("/search/serp", method="POST")
+        self.assertEqual(self.transport.request.call_count, 4)
+
+    def test_disabled(self):
+        self.api = Api(username="test", password="password", mode="live", transport=self.transport, coalesce=False)
+        self.concurrent("/products/1/")
+        self.assertEqual(self.transport.request.call_count, 4)
+
+    def test_own_options_not_coalesced(self):
+        calls = [{"timeout": 1}, {"timeout": 2}, {"timeout": 3}, {"retry": False}]
+        threads = []
+        for options in calls:
+            threads += run_threads(lambda options=options: self.api.request("/products/1/", "GET", **options), 1)[0]
+        time.sleep(0.05)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.transport.request.call_count, 4)
+
+    def test_follower_deadline(self):
+        threads, _ = run_threads(lambda: self.api.request("/products/1/", "GET"), 1)
+        time.sleep(0.02)
+        try:
+            with self.assertRaises(DeadlineExceeded):
+                self.api.request("/products/1/", "GET", deadline=0.05)
+        finally:
+            self.release.set()
+            threads[0].join()
+        self.assertEqual(self.transport.request.call_count, 1)
@@ -0,0 +1,73 @@
+import json
+import unittest
+from ..test_helper import mock
+from ..stub_server import DecktutorStub
+from decktutorsdk.api import Api, api_factory
+from decktutorsdk.decktutor import decktutor
+from decktutorsdk.exceptions import BadRequest, ResourceNotFound
+from decktutorsdk.streaming import ItemParser, iter_items
+
+
+def parse(document, items_key=None, chunk_size=3, loads=None):
+    content = json.dumps(document).encode("utf-8")
+    parser = ItemParser(items_key, loads=loads)
+    items = []
+    for start in range(0, len(content), chunk_size):
+        items.extend(parser.feed(content[start:start + chunk_size]))
+    return items
+
+
+class ItemParserTest(unittest.TestCase):
+
+    items = [{"name": "a \"quoted\" [name]", "tags": ["x", {"y": "\\"}]}, 1.5, None, "}", [], {}]
+
+    def test_list(self):
+        for chunk_size in (1, 2, 7, 1000):
+            self.assertEqual(parse(self.items, chunk_size=chunk_size), self.items)
+        self.assertEqual(parse([]), [])
+
+    def test_object(self):
+        document = {"total": 6, "meta": {"pages": [1, 2]}, "results": self.items}
+        self.assertEqual(parse(document), self.items)
+        self.assertEqual(parse(document, items_key="results"), self.items)
+        self.assertEqual(parse({"results": self.items, "other": [1]}, items_key="other"), [1])
+        self.assertEqual(parse({"total": 0}), [])
+
+    def test_json_backend(self):
+        self.assertEqual(parse(self.items, loads=lambda content: json.loads(content.decode("utf-8"))), self.items)
+
+    def test_iter_items(self):
+        response = mock.Mock()
+        response.iter_content.return_value = iter([b'{"results": [{"a"', b': 1}, {"a": 2}]}'])
+        self.assertEqual(list(iter_items(response, chunk_size=10)), [{"a": 1}, {"a": 2}])
+        response.iter_content.assert_called_once_with(10)
+        response.close.assert_called_once_with()
+
+
+class ApiStreamTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = DecktutorStub(items=25).start()
+        self.api = Api(username="test", password="password", mode="live", endpoint=self.server.url,
+                       authenticate=True)
+
+    def tearDown(self):
+        self.server.stop()
+        api_factory._api = api_factory._auth_api = None
+
+    def test_stream(self):
+        items = list(self.api.stream("/search/self/serp", "POST", body={}, page=1, page_size=10))
+        self.assertEqual([item["code"] for item in items], [str(code) for code in range(10, 20)])
+
+    def test_errors(self):
+        with self.assertRaises(ResourceNotFound):
+            self.api.stream("/unknown", "GET")
+        self.server.failures = [(400, {})]
+        with self.assertRaises(BadRequest):
+            self.api.stream("/search/self/serp", "POST")
+
+    def test_iter_stream(self):
+        api_factory.configure(username="test", password="password", auth_api=self.api)
+        codes = [item["code"] for item in decktutor.search.self_serp.iter(body={}, page_size=10, stream=True)]
+        self.assertEqual(codes, [str(code) for code in range(25)])
+        self.assertEqual(self.server.calls["search.self_serp"], 3)
@@ -0,0 +1,48 @@
+import unittest
+from ..test_helper import mock
+from ..stub_server import DecktutorStub
+from decktutorsdk.api import Api, api_factory
+from decktutorsdk.decktutor import decktutor
+from decktutorsdk.exceptions import ResourceNotFound, ServerError
+
+
+class DecktutorStubTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = DecktutorStub(items=25).start()
+        self.api = self.create_api(authenticate=True)
+
+    def tearDown(self):
+        self.server.stop()
+        api_factory._api = api_factory._auth_api = None
+
+    def create_api(self, **kwargs):
+        return Api(username="test", password="password", mode="live", endpoint=self.server.url, **kwargs)
+
+    def test_authenticated_call(self):
+        self.assertEqual(self.api.request("/insertions/12/", "GET"),
+                         {"endpoint": "insertions.info", "params": ["12"]})
+        self.assertEqual(self.server.calls["account.login"], 1)
+        with self.assertRaises(ResourceNotFound):
+            self.api.request("/unknown", "GET")
+
+    def test_token_expiry(self):
+        self.api.request("/insertions/12/page", "GET")
+        self.server.expire_tokens()
+        self.api.request("/insertions/12/page", "GET")
+        self.assertEqual(self.server.calls["account.login"], 2)
+        self.assertEqual(self.server.calls["insertions.page"], 3)
+
+    def test_pagination(self):
+        api_factory.configure(username="test", password="password", api=self.create_api(),
+                              auth_api=self.api)
+        codes = [item["code"] for item in decktutor.search.self_serp.iter(body={}, page_size=10)]
+        self.assertEqual(codes, [str(index) for index in range(25)])
+        self.assertEqual(self.server.calls["search.self_serp"], 3)
+
+    @mock.patch("decktutorsdk.api.time.sleep")
+    def test_error_injection(self, mock_sleep):
+        self.server.error_rate = 1
+        with self.assertRaises(ServerError):
+            self.create_api(retry={"max_attempts": 2}).request("/products/1", "GET")
+        self.assertEqual(self.server.requests, 2)
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+from ..test_helper import mock
+from decktutorsdk.exceptions import ResourceNotFound
+from decktutorsdk.sync import ADDED, CHANGED, REMOVED, InventorySync
+
+
+class InventorySyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.decktutor = mock.Mock()
+        self.decktutor.insertions.page.side_effect = lambda url_entry: {"page": url_entry["code"]}
+        self.sync = InventorySync(os.path.join(self.directory, "inventory.db"), decktutor=self.decktutor)
+
+    def tearDown(self):
+        self.sync.close()
+        shutil.rmtree(self.directory)
+
+    def run_sync(self, rows):
+        self.decktutor.search.self_serp.iter.return_value = iter(rows)
+        self.decktutor.insertions.page.reset_mock()
+        return sorted((change.kind, change.code) for change in self.sync.run(body={"game": "mtg"}))
+
+    def test_first_run(self):
+        rows = [{"code": code, "price": 1.0, "quantity": 1} for code in range(3)]
+        self.assertEqual(self.run_sync(rows), [(ADDED, "0"), (ADDED, "1"), (ADDED, "2")])
+        self.assertEqual(self.decktutor.insertions.page.call_count, 3)
+        self.decktutor.search.self_serp.iter.assert_called_with(page_size=None, prefetch=0, body={"game": "mtg"})
+        self.assertEqual(len(self.sync.snapshot), 3)
+
+    def test_incremental(self):
+        rows = [{"code": code, "price": 1.0, "quantity": 1} for code in range(4)]
+        self.run_sync(rows)
+
+        rows = [{"code": 0, "price": 1.0, "quantity": 1}, {"code": 1, "price": 2.0, "quantity": 1},
+                {"code": 3, "price": 1.0, "quantity": 1}, {"code": 9, "price": 5.0, "quantity": 2}]
+        self.assertEqual(self.run_sync(rows), [(ADDED, "9"), (CHANGED, "1"), (REMOVED, "2")])
+        self.assertEqual(self.decktutor.insertions.page.call_count, 2)
+
+        self.assertEqual(self.run_sync(rows), [])
+        self.assertFalse(self.decktutor.insertions.page.called)
+
+    def test_interrupted_run(self):
+        rows = [{"code": code, "price": 1.0, "quantity": 1} for code in range(3)]
+        self.decktutor.search.self_serp.iter.return_value = iter(rows)
+        changes = self.sync.run()
+        next(changes)
+        changes.close()
+        self.assertEqual(len(self.sync.snapshot), 0)
+        self.assertEqual(len(self.run_sync(rows)), 3)
+
+    def test_failed_details(self):
+        rows = [{"code": code, "price": 1.0, "quantity": 1} for code in range(2)]
+
+        def page(url_entry):
+            if url_entry["code"] == "1":
+                raise ResourceNotFound(mock.Mock(status_code=404))
+            return {}
+
+        self.decktutor.insertions.page.side_effect = page
+        self.decktutor.search.self_serp.iter.return_value = iter(rows)
+        errors = dict((change.code, change.error) for change in self.sync.run())
+        self.assertIsNone(errors["0"])
+        self.assertIsInstance(errors["1"], ResourceNotFound)
+
+        self.decktutor.insertions.page.side_effect = lambda url_entry: {}
+        self.assertEqual(self.run_sync(rows), [(CHANGED, "1")])
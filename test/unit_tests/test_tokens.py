@@ -0,0 +1,216 @@
+import datetime
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from ..test_helper import mock
+from decktutorsdk import tokens as tokens_module
+from decktutorsdk import utils
+from decktutorsdk.api import Api
+from decktutorsdk.deadline import Deadline
+from decktutorsdk.exceptions import DeadlineExceeded
+from decktutorsdk.tokens import FileTokenStore, MemoryTokenStore, SharedMemoryTokenStore, TokenManager
+
+
+def make_token(name, expires_in):
+    expiration = utils.time_now() + datetime.timedelta(seconds=expires_in)
+    return {
+        "auth_token": name,
+        "auth_token_secret": "secret",
+        "auth_token_expiration": expiration.strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+    }
+
+
+def worker(store, logins, results):
+    """
+    Process body: gets a token, slowly logging in when needed, and draws sequence numbers
+    """
+    def login():
+        with logins.get_lock():
+            logins.value += 1
+        time.sleep(0.1)
+        return make_token("shared", 3600)
+
+    manager = TokenManager(login, store=store, key="user")
+    token = manager.get()
+    sequences = [manager.next_sequence() for _ in range(20)]
+    results.put((token["auth_token"], sequences))
+
+
+class TokenManagerTest(unittest.TestCase):
+
+    def test_login_once(self):
+        login = mock.Mock(return_value=make_token("first", 3600))
+        manager = TokenManager(login)
+        self.assertEqual(manager.get()["auth_token"], "first")
+        self.assertEqual(manager.get()["auth_token"], "first")
+        self.assertEqual(login.call_count, 1)
+
+    def test_expired(self):
+        login = mock.Mock(return_value=make_token("new", 3600))
+        manager = TokenManager(login)
+        manager.token = make_token("old", -10)
+        self.assertEqual(manager.get()["auth_token"], "new")
+
+    def test_no_stampede(self):
+        def slow_login():
+            time.sleep(0.05)
+            return make_token("token", 3600)
+
+        login = mock.Mock(side_effect=slow_login)
+        manager = TokenManager(login)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(manager.get())) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(login.call_count, 1)
+        self.assertEqual(len(results), 20)
+
+    def test_background_refresh(self):
+        refreshed = threading.Event()
+
+        def login():
+            refreshed.set()
+            return make_token("new", 3600)
+
+        manager = TokenManager(login, refresh_margin=60)
+        manager.token = make_token("old", 30)
+        # still valid: returned immediately while the new one is requested
+        self.assertEqual(manager.get()["auth_token"], "old")
+        self.assertTrue(refreshed.wait(1))
+        for _ in range(100):
+            if manager.token["auth_token"] == "new":
+                break
+            time.sleep(0.01)
+        self.assertEqual(manager.get()["auth_token"], "new")
+
+    def test_invalidate_only_stale(self):
+        manager = TokenManager(mock.Mock())
+        stale, fresh = make_token("stale", 3600), make_token("fresh", 3600)
+        manager.token = fresh
+        manager.invalidate(stale)
+        self.assertIs(manager.token, fresh)
+        manager.invalidate(fresh)
+        self.assertIsNone(manager.token)
+
+    @mock.patch("decktutorsdk.api.Api.http_call")
+    def test_api_token(self, mock_http):
+        mock_http.return_value = make_token("token", 3600)
+        api = Api(username="test", password="password", authenticate=True)
+        self.assertEqual(api.get_token()["auth_token"], "token")
+        self.assertIs(api.token, api.token_manager.token)
+        api.token = None
+        self.assertIsNone(api.token_manager.token)
+
+
+    def test_login_wait_within_deadline(self):
+        login = mock.Mock(return_value=make_token("token", 3600))
+        manager = TokenManager(login)
+        holding, release = threading.Event(), threading.Event()
+
+        def hold():
+            with manager.store.lock("login"):
+                holding.set()
+                release.wait()
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        holding.wait()
+        start = time.time()
+        try:
+            with self.assertRaises(DeadlineExceeded):
+                manager.get(Deadline(0.05))
+        finally:
+            release.set()
+            thread.join()
+        self.assertLess(time.time() - start, 0.5)
+        self.assertFalse(login.called)
+        self.assertEqual(manager.get(Deadline(1))["auth_token"], "token")
+
+class TokenStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def check_store(self, store):
+        self.assertIsNone(store.load("user"))
+        store.save("user", {"auth_token": "token"})
+        self.assertEqual(store.load("user"), {"auth_token": "token"})
+        self.assertEqual(store.next_sequence("user", 10), 11)
+        self.assertEqual(store.next_sequence("user", 5), 12)
+        self.assertEqual(store.next_sequence("other"), 1)
+        with store.lock():
+            with store.lock():
+                store.save("user", None)
+        self.assertIsNone(store.load("user"))
+
+    def check_processes(self, store):
+        # python 2 has no contexts and always forks
+        context = multiprocessing.get_context("fork") if hasattr(multiprocessing, "get_context") else multiprocessing
+        logins = context.Value("i", 0)
+        results = context.Queue()
+        processes = [context.Process(target=worker, args=(store, logins, results)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        outcomes = [results.get(timeout=10) for _ in processes]
+        for process in processes:
+            process.join()
+
+        self.assertEqual(logins.value, 1)
+        self.assertEqual(set(token for token, sequences in outcomes), {"shared"})
+        numbers = [number for token, sequences in outcomes for number in sequences]
+        self.assertEqual(len(set(numbers)), 80)
+        for token, sequences in outcomes:
+            self.assertEqual(sequences, sorted(sequences))
+
+    def test_memory_store(self):
+        self.check_store(MemoryTokenStore())
+
+    def test_file_store(self):
+        path = os.path.join(self.directory, "tokens.json")
+        self.check_store(FileTokenStore(path))
+        self.check_processes(FileTokenStore(path))
+        for name in (path, path + ".data.lock", path + ".login.lock"):
+            self.assertEqual(os.stat(name).st_mode & 0o777, 0o600)
+
+    def test_lock_timeout(self):
+        path = os.path.join(self.directory, "tokens.json")
+        holder, waiter = FileTokenStore(path), FileTokenStore(path)
+        with holder.lock("login"):
+            start = time.time()
+            with self.assertRaises(DeadlineExceeded):
+                with waiter.lock("login", timeout=0.05):
+                    pass
+            self.assertLess(time.time() - start, 0.5)
+            with waiter.lock("data", timeout=0.05):
+                pass
+        with waiter.lock("login", timeout=0.05):
+            pass
+
+    @unittest.skipIf(tokens_module.shared_memory is None, "shared memory needs python 3.8+")
+    def test_shared_memory_store(self):
+        store = SharedMemoryTokenStore(name="decktutor-test-%s" % os.getpid())
+        try:
+            self.check_store(store)
+            self.check_processes(store)
+        finally:
+            store.close(unlink=True)
+
+    @mock.patch("decktutorsdk.api.Api.http_call")
+    def test_apis_share_store(self, mock_http):
+        mock_http.return_value = make_token("token", 3600)
+        store = MemoryTokenStore()
+        first = Api(username="test", password="password", authenticate=True, token_store=store)
+        second = Api(username="test", password="password", authenticate=True, token_store=store)
+        first.headers()
+        second.headers()
+        self.assertEqual(mock_http.call_count, 1)
+        self.assertEqual(second.incremental, first.incremental + 1)
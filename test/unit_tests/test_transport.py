@@ -0,0 +1,49 @@
+import unittest
+from ..test_helper import mock
+from ..stub_server import StubServer
+from decktutorsdk.api import Api, ApiFactory
+from decktutorsdk.transport import SessionTransport, SimpleTransport, Transport, create_transport
+
+
+class TransportTest(unittest.TestCase):
+
+    def test_create_transport(self):
+        self.assertIsInstance(create_transport(), SessionTransport)
+        self.assertIsInstance(create_transport(False), SimpleTransport)
+        transport = SimpleTransport()
+        self.assertIs(create_transport(transport), transport)
+
+        transport = create_transport({"pool_connections": 2, "pool_maxsize": 30, "pool_block": True})
+        adapter = transport.session.get_adapter("https://ws.decktutor.com")
+        self.assertEqual(adapter._pool_connections, 2)
+        self.assertEqual(adapter._pool_maxsize, 30)
+        self.assertTrue(adapter._pool_block)
+
+    def test_keep_alive_disabled(self):
+        transport = SessionTransport(keep_alive=False)
+        self.assertEqual(transport.session.headers["Connection"], "close")
+
+    def test_api_uses_transport(self):
+        transport = mock.Mock(spec=Transport)
+        transport.request.return_value = mock.Mock(status_code=200, reason="OK", content=b'{"id": 1}')
+        api = Api(username="dummy", password="dummy", mode="live", transport=transport)
+        self.assertEqual(api.request("/things", "GET"), {"id": 1})
+        transport.request.assert_called_once_with(
+            "GET", "https://ws.decktutor.com/app/v2/things", data="null", params={}, headers=api.headers(),
+            timeout=api.timeout
+        )
+
+    def test_factory_shares_transport(self):
+        factory = ApiFactory()
+        factory.configure(username="dummy", password="dummy")
+        self.assertIs(factory.get_instance(authenticate=False).transport,
+                      factory.get_instance(authenticate=True).transport)
+
+    def test_connection_reuse(self):
+        with StubServer(body={"id": 1}) as server:
+            api = Api(username="dummy", password="dummy", mode="live", endpoint=server.url)
+            for _ in range(5):
+                self.assertEqual(api.request("/things", "GET"), {"id": 1})
+            api.transport.close()
+        self.assertEqual(server.requests, 5)
+        self.assertEqual(server.connections, 1)
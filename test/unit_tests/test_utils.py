@@ -0,0 +1,47 @@
+import datetime
+import unittest
+from ..test_helper import mock
+from decktutorsdk import utils
+
+
+class ParseDatetimeTest(unittest.TestCase):
+
+    values = [
+        "2016-03-01T10:20:30+01:00", "2016-03-01T10:20:30Z", "2016-03-01 10:20", "2016-03-01T10:20:30.123+0530",
+        "2016-03-01T10:20:30.1234567-02:00", "2016-03-01T10:20:30,5", "2016-03-01T10:20:30+01",
+        "2016-03-01T10:20:30+00:00", "2016-03-01T10:20:30-00:30", "2016-3-1T10:20:30", "2016-03-01", "garbage",
+    ]
+
+    def test_same_as_regex(self):
+        for value in self.values:
+            expected = utils.parse_datetime_re(value)
+            parsed = utils.parse_datetime(value)
+            self.assertEqual(parsed, expected, value)
+            if expected is not None and expected.tzinfo is not None:
+                self.assertEqual(parsed.tzinfo.tzname(parsed), expected.tzinfo.tzname(expected), value)
+        with self.assertRaises(ValueError):
+            utils.parse_datetime("2016-13-01T10:20:30")
+
+    def test_timezones(self):
+        self.assertIs(utils.parse_datetime("2016-03-01T10:20:30Z").tzinfo, utils.utc)
+        self.assertIs(utils.parse_datetime("2016-03-01T10:20:30+01:00").tzinfo,
+                      utils.parse_datetime("2016-05-01T00:00:00+0100").tzinfo)
+        self.assertIs(utils.get_fixed_timezone(-90), utils.get_fixed_timezone(-90))
+
+    @mock.patch.object(utils, "_fromisoformat", None)
+    def test_without_fromisoformat(self):
+        self.assertEqual(utils.parse_datetime("2016-03-01T10:20:30Z"),
+                         datetime.datetime(2016, 3, 1, 10, 20, 30, tzinfo=utils.utc))
+
+    def test_parse_datetimes(self):
+        with mock.patch.object(utils, "parse_datetime", wraps=utils.parse_datetime) as parse:
+            dates = utils.parse_datetimes(["2016-03-01T10:20:30Z", None, "2016-03-01T10:20:30Z", "bad"])
+        self.assertEqual(dates, [datetime.datetime(2016, 3, 1, 10, 20, 30, tzinfo=utils.utc), None,
+                                 datetime.datetime(2016, 3, 1, 10, 20, 30, tzinfo=utils.utc), None])
+        self.assertEqual(parse.call_count, 2)
+
+    def test_cached_parse_datetime(self):
+        with mock.patch.object(utils, "parse_datetime", wraps=utils.parse_datetime) as parse:
+            utils.cached_parse_datetime("2030-03-01T10:20:30Z")
+            utils.cached_parse_datetime("2030-03-01T10:20:30Z")
+        self.assertEqual(parse.call_count, 1)